@@ -7,7 +7,7 @@ from config.constants import (model_type, OUT_DIR, TIME_POINTS, OUT_RESULTS_DIR,
                               SENSITIVITY_ANALYSIS, USE_REGULARIZATION, Y_METRIC, Y_METRIC_DESCRIPTIONS,
                               DELTA_WEIGHT, ALPHA_WEIGHT, BETA_WEIGHT, GAMMA_WEIGHT, MU_WEIGHT)
 from config.logconf import setup_logger
-from paramest.core import process_gene_wrapper
+from paramest.core import process_genes
 from plotting import Plotter
 from utils import latexit
 from utils.display import ensure_output_directory, save_result, organize_output_files, create_report, merge_obs_est
@@ -145,14 +145,13 @@ def main():
         logger.error("No genes found in the input data.")
         return
 
-    results = []
-    for gene in genes:
-        logger.info(f"[{gene}]      Processing...")
-        result = process_gene_wrapper(
-            gene, kinase_data, mrna_data, TIME_POINTS,
-            config['bounds'], config['bootstraps']
-        )
-        results.append(result)
+    # Process the genes in parallel; results arrive as genes finish, failed genes are skipped
+    results = list(process_genes(
+        genes, kinase_data, mrna_data, TIME_POINTS,
+        config['bounds'], config['bootstraps'],
+        max_workers=config['max_workers'], use_cache=config['use_cache']
+    ))
+    results.sort(key=lambda result: genes.index(result['gene']))
 
     # Check if the results are empty
     if not results:
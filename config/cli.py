@@ -26,6 +26,10 @@ python phoskintime kinopt --mode evol
 
 # run the model
 python phoskintime model
+
+# screen knockouts over the fitted parameters of a previous model run
+python phoskintime knockout --site-order 2
+python phoskintime knockout --results params.csv --scenarios scenarios.json --workers 8
 """
 from pathlib import Path
 import subprocess as sp
@@ -137,6 +141,46 @@ def model(
     _run(_python_module("bin.main", conf))
 
 
+@app.command()
+def knockout(
+        results: Path | None = typer.Option(
+            None, "--results", file_okay=True, dir_okay=False,
+            help="Results workbook (<gene>_params sheets) or CSV/Parquet parameter table. "
+                 "Uses the model results if omitted."
+        ),
+        scenarios: Path | None = typer.Option(
+            None, "--scenarios", file_okay=True, dir_okay=False,
+            help="JSON file of knockout / rate-scaling scenarios. All knockout combinations if omitted."
+        ),
+        site_order: int | None = typer.Option(None, help="Largest number of sites knocked out together"),
+        genes: str | None = typer.Option(None, help="Comma-separated genes to screen"),
+        time_points: str | None = typer.Option(None, help="Comma-separated time points in minutes"),
+        out_dir: Path | None = typer.Option(None, help="Output directory"),
+        workers: int | None = typer.Option(None, help="Number of worker processes"),
+):
+    """
+    Knockout and perturbation screen over previously fitted parameters (knockout).
+
+    Args:
+        results: Results workbook or parameter table. Uses the model results if omitted.
+        scenarios: JSON file of scenarios. All knockout combinations if omitted.
+        site_order: Largest number of sites knocked out together.
+        genes: Comma-separated genes to screen.
+        time_points: Comma-separated time points in minutes.
+        out_dir: Output directory.
+        workers: Number of worker processes.
+    Returns:
+        None
+    """
+    cmd = ["knockout"]
+    for flag, value in (("--results", results), ("--scenarios", scenarios), ("--site-order", site_order),
+                        ("--genes", genes), ("--time-points", time_points), ("--out-dir", out_dir),
+                        ("--workers", workers)):
+        if value is not None:
+            cmd += [flag, str(value)]
+    _run(cmd)
+
+
 @app.command()
 def all(
         # propagate the same options to keep behaviour predictable
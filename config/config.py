@@ -11,7 +11,7 @@ from config.constants import (
     GAMMA_WEIGHT,
     DELTA_WEIGHT,
     INPUT_EXCEL, DEV_TEST, MU_WEIGHT, INPUT_EXCEL_RNA, TIME_POINTS, BOOTSTRAPS, UB_mRNA_prod, UB_mRNA_deg,
-    UB_Protein_prod, UB_Protein_deg, UB_Phospho_prod
+    UB_Protein_prod, UB_Protein_deg, UB_Phospho_prod, RESULT_CACHE
 )
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -91,7 +91,7 @@ def parse_args():
     The arguments include:
     --A-bound, --B-bound, --C-bound, --D-bound,
     --Ssite-bound, --Dsite-bound, --bootstraps,
-    --input-excel, --input-excel-rna.
+    --input-excel, --input-excel-rna, --no-cache.
 
     Args:
         None
@@ -114,6 +114,8 @@ def parse_args():
     parser.add_argument("--input-excel-rna", type=str,
                         default=INPUT_EXCEL_RNA,
                         help="Path to the estimated optimized mRNA-TF file")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false", default=RESULT_CACHE,
+                        help="Recompute every gene instead of loading unchanged genes from the result cache")
     return parser.parse_args()
 
 
@@ -135,6 +137,7 @@ def log_config(logger, bounds, args):
     for key, val in bounds.items():
         logger.info(f"      {key}      : {val}")
     logger.info(f"      Bootstrapping Iterations: {args.bootstraps}")
+    logger.info(f"      Result Cache: {args.use_cache}")
     logger.info("           --------------------------------")
     np.set_printoptions(suppress=True)
 
@@ -164,6 +167,7 @@ def extract_config(args):
         'bootstraps': args.bootstraps,
         'input_excel': args.input_excel,
         'input_excel_rna': args.input_excel_rna,
+        'use_cache': args.use_cache,
         'max_workers': 1 if DEV_TEST else os.cpu_count(),
     }
     return config
@@ -224,6 +228,8 @@ def future_times(n_new: int, ratio: float = None, tp: np.ndarray = TIME_POINTS)
     """
     Extend ttime points by n_new points, each spaced by multiplying the previous interval by ratio.
     If ratio is None, it is inferred from the last two points.
+    A fitted model can be evaluated on the extended grid without integrating again
+    through `solve_ode(..., dense=True)`.
 
     Args:
         n_new (int): Number of new time points to generate.
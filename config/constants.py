@@ -21,6 +21,8 @@ DEV_TEST = True
 # 'distmod' : Distributive model (phosphorylation events occur independently).
 # 'succmod' : Successive model (phosphorylation events occur in a fixed order).
 # 'randmod' : Random model (phosphorylation events occur randomly).
+# 'succnet' : Successive model declared as a reaction network (models/succnet.py); any module
+#             in models/ that defines a NETWORK (models/network.py) can be selected the same way.
 ODE_MODEL = 'succmod'
 # Upper bounds for mRNA production and degradation rates
 UB_mRNA_prod = 20
@@ -36,6 +38,10 @@ UB_Phospho_deg = 20
 # will be repeated with Gaussian noise (mean=0, std=0.05) to simulate measurement
 # variability for bootstrapping
 BOOTSTRAPS = 0
+# Seed of the bootstrap replicates. Every replicate draws its noise from its own stream,
+# spawned from this seed (np.random.SeedSequence), so results do not depend on the number
+# of workers or on the order in which replicates finish.
+BOOTSTRAP_SEED = 42
 # Trajectories for profiling
 # The number of trajectories to be generated for the Morris method.
 # This parameter is crucial for the Morris method, which requires a sufficient number of trajectories
@@ -60,6 +66,16 @@ PERTURBATIONS_VALUE = 0.5  # 20% perturbation
 # For example, an ALPHA_CI of 0.95 indicates that the model will compute 95% confidence intervals.
 # This corresponds to a significance level of 1 - ALPHA_CI (i.e., 0.05) when determining the critical t-value.
 ALPHA_CI = 0.95
+# CI_METHOD: How the confidence intervals of the estimated parameters are computed.
+# 'wald'    - Linearized (Wald) intervals from the covariance matrix of the fit.
+# 'profile' - Profile-likelihood intervals: every parameter is fixed on a grid on both sides of the
+#             estimate and the others are re-optimised, until Δχ² exceeds the ALPHA_CI quantile of χ²(1).
+#             Parameters whose profile reaches a bound without crossing it are reported as not identifiable.
+CI_METHOD = 'wald'
+# PROFILE_POINTS: Maximum number of grid points of each profile branch (one per direction and parameter).
+# PROFILE_SPAN: Reach of a branch towards an infinite bound, in multiples of the estimate.
+PROFILE_POINTS = 20
+PROFILE_SPAN = 100.0
 # TIME_POINTS:
 # A numpy array representing the discrete time points (in minutes) obtained from experimental MS data.
 TIME_POINTS = np.array([0.0, 0.5, 0.75, 1.0, 2.0, 4.0, 8.0, 16.0, 30.0, 60.0, 120.0, 240.0, 480.0, 960.0])
@@ -80,6 +96,69 @@ TIME_POINTS_RNA = np.array([4.0, 8.0, 15.0, 30.0, 60.0, 120.0, 240.0, 480.0, 960
 # (only valid if data is also in absolute units).
 # IMPORTANT: Set to True if your time series data represents relative changes.
 NORMALIZE_MODEL_OUTPUT = False
+# Select the backend used by `solve_ode` to integrate the ODE system.
+# Options:
+# 'auto'   : Pick a backend per call from the size of the system, its linearity and a stiffness
+#            probe (see `models.solvers.select_solver`): the exact 'eig' solution for linear
+#            systems of moderate size, 'sdirk' for small stiff nonlinear systems, 'odeint' otherwise.
+# 'odeint' : LSODA through scipy.integrate.odeint (available for every model).
+# 'expm'   : Exact solution of the linear system dy/dt = M·y + b using the matrix exponential.
+# 'eig'    : Exact solution using the eigendecomposition of M (falls back to 'expm' if M is
+#            singular or close to defective).
+# 'sdirk'  : Adaptive, L-stable SDIRK integrator (order 4) compiled with Numba. The whole time
+#            loop runs in compiled code, avoiding one Python callback per right-hand side
+#            evaluation. Compiled once per model and process.
+# 'bdf'    : Variable-order BDF through scipy.integrate.solve_ivp with the constant Jacobian M.
+# 'radau'  : Implicit Runge-Kutta Radau IIA (order 5) through solve_ivp with the constant Jacobian M.
+# The exact backends evaluate the solution directly at the requested time points and are
+# available for every linear model; nonlinear reaction networks fall back to 'odeint'.
+ODE_SOLVER = 'auto'
+# Relative and absolute tolerances of the integrating backends ('odeint', 'sdirk', 'bdf',
+# 'radau' and the sparse random-model backend). The exact backends do not use them.
+ODE_RTOL = 1.49012e-8
+ODE_ATOL = 1.49012e-8
+# Tolerance schedule: (rtol, atol) used in each stage of a gene fit.
+# 'search' : exploratory fits of the regularization search (find_best_lambda), where only the
+#            ranking of the candidate λ values matters.
+# 'final'  : final fit, bootstraps, confidence intervals and everything after estimation.
+ODE_TOLERANCE_SCHEDULE = {
+    'search': (1e-6, 1e-8),
+    'final': (ODE_RTOL, ODE_ATOL),
+}
+# Sparse backend of 'randmod'.
+# The random model has 2^n - 1 phosphorylated states. Its system matrix is assembled once
+# per site count as a sparse (CSR) transition operator. The sparse solution is exact: the
+# state is propagated between time points with the action of the exponential of the operator
+# (`expm_multiply`), which only needs sparse matrix-vector products.
+# SPARSE_RANDMOD_SENS_MIN_SITES : number of sites from which the forward-sensitivity solve uses
+#                                 the sparse backend, and from which LSQ_JACOBIAN = 'auto' fits with
+#                                 plain finite differences instead (one solve per parameter; the
+#                                 pattern is dense in the phosphorylation rows, so no parameters
+#                                 share a solve). The augmented sensitivity system has ~4^n states;
+#                                 one Jacobian takes 0.007 s (sensitivities) vs 0.006 s (finite
+#                                 differences) at 4 sites, 0.13 s vs 0.04 s at 5, 1.4 s vs 0.13 s
+#                                 at 6 and 22 s vs 4 s at 8 sites. Both grow with the 2^n + n + 3
+#                                 parameters, so large site counts remain slow to fit.
+# SPARSE_RANDMOD_MIN_SITES      : number of sites from which `solve_ode` and `solve_ode_batch` use
+#                                 the sparse propagation. One solve takes 2.0 s (dense) vs 3.8 s
+#                                 (sparse) at 11 sites, 14.6 s vs 7.1 s at 12 and 193 s vs 15 s at
+#                                 13 sites.
+SPARSE_RANDMOD_SENS_MIN_SITES = 5
+SPARSE_RANDMOD_MIN_SITES = 12
+# Executor used to process genes in parallel (bin/main.py, paramest.core.process_genes).
+# Options:
+# 'process' : One worker process per core. The phosphorylation and mRNA tables are sent once per
+#             worker, and the λ search inside each worker gets its share of the remaining cores.
+# 'serial'  : Genes are processed one after the other in the main process.
+# There is no thread option: the gene workers plot with pyplot, which is not thread-safe.
+# With DEV_TEST (max_workers = 1) genes are always processed serially.
+GENE_EXECUTOR = 'process'
+# Per-gene result cache (paramest/cache.py).
+# Every gene result is stored under a hash of the gene's input rows, the time points, bounds,
+# bootstraps, the gene's measurement weights and the source of the estimation code. Reruns load
+# unchanged genes from RESULT_CACHE_DIR and only process genes that changed or failed; a run
+# interrupted halfway resumes where it stopped. Disable with --no-cache.
+RESULT_CACHE = True
 # Flag to use custom weights for parameter estimation.
 # If True, the function will apply custom weights to the data points
 # based on their importance or reliability.
@@ -99,6 +178,14 @@ USE_CUSTOM_WEIGHTS = False
 #   - Useful during development, debugging, or when only
 #     parameter estimation is needed.
 SENSITIVITY_ANALYSIS = True
+# KNOCKOUT_SITE_ORDER: Largest number of phosphorylation sites knocked out together in the in silico
+# knockout screen. 1 knocks out single sites, 2 adds all site pairs, k all subsets of up to k sites.
+# Every site setting is combined with the transcription and translation knockouts, and all settings
+# are simulated in one batched solve.
+KNOCKOUT_SITE_ORDER = 1
+# KNOCKOUT_PLOTS: Plot every knockout setting against the wild type (one figure per setting).
+# Set to False for large combinatorial screens; the trajectories and effect sizes are kept either way.
+KNOCKOUT_PLOTS = True
 # Enables (True) or disables (False) Tikhonov (L2) regularization during model fitting.
 # RECOMMENDED to set to True for better parameter estimation.
 # Used to stabilize the solution of ill-posed problems
@@ -110,6 +197,68 @@ SENSITIVITY_ANALYSIS = True
 # When set to False, the optimization process will not include this regularization term,
 # which may result in less stable solutions, especially in cases where the data is noisy or sparse.
 USE_REGULARIZATION = True
+# Least-squares fits of the estimation (normest), solved with scipy.optimize.least_squares ('trf').
+# LSQ_JACOBIAN : Jacobian of the weighted residuals.
+#   'auto'     : 'sparse' when at most LSQ_SPARSE_DENSITY of the entries are structurally non-zero,
+#                'analytic' otherwise; 'randmod' from SPARSE_RANDMOD_SENS_MIN_SITES sites on uses
+#                '2-point' finite differences.
+#   'analytic' : Forward-sensitivity Jacobian (one solve per Jacobian), dense.
+#   'sparse'   : The same Jacobian as a CSR matrix (the regularization block is diagonal and the
+#                mRNA rows only depend on A and B); the trust-region steps use LSMR.
+#   '2-point' / '3-point' : Plain finite differences (one model evaluation per parameter and step).
+# LSQ_LOSS     : Loss applied to the weighted residuals: 'linear' (ordinary least squares),
+#                'soft_l1', 'huber', 'cauchy' or 'arctan' (robust to outlying time points).
+# LSQ_F_SCALE  : Soft margin between inlier and outlier residuals of the robust losses.
+LSQ_JACOBIAN = 'auto'
+LSQ_SPARSE_DENSITY = 0.3
+LSQ_LOSS = 'linear'
+LSQ_F_SCALE = 1.0
+# Initial guess of the parameter estimation (normest).
+# Options:
+# 'data'   : Rates derived from the data (paramest/initguess.py): mRNA synthesis and decay from the
+#            mRNA time course, protein rates from steady-state ratios and site rates from the early
+#            slopes of the phosphorylation curves. The guess is screened with one simulation each
+#            against LHS_STARTS Latin-hypercube starts, and the best candidate is used.
+# 'random' : Uniform draw inside the bounds (seed 42).
+INITIAL_GUESS = 'data'
+LHS_STARTS = 8
+# Estimation mode (paramest/toggle.py).
+# Options:
+# 'normal'     : One local fit from the initial guess.
+# 'multistart' : MULTISTART_STARTS local fits run in parallel, from the initial guess and from
+#                Latin-hypercube starts. Converged solutions closer than MULTISTART_TOL (relative
+#                distance in the optimiser's parameter space) are merged into one local minimum;
+#                the best fit is used and all minima are written to <gene>_multistart.csv.
+# 'batch'      : Genes with the same number of sites are fitted together, up to BATCH_SIZE at a time
+#                (paramest/batchest.py). Every (gene, λ, weight) candidate is one member of a
+#                block-diagonal least-squares problem; each iteration evaluates all active members in
+#                one compiled solve_ode_batch call, and members leave the batch once their relative
+#                cost decrease or step is below BATCH_TOL (at most BATCH_MAX_ITER iterations).
+ESTIMATION_MODE = 'normal'
+MULTISTART_STARTS = 8
+MULTISTART_TOL = 1e-2
+BATCH_SIZE = 32
+BATCH_MAX_ITER = 200
+BATCH_TOL = 1e-8
+# Search for the regularization term λ and the weight scheme (find_best_lambda).
+# Options:
+# 'racing'     : Successive halving. Every (λ, weight) candidate is fitted with a budget of
+#                RACING_BUDGET function evaluations; the best 1 / RACING_ETA by score_fit
+#                continue from where they stopped with RACING_ETA times the budget, until at
+#                most RACING_ETA candidates are left. Those are fitted to convergence.
+# 'path'       : Regularization path. For each weight scheme λ is walked from strong to weak
+#                and every fit is warm-started from the optimum of the previous λ. The λ grid
+#                is split into PATH_CHAINS contiguous chains that run in parallel, each starting
+#                cold at its strongest λ. The final fit starts from the initial guess, so the
+#                PATH_CONFIRM best warm-started candidates are refitted from it before one is chosen.
+# 'exhaustive' : Full fit of every candidate (one worker per λ value).
+# 'exhaustive' stays the default: 'racing' and 'path' are checked against it on synthetic
+# two-site problems only (tests/test_paramest.py) and have not been validated on a reference gene set.
+LAMBDA_SEARCH = 'exhaustive'
+RACING_BUDGET = 10
+RACING_ETA = 3
+PATH_CHAINS = 1
+PATH_CONFIRM = 3
 # Composite Scoring Function:
 # score = alpha * RMSE + beta * MAE + gamma * Var(residual) + delta * MSE + mu * L2 norm
 #
@@ -155,6 +304,14 @@ model_names = {
     "randmod": "Random"
 }
 model_type = model_names.get(ODE_MODEL, "Unknown")
+# Models declared as reaction networks (see models/network.py) are modules defining a
+# NETWORK object, which carries the display name, parameter names and state labels.
+NETWORK = None
+if ODE_MODEL not in model_names:
+    from importlib import import_module
+    NETWORK = getattr(import_module(f'models.{ODE_MODEL}'), 'NETWORK', None)
+    if NETWORK is not None:
+        model_type = NETWORK.name
 # Choose which scalar metric to use for sensitivity (Y) calculation.
 # Options:
 #   'total_signal'   – Sum of all mRNA and site values across time.
@@ -190,6 +347,7 @@ DATA_DIR = PROJECT_ROOT / 'data'
 INPUT_EXCEL = DATA_DIR / 'kinopt_results.xlsx'
 INPUT_EXCEL_RNA = DATA_DIR / 'tfopt_results.xlsx'
 LOG_DIR = OUT_DIR / f'{model_type}_logs'
+RESULT_CACHE_DIR = OUT_DIR / 'cache'
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -207,6 +365,9 @@ available_markers = [
 if ODE_MODEL == 'randmod':
     get_param_names = get_param_names_rand
     generate_labels = generate_labels_rand
+elif NETWORK is not None:
+    get_param_names = NETWORK.get_param_names
+    generate_labels = NETWORK.generate_labels
 else:
     get_param_names = get_param_names_ds
     generate_labels = generate_labels_ds
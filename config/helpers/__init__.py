@@ -1,5 +1,4 @@
 from itertools import combinations
-from math import comb
 
 
 def get_param_names_rand(num_psites: int) -> list:
@@ -100,7 +99,7 @@ def get_number_of_params_rand(num_psites):
     """
     base_params = 4
     phosphorylation_params = num_psites
-    dephosphorylation_params = sum(comb(num_psites, i) for i in range(1, num_psites + 1))
+    dephosphorylation_params = (1 << num_psites) - 1
     total_params = base_params + phosphorylation_params + dephosphorylation_params
     return total_params
 
@@ -119,7 +118,5 @@ def get_bounds_rand(num_psites, ub=0, lower=0):
     """
     bounds = [[lower, ub]] * 4
     bounds += [[lower, ub]] * num_psites
-    for i in range(1, num_psites + 1):
-        for _ in combinations(range(1, num_psites + 1), i):
-            bounds.append([lower, ub])
+    bounds += [[lower, ub]] * ((1 << num_psites) - 1)
     return bounds
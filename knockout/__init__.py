@@ -1,4 +1,5 @@
 from knockout.helper import _apply_knockout, _generate_knockout_combinations
+from knockout.screen import knockout_name, knockout_matrix, knockout_screen, plot_knockout_screen
 
 apply_knockout = _apply_knockout
 generate_knockout_combinations = _generate_knockout_combinations
@@ -0,0 +1,64 @@
+import argparse
+import time
+
+import numpy as np
+
+from config.constants import OUT_DIR, OUT_RESULTS_DIR, TIME_POINTS, KNOCKOUT_SITE_ORDER
+from config.logconf import setup_logger
+from knockout.scenarios import load_fitted_params, load_scenarios, run_screens
+
+logger = setup_logger()
+
+
+def parse_args():
+    """
+    Parse the command-line arguments of the knockout screen.
+
+    Returns:
+        argparse.Namespace: The parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="PhosKinTime - In silico knockout and rate-scaling screen over fitted parameters"
+    )
+    parser.add_argument("--results", type=str, default=str(OUT_RESULTS_DIR),
+                        help="Results workbook with the <gene>_params sheets, or a CSV/Parquet parameter table")
+    parser.add_argument("--scenarios", type=str, default=None,
+                        help="JSON file of scenarios; all knockout combinations if omitted")
+    parser.add_argument("--site-order", type=int, default=KNOCKOUT_SITE_ORDER,
+                        help="Largest number of sites knocked out together (without --scenarios)")
+    parser.add_argument("--genes", type=str, default=None, help="Comma-separated genes to screen (default: all)")
+    parser.add_argument("--time-points", type=str, default=None,
+                        help="Comma-separated time points in minutes (default: TIME_POINTS)")
+    parser.add_argument("--out-dir", type=str, default=str(OUT_DIR / 'knockouts'))
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores)")
+    return parser.parse_args()
+
+
+def main():
+    """
+    Load fitted parameters and scenarios, screen all genes in parallel and stream the results to disk.
+    """
+    args = parse_args()
+    start = time.time()
+    fitted = load_fitted_params(args.results)
+    if args.genes:
+        wanted = [gene.strip() for gene in args.genes.split(',')]
+        missing = [gene for gene in wanted if gene not in fitted]
+        if missing:
+            logger.warning(f"No fitted parameters for: {', '.join(missing)}")
+        fitted = {gene: fitted[gene] for gene in wanted if gene in fitted}
+    if not fitted:
+        logger.error("No fitted genes to screen.")
+        return
+
+    scenarios = load_scenarios(args.scenarios) if args.scenarios else None
+    time_points = (np.array([float(t) for t in args.time_points.split(',')]) if args.time_points
+                   else TIME_POINTS)
+    logger.info(f"Knockout screen of {len(fitted)} genes with "
+                f"{f'{len(scenarios)} scenarios' if scenarios else f'site order {args.site_order}'}")
+    done = run_screens(fitted, time_points, args.out_dir, scenarios, args.site_order, args.workers)
+    logger.info(f"Screened {done} of {len(fitted)} genes in {time.time() - start:.1f} s; results in {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
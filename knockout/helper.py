@@ -1,6 +1,8 @@
 import numpy as np
 import itertools
 
+from config.constants import get_param_names
+
 
 def _apply_knockout(base_params: np.ndarray,
                     knockout_targets: dict,
@@ -10,7 +12,8 @@ def _apply_knockout(base_params: np.ndarray,
 
     Args:
         base_params (np.ndarray): Original parameter vector.
-        knockout_targets (dict): Dictionary with knockout targets.
+        knockout_targets (dict): Dictionary with knockout targets ('transcription', 'translation',
+            'phosphorylation') and optional rate scaling factors by parameter name ('scale').
         num_psites (int): Number of phosphorylation sites.
     Returns:
         np.ndarray: Modified parameter vector with knockouts applied.
@@ -33,23 +36,34 @@ def _apply_knockout(base_params: np.ndarray,
             for idx in k:
                 if 0 <= idx < num_psites:
                     params[start + idx] = 0.0
+    # Rate scaling, by parameter name; names the model does not have are ignored
+    if knockout_targets.get('scale'):
+        names = get_param_names(num_psites)
+        for name, factor in knockout_targets['scale'].items():
+            if name in names:
+                params[names.index(name)] *= factor
     return params
 
 
-def _generate_knockout_combinations(num_psites: int):
+def _generate_knockout_combinations(num_psites: int, site_order: int = 1):
     """
     Generate all possible knockout combinations.
 
     Args:
         num_psites (int): Number of phosphorylation sites.
+        site_order (int): Largest number of sites knocked out together (1: single sites,
+            2: also all pairs, ...).
     Returns:
         list: List of dictionaries representing knockout combinations.
     """
     combinations = []
     transcription_options = [False, True]
     translation_options = [False, True]
-    # Phosphorylation options: False (none), True (all), individual sites
-    phosphorylation_options = [False, True] + [[i] for i in range(num_psites)]
+    # Phosphorylation options: False (none), True (all), subsets of up to `site_order` sites
+    phosphorylation_options = [False, True] + [
+        list(sites) for k in range(1, min(site_order, num_psites) + 1)
+        for sites in itertools.combinations(range(num_psites), k)
+    ]
 
     for trans, transl, phospho in itertools.product(transcription_options, translation_options,
                                                     phosphorylation_options):
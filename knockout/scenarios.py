@@ -0,0 +1,196 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config.constants import get_param_names, generate_labels
+from config.logconf import setup_logger
+from knockout.screen import knockout_screen
+from paramest.pool import MP_CONTEXT
+from steady import initial_condition, precompute_initial_conditions
+
+logger = setup_logger()
+
+
+def _site_count(row: pd.Series) -> int:
+    """
+    Number of phosphorylation sites of a saved parameter row: the largest n whose parameter
+    names (`get_param_names`) are all present and filled.
+    """
+    num_psites = 0
+    while all(name in row.index and pd.notna(row[name]) for name in get_param_names(num_psites + 1)):
+        num_psites += 1
+    if num_psites == 0:
+        raise ValueError(f"No parameters of the configured model found in columns {list(row.index)}")
+    return num_psites
+
+
+def load_fitted_params(path) -> dict:
+    """
+    Load the final parameters of previously fitted genes.
+
+    Reads either the results workbook written by the pipeline (the last row of every
+    `<gene>_params` sheet, with the site labels of `<gene>_site_estimates`) or a table (CSV or
+    Parquet) with a 'Gene' column and one column per parameter name, one row per gene. The number
+    of sites is inferred from the parameter columns that are filled.
+
+    Args:
+        path (str or Path): Results workbook (.xlsx) or parameter table (.csv, .parquet).
+
+    Returns:
+        dict: Gene -> (parameters, number of sites, site labels or None).
+    """
+    path = Path(path)
+    fitted = {}
+    if path.suffix in ('.xlsx', '.xls'):
+        xls = pd.ExcelFile(path)
+        sheets = set(xls.sheet_names)
+        for sheet in xls.sheet_names:
+            if not sheet.endswith('_params'):
+                continue
+            row = xls.parse(sheet).iloc[-1]
+            num_psites = _site_count(row)
+            labels_sheet = f"{sheet[:-len('_params')]}_site_estimates"
+            labels = None
+            if labels_sheet in sheets:
+                labels = xls.parse(labels_sheet, index_col=0).index.astype(str).tolist()
+            params = row[get_param_names(num_psites)].to_numpy(dtype=float)
+            fitted[str(row['Gene'])] = (params, num_psites, labels)
+    else:
+        table = pd.read_parquet(path) if path.suffix == '.parquet' else pd.read_csv(path)
+        for _, row in table.iterrows():
+            num_psites = _site_count(row)
+            params = row[get_param_names(num_psites)].to_numpy(dtype=float)
+            fitted[str(row['Gene'])] = (params, num_psites, None)
+    return fitted
+
+
+def load_scenarios(path) -> list:
+    """
+    Load knockout and rate-scaling scenarios from a JSON file.
+
+    Every scenario is an object with any of 'name', 'transcription', 'translation',
+    'phosphorylation' (true for all sites, or a list of 0-based site indices or site labels) and
+    'scale' (factors by parameter name), e.g.
+
+        [{"name": "fast mRNA decay", "scale": {"B": 2.0}},
+         {"translation": true, "phosphorylation": ["S12", "T15"]}]
+
+    Args:
+        path (str or Path): Scenario file; a list of scenarios or an object with a 'scenarios' list.
+
+    Returns:
+        list: Scenario dictionaries.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    return data['scenarios'] if isinstance(data, dict) else list(data)
+
+
+def resolve_sites(scenario: dict, psite_labels: list) -> dict:
+    """
+    Scenario of one gene with site labels replaced by their indices; labels the gene does not
+    have are dropped.
+    """
+    phospho = scenario.get('phosphorylation', False)
+    if not isinstance(phospho, (list, tuple)):
+        return scenario
+    sites = [psite_labels.index(site) if isinstance(site, str) else site for site in phospho
+             if not isinstance(site, str) or site in psite_labels]
+    return {**scenario, 'phosphorylation': sites}
+
+
+def screen_gene(gene, params, num_psites, psite_labels, scenarios, site_order, time_points, out_dir):
+    """
+    Run the knockout screen of one gene and write its trajectories to `<out_dir>/trajectories/<gene>.npz`.
+
+    Args:
+        gene (str): Gene name.
+        params (np.ndarray): Final parameters of the gene.
+        num_psites (int): Number of phosphorylation sites.
+        psite_labels (list or None): Site labels; defaults to the model state labels.
+        scenarios (list or None): Scenarios; None runs `generate_knockout_combinations`.
+        site_order (int): Largest number of sites knocked out together when `scenarios` is None.
+        time_points (np.ndarray): Time points.
+        out_dir (Path): Output directory.
+
+    Returns:
+        pd.DataFrame: Effect sizes of the gene (see `knockout_screen`) with a 'Gene' column.
+    """
+    psite_labels = psite_labels or generate_labels(num_psites)[2:2 + num_psites]
+    settings = None if scenarios is None else [resolve_sites(s, psite_labels) for s in scenarios]
+    screen = knockout_screen(params, initial_condition(num_psites), num_psites, time_points, psite_labels,
+                             settings, site_order)
+    np.savez_compressed(Path(out_dir) / 'trajectories' / f"{gene}.npz", names=np.array(screen['names']),
+                        time_points=np.asarray(time_points, dtype=float), solutions=screen['solutions'],
+                        params=screen['params'], param_names=np.array(get_param_names(num_psites)))
+    effects = screen['effects']
+    effects.insert(0, 'Gene', gene)
+    return effects
+
+
+def _init_screen_worker(site_counts):
+    """
+    Initializer of a screening worker: solves the steady states of the site counts it will see.
+    """
+    precompute_initial_conditions(site_counts)
+
+
+def run_screens(fitted, time_points, out_dir, scenarios=None, site_order=1, max_workers=None):
+    """
+    Screen knockout or rate-scaling scenarios over previously fitted genes.
+
+    Genes run in parallel worker processes. As each gene finishes, its effect sizes are appended
+    to `<out_dir>/knockout_effects.csv` and its trajectories are already in
+    `<out_dir>/trajectories`, so an interrupted screen keeps every finished gene. A gene that
+    fails is logged and skipped.
+
+    Args:
+        fitted (dict): Result of `load_fitted_params`.
+        time_points (np.ndarray): Time points.
+        out_dir (str or Path): Output directory.
+        scenarios (list, optional): Scenarios; None runs `generate_knockout_combinations`.
+        site_order (int, optional): Largest number of sites knocked out together. Defaults to 1.
+        max_workers (int, optional): Number of worker processes. Defaults to the number of cores.
+
+    Returns:
+        int: Number of genes screened.
+    """
+    out_dir = Path(out_dir)
+    (out_dir / 'trajectories').mkdir(parents=True, exist_ok=True)
+    effects_path = out_dir / 'knockout_effects.csv'
+    effects_path.unlink(missing_ok=True)
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(fitted)))
+    args = {gene: (gene, params, num_psites, labels, scenarios, site_order, time_points, out_dir)
+            for gene, (params, num_psites, labels) in fitted.items()}
+
+    def write(effects):
+        effects.to_csv(effects_path, mode='a', header=not effects_path.exists(), index=False)
+
+    done = 0
+    if max_workers == 1:
+        for gene, task in args.items():
+            try:
+                write(screen_gene(*task))
+                done += 1
+                logger.info(f"[{gene}]      Knockout screen done.")
+            except Exception:
+                logger.exception(f"[{gene}]      Knockout screen failed; skipping gene.")
+        return done
+
+    site_counts = {num_psites for _, num_psites, _ in fitted.values()}
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=MP_CONTEXT, initializer=_init_screen_worker,
+                             initargs=(site_counts,)) as pool:
+        futures = {pool.submit(screen_gene, *task): gene for gene, task in args.items()}
+        for future in as_completed(futures):
+            gene = futures[future]
+            try:
+                write(future.result())
+                done += 1
+                logger.info(f"[{gene}]      Knockout screen done.")
+            except Exception:
+                logger.exception(f"[{gene}]      Knockout screen failed; skipping gene.")
+    return done
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+from scipy.integrate import trapezoid
+
+from config.constants import generate_labels
+from knockout.helper import _apply_knockout, _generate_knockout_combinations
+from models import solve_ode_batch
+
+# First time point of the mRNA rows of the fit vector, as in `solve_ode`
+FIT_OFFSET = 5
+
+
+def knockout_name(setting: dict, psite_labels) -> str:
+    """
+    Name of a knockout setting, e.g. 'Transcription KO_PhosphoSite KO S12,T15', 'B x2' or 'WT'.
+    A setting with a 'name' entry keeps that name.
+
+    Args:
+        setting (dict): Knockout setting (see `generate_knockout_combinations`).
+        psite_labels (list): Labels of the phosphorylation sites.
+    Returns:
+        str: Name of the setting.
+    """
+    if setting.get('name'):
+        return str(setting['name'])
+    name = []
+    if setting.get('transcription', False):
+        name.append("Transcription KO")
+    if setting.get('translation', False):
+        name.append("Translation KO")
+    phospho = setting.get('phosphorylation', False)
+    if phospho is True:
+        name.append("Phospho KO")
+    elif isinstance(phospho, (list, tuple)) and phospho:
+        name.append(f"PhosphoSite KO {','.join(str(psite_labels[p]) for p in phospho)}")
+    for param, factor in setting.get('scale', {}).items():
+        name.append(f"{param} x{factor:g}")
+    return "_".join(name) if name else "WT"
+
+
+def knockout_matrix(base_params: np.ndarray, settings: list, num_psites: int) -> np.ndarray:
+    """
+    Parameter vectors of all knockout settings, one row per setting.
+
+    Args:
+        base_params (np.ndarray): Fitted parameter vector.
+        settings (list): Knockout settings.
+        num_psites (int): Number of phosphorylation sites.
+    Returns:
+        np.ndarray: Matrix of shape (len(settings), len(base_params)).
+    """
+    base_params = np.asarray(base_params, dtype=float)
+    return np.stack([_apply_knockout(base_params, setting, num_psites) for setting in settings])
+
+
+def knockout_screen(base_params, init_cond, num_psites, time_points, psite_labels=None, settings=None,
+                    site_order=1):
+    """
+    In silico knockout screen of one fitted gene.
+
+    All settings are simulated in one `solve_ode_batch` call. The wild type is always the first
+    setting and is the reference of the effect sizes: for mRNA, protein and every site, the log2
+    ratio of the area under the curve (trapezoidal) to the wild type, and the largest absolute
+    difference from the wild type over time.
+
+    Args:
+        base_params (np.ndarray): Fitted parameter vector (original scale).
+        init_cond (np.ndarray): Initial conditions of the model.
+        num_psites (int): Number of phosphorylation sites.
+        time_points (np.ndarray): Time points.
+        psite_labels (list, optional): Labels of the sites; defaults to the model state labels.
+        settings (list, optional): Knockout settings; defaults to `generate_knockout_combinations`
+            with `site_order`.
+        site_order (int, optional): Largest number of sites knocked out together. Defaults to 1.
+
+    Returns:
+        dict: 'names' and 'settings' of the screen, the parameter matrix 'params', the
+        trajectories 'solutions' (setting × time × state), the fit vectors 'fits' (setting × rows)
+        and the tidy DataFrame 'effects' (one row per setting and observed species).
+    """
+    time_points = np.asarray(time_points, dtype=float)
+    if psite_labels is None:
+        psite_labels = generate_labels(num_psites)[2:2 + num_psites]
+    if settings is None:
+        settings = _generate_knockout_combinations(num_psites, site_order)
+    wild_type = {'transcription': False, 'translation': False, 'phosphorylation': False}
+    settings = [wild_type] + [s for s in settings if knockout_name(s, psite_labels) != "WT"]
+    names = [knockout_name(s, psite_labels) for s in settings]
+
+    params = knockout_matrix(base_params, settings, num_psites)
+    sol = solve_ode_batch(params, init_cond, num_psites, time_points)
+    fits = np.concatenate([sol[:, FIT_OFFSET:, 0],
+                           sol[:, :, 2:2 + num_psites].transpose(0, 2, 1).reshape(len(settings), -1)], axis=1)
+
+    # Effect sizes of the observed species against the wild type
+    observed = sol[:, :, :2 + num_psites]
+    auc = trapezoid(observed, time_points, axis=1) if time_points.size > 1 else observed[:, 0]
+    tiny = np.finfo(float).tiny
+    log2fc = np.log2(np.maximum(auc, tiny) / np.maximum(auc[0], tiny))
+    max_diff = np.abs(observed - observed[0]).max(axis=1)
+    species = ["mRNA", "Protein"] + [str(label) for label in psite_labels]
+    effects = pd.DataFrame({
+        'Knockout': np.repeat(names, len(species)),
+        'Species': np.tile(species, len(names)),
+        'AUC_WT': np.tile(auc[0], len(names)),
+        'AUC_KO': auc.ravel(),
+        'Log2FC_AUC': log2fc.ravel(),
+        'Max_Abs_Diff': max_diff.ravel(),
+    })
+    return {
+        'names': names,
+        'settings': settings,
+        'params': params,
+        'solutions': sol,
+        'fits': fits,
+        'effects': effects,
+    }
+
+
+def plot_knockout_screen(screen, plotter, gene, num_psites, psite_labels, time_points):
+    """
+    Plot every knockout setting of a screen against the wild type.
+
+    Args:
+        screen (dict): Result of `knockout_screen`.
+        plotter (Plotter): Plotter writing to the output directory.
+        gene (str): Gene name.
+        num_psites (int): Number of phosphorylation sites.
+        psite_labels (list): Labels of the phosphorylation sites.
+        time_points (np.ndarray): Time points.
+    """
+    wild_type = (time_points, screen['solutions'][0], screen['fits'][0])
+    for i, name in enumerate(screen['names']):
+        # Update the file names based on KO
+        plotter.gene = f"{gene}_knockouts_{name}"
+        plotter.plot_knockouts({
+            'WT': wild_type,
+            'KO': (time_points, screen['solutions'][i], screen['fits'][i]),
+        }, num_psites, psite_labels)
+    plotter.gene = gene
@@ -7,6 +7,18 @@ try:
 except ModuleNotFoundError as e:
     raise ImportError(f"Cannot import model module 'models.{ODE_MODEL}'") from e
 
+# Models declared as reaction networks expose the same functions through their NETWORK object
+model_module = getattr(model_module, 'NETWORK', model_module)
+
 # Import the functions from the dynamically loaded module to the current namespace
 # Solve the ODE using the imported model
 solve_ode = model_module.solve_ode
+
+# Solve the ODE together with the Jacobian of the fit vector (forward sensitivities)
+solve_ode_with_sensitivities = model_module.solve_ode_with_sensitivities
+
+# Solve the ODE for a whole matrix of parameter sets in one compiled call
+solve_ode_batch = model_module.solve_ode_batch
+
+# Structural sparsity of the sensitivities of the fitted states, if the model derives it without integrating
+sensitivity_sparsity = getattr(model_module, 'sensitivity_sparsity', None)
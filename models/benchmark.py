@@ -0,0 +1,120 @@
+import argparse
+import importlib
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from config.constants import TIME_POINTS
+
+MODELS = ('distmod', 'succmod', 'randmod')
+
+
+def _problem(model, num_psites, rng):
+    """
+    Build a random parameter vector, initial condition and `odeint_rhs` argument tuple for a model.
+
+    Args:
+        model (module): Model module (distmod, succmod or randmod).
+        num_psites (int): Number of phosphorylation sites.
+        rng (np.random.Generator): Random number generator.
+
+    Returns:
+        params (np.ndarray): Parameter vector.
+        y0 (np.ndarray): Initial condition.
+        rhs_args (tuple): Extra arguments of `model.odeint_rhs`.
+    """
+    if model.__name__.endswith('randmod'):
+        num_states = (1 << num_psites) - 1
+        params = rng.uniform(0.1, 3.0, 4 + num_psites + num_states)
+        y0 = rng.uniform(0.1, 1.0, 2 + num_states)
+        A, B, C, D, S, Ddeg = model.unpack_params(params, num_psites)
+        tables = model._precompute_indices(num_psites)
+        M, _ = model.linear_system(A, B, C, D, num_psites, S, Ddeg, *tables)
+        rhs_args = (A, B, C, D, num_psites, S, Ddeg, *tables, np.empty(y0.size), M)
+    else:
+        params = rng.uniform(0.1, 3.0, 4 + 2 * num_psites)
+        y0 = rng.uniform(0.1, 1.0, 2 + num_psites)
+        A, B, C, D, S_rates, D_rates = model.unpack_params(params, num_psites)
+        M, _ = model.linear_system(A, B, C, D, S_rates, D_rates)
+        rhs_args = (A, B, C, D, S_rates, D_rates, np.empty(y0.size), M)
+    return params, y0, rhs_args
+
+
+def _rate(func, repeat):
+    """
+    Calls per second of `func`, taking the best of `repeat` timing runs.
+
+    Args:
+        func (callable): Function without arguments.
+        repeat (int): Number of timing runs.
+
+    Returns:
+        float: Calls per second.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return number / min(timer.repeat(repeat=repeat, number=number))
+
+
+def run_benchmark(models=MODELS, sites=(1, 2, 3, 4), repeat=3, seed=0, solver=None):
+    """
+    Measure right-hand side evaluations per second and `solve_ode` calls per second.
+
+    The right-hand side is timed through `odeint_rhs`, i.e. with the same Python-level
+    call that odeint makes; `solve_ode` includes integration and post-processing.
+
+    Args:
+        models (iterable): Model names to benchmark.
+        sites (iterable): Numbers of phosphorylation sites.
+        repeat (int): Number of timing runs per measurement (best is reported).
+        seed (int): Seed for the random parameter sets.
+        solver (str): `ODE_SOLVER` backend used by `solve_ode`; defaults to the configured one.
+
+    Returns:
+        pd.DataFrame: One row per model and site count.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for name in models:
+        model = importlib.import_module(f'models.{name}')
+        if solver is not None:
+            model.ODE_SOLVER = solver
+        for num_psites in sites:
+            params, y0, rhs_args = _problem(model, num_psites, rng)
+
+            # Compile outside the timed region
+            model.odeint_rhs(y0, 0.0, *rhs_args)
+            model.solve_ode(params, y0, num_psites, TIME_POINTS)
+
+            rows.append({
+                'model': name,
+                'sites': num_psites,
+                'states': y0.size,
+                'solver': model.ODE_SOLVER,
+                'rhs_evals_per_sec': _rate(lambda: model.odeint_rhs(y0, 0.0, *rhs_args), repeat),
+                'solve_ode_per_sec': _rate(lambda: model.solve_ode(params, y0, num_psites, TIME_POINTS), repeat),
+            })
+    return pd.DataFrame(rows)
+
+
+def main():
+    """
+    Command-line entry point: `python -m models.benchmark [--models ...] [--sites ...]`.
+    """
+    parser = argparse.ArgumentParser(description="Microbenchmark of the ODE model kernels.")
+    parser.add_argument('--models', nargs='+', default=list(MODELS), choices=MODELS,
+                        help="Models to benchmark.")
+    parser.add_argument('--sites', nargs='+', type=int, default=[1, 2, 3, 4],
+                        help="Numbers of phosphorylation sites.")
+    parser.add_argument('--repeat', type=int, default=3, help="Timing runs per measurement.")
+    parser.add_argument('--solver', default=None, choices=('auto', 'odeint', 'expm', 'eig', 'sdirk', 'bdf', 'radau'),
+                        help="Backend used by solve_ode (defaults to ODE_SOLVER).")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.models, args.sites, args.repeat, solver=args.solver)
+    print(results.to_string(index=False, float_format=lambda v: f"{v:,.0f}"))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
-from models.diagram.helpers import create_random_diagram, create_distributive_diagram, create_successive_model
-from config.constants import model_type
+from models.diagram.helpers import create_random_diagram, create_distributive_diagram, create_successive_model, \
+    create_network_diagram
+from config.constants import model_type, NETWORK
 
 
 def illustrate(gene, num_sites):
@@ -20,5 +21,7 @@ def illustrate(gene, num_sites):
         create_distributive_diagram(gene, num_sites, output_filename_prefix)
     elif model_type == "Successive":
         create_successive_model(gene, num_sites, output_filename_prefix)
+    elif NETWORK is not None:
+        create_network_diagram(NETWORK, num_sites, output_filename_prefix)
     else:
         print(f"Model type '{model_type}' not recognized. Available types are: Random, Distributive, and Successive.")
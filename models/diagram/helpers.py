@@ -221,3 +221,49 @@ def create_successive_model(x, num_sites, output_filename):
                  style='dotted', penwidth='1.5')
 
     dot.render(f"{OUT_DIR}/{output_filename}", format='png', cleanup=True)
+
+
+def create_network_diagram(network, num_sites, output_filename):
+    """
+    Create a diagram of a model declared as a reaction network.
+
+    Species are drawn as nodes (mRNA, protein and the remaining species in the colours of
+    the other diagrams); sources and sinks are drawn as φ. Every reactant is connected to
+    every product and the edge is labelled with the rate.
+
+    Args:
+        network: The `models.network.ReactionNetwork` to draw.
+        num_sites: The number of phosphorylation sites.
+        output_filename: The name of the output file for the diagram.
+    """
+    dot = Digraph(engine='neato')
+    dot.attr(rankdir='LR')
+    dot.attr(label=network.name, labelloc="t", fontsize="15",
+             fontname="Helvetica", fontcolor="black")
+    dot.attr('graph', bgcolor="white", dpi='300')
+    dot.attr('node', shape='ellipse', style='filled,rounded', fontname='Helvetica', fontsize='12')
+    dot.attr('edge', fontname='Helvetica', fontsize='10')
+
+    colors = ['lightcoral', 'dodgerblue']
+    for k, name in enumerate(network.generate_labels(num_sites)):
+        fill = colors[k] if k < len(colors) else 'turquoise3'
+        dot.node(name, name, style='filled', fillcolor=fill, fontcolor='white' if k < len(colors) else 'black')
+
+    for j, (reactants, products, rate_param, rate_const) in enumerate(network.expand_reactions(num_sites)):
+        if rate_param is None:
+            label = f"{rate_const:g}"
+        elif rate_const != 1.0:
+            label = f"{rate_const:g}·{rate_param}"
+        else:
+            label = rate_param
+        # Catalysts (e.g. R in R -> R + P) are drawn as the source of the new species
+        sources = list(reactants) or [f'NULL_{j}']
+        targets = [s for s in products if s not in reactants] or [f'NULL_{j}']
+        for node in sources + targets:
+            if node.startswith('NULL_'):
+                dot.node(node, 'φ', shape='plaintext', fontcolor='gray')
+        for source in sources:
+            for target in targets:
+                dot.edge(source, target, label=label, color='dimgray', fontcolor='dimgray', penwidth='1.5')
+
+    dot.render(f"{OUT_DIR}/{output_filename}", format='png', cleanup=True)
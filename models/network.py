@@ -0,0 +1,650 @@
+import re
+
+import numpy as np
+from numba import njit, prange
+from scipy.integrate import odeint
+from scipy.optimize import minimize
+
+from config.constants import NORMALIZE_MODEL_OUTPUT, ODE_SOLVER
+from models.solvers import solve_linear, solve_linear_batch, postprocess_batch, solve_linear_sensitivities, \
+    linear_sensitivity_terms, integrate_sensitivities, fit_vector_jacobian, postprocess_solution, postprocess_fit, \
+    constant_jacobian, solve_sdirk, DenseSolution, cached_dense_solution, select_solver, get_tolerances, \
+    solve_ivp_linear
+
+# Site index inside a species, parameter or reaction template: {i}, {i+1}, {i-1}, ...
+_SITE_INDEX = re.compile(r'\{i([+-]\d+)?\}')
+
+# Stoichiometric term of a reaction side: optional integer coefficient followed by a species name.
+_TERM = re.compile(r'^(\d+)?\s*([A-Za-z_][\w]*)$')
+
+
+def _expand(template, i):
+    """
+    Substitute the site index i into a template.
+
+    Args:
+        template (str): Name or reaction containing {i}, {i+k} or {i-k}.
+        i (int): Site index (1-based).
+
+    Returns:
+        str: Expanded text.
+    """
+    return _SITE_INDEX.sub(lambda m: str(i + int(m.group(1) or 0)), template)
+
+
+def _family_pattern(template):
+    """
+    Regular expression matching every expansion of a site-indexed template.
+
+    Args:
+        template (str): Name containing {i}.
+
+    Returns:
+        re.Pattern: Pattern matching the template with any integer in place of the index.
+    """
+    parts = _SITE_INDEX.split(template)
+    # split() interleaves the captured offsets; keep only the literal text
+    literals = [re.escape(p) for p in parts[::2]]
+    return re.compile('^' + r'-?\d+'.join(literals) + '$')
+
+
+def _parse_side(side):
+    """
+    Parse one side of a reaction into {species: coefficient}.
+
+    Args:
+        side (str): e.g. 'R + 2 P' or '' for the empty complex.
+
+    Returns:
+        dict: Stoichiometric coefficients by species name.
+    """
+    terms = {}
+    for term in side.split('+'):
+        term = term.strip()
+        if not term:
+            continue
+        match = _TERM.match(term)
+        if match is None:
+            raise ValueError(f"Invalid reaction term '{term}'")
+        name = match.group(2)
+        terms[name] = terms.get(name, 0) + int(match.group(1) or 1)
+    return terms
+
+
+@njit(cache=True)
+def _rate_constant(j, params, k_param, k_const):
+    """
+    Rate constant of reaction j: a literal, a parameter, or a literal multiple of a parameter.
+    """
+    k = k_const[j]
+    if k_param[j] >= 0:
+        k *= params[k_param[j]]
+    return k
+
+
+@njit(cache=True)
+def rhs_into(y, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const, dydt):
+    """
+    Mass-action right-hand side of a compiled reaction network written into a preallocated buffer.
+
+    Args:
+        y (np.ndarray): State vector.
+        params (np.ndarray): Parameter vector.
+        n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const:
+            Network tables from `ReactionNetwork.tables`.
+        dydt (np.ndarray): Output buffer of length n_states.
+
+    Returns:
+        dydt (np.ndarray): The filled output buffer.
+    """
+    for s in range(n_states):
+        dydt[s] = 0.0
+    for j in range(k_param.shape[0]):
+        v = _rate_constant(j, params, k_param, k_const)
+        for q in range(r_ptr[j], r_ptr[j + 1]):
+            for _ in range(r_order[q]):
+                v *= y[r_species[q]]
+        for p in range(s_ptr[j], s_ptr[j + 1]):
+            dydt[s_species[p]] += s_coef[p] * v
+    return dydt
+
+
+@njit(cache=True)
+def network_rhs(y, t, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const):
+    """
+    Right-hand side of a compiled reaction network, `f(y, t, *args)` convention.
+
+    Args:
+        y (np.ndarray): State vector.
+        t (float): Time (the network is autonomous).
+        params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const:
+            Parameter vector and network tables.
+
+    Returns:
+        dydt (np.ndarray): Time derivatives.
+    """
+    return rhs_into(y, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const,
+                    np.empty(n_states))
+
+
+@njit(cache=True)
+def odeint_rhs(y, t, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const,
+               dydt, jac):
+    """
+    Allocation-free right-hand side passed to odeint by `ReactionNetwork.solve_ode`.
+
+    Args:
+        y, t, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const:
+            Same as in `network_rhs`.
+        dydt (np.ndarray): Output buffer reused across calls (odeint copies the result).
+        jac (np.ndarray): Jacobian buffer shared with `odeint_jacobian` (or the constant
+            system matrix for linear networks).
+
+    Returns:
+        dydt (np.ndarray): Time derivatives.
+    """
+    return rhs_into(y, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const,
+                    dydt)
+
+
+@njit(cache=True)
+def jacobian_into(y, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const, jac):
+    """
+    Analytic state Jacobian ∂f/∂y of a compiled reaction network written into a preallocated buffer.
+
+    Args:
+        y, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const:
+            Same as in `rhs_into`.
+        jac (np.ndarray): Output buffer of shape (n_states, n_states).
+
+    Returns:
+        jac (np.ndarray): The filled output buffer.
+    """
+    jac[:, :] = 0.0
+    for j in range(k_param.shape[0]):
+        k = _rate_constant(j, params, k_param, k_const)
+        for q in range(r_ptr[j], r_ptr[j + 1]):
+            # ∂/∂y_s of k · Π y_r^order_r
+            d = k * r_order[q]
+            for _ in range(r_order[q] - 1):
+                d *= y[r_species[q]]
+            for o in range(r_ptr[j], r_ptr[j + 1]):
+                if o != q:
+                    for _ in range(r_order[o]):
+                        d *= y[r_species[o]]
+            for p in range(s_ptr[j], s_ptr[j + 1]):
+                jac[s_species[p], r_species[q]] += s_coef[p] * d
+    return jac
+
+
+@njit(cache=True)
+def network_jacobian(y, t, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const):
+    """
+    Analytic state Jacobian ∂f/∂y of a compiled reaction network, `jac(y, t, *args)` convention.
+
+    Returns:
+        jac (np.ndarray): Dense Jacobian of shape (n_states, n_states).
+    """
+    return jacobian_into(y, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const,
+                         np.empty((n_states, n_states)))
+
+
+@njit(cache=True)
+def odeint_jacobian(y, t, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const,
+                    dydt, jac):
+    """
+    Allocation-free Jacobian passed to odeint for nonlinear networks; fills and returns the `jac` buffer.
+    """
+    return jacobian_into(y, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const,
+                         jac)
+
+
+@njit(cache=True)
+def param_jacobian(y, t, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const):
+    """
+    Analytic parameter Jacobian ∂f/∂θ of a compiled reaction network.
+
+    Returns:
+        jac (np.ndarray): Dense Jacobian of shape (n_states, len(params)).
+    """
+    jac = np.zeros((n_states, params.shape[0]))
+    for j in range(k_param.shape[0]):
+        if k_param[j] < 0:
+            continue
+        v = k_const[j]
+        for q in range(r_ptr[j], r_ptr[j + 1]):
+            for _ in range(r_order[q]):
+                v *= y[r_species[q]]
+        for p in range(s_ptr[j], s_ptr[j + 1]):
+            jac[s_species[p], k_param[j]] += s_coef[p] * v
+    return jac
+
+
+@njit(cache=True)
+def linear_system(params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const):
+    """
+    Build the linear form dy/dt = M·y + b of a network whose reactions are at most first order.
+
+    Args:
+        params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const:
+            Parameter vector and network tables.
+
+    Returns:
+        M (np.ndarray): System matrix of shape (n_states, n_states).
+        b (np.ndarray): Constant input vector of length n_states.
+    """
+    M = np.zeros((n_states, n_states))
+    b = np.zeros(n_states)
+    for j in range(k_param.shape[0]):
+        k = _rate_constant(j, params, k_param, k_const)
+        for p in range(s_ptr[j], s_ptr[j + 1]):
+            if r_ptr[j] == r_ptr[j + 1]:
+                b[s_species[p]] += s_coef[p] * k
+            else:
+                M[s_species[p], r_species[r_ptr[j]]] += s_coef[p] * k
+    return M, b
+
+
+@njit(cache=True)
+def sensitivity_rhs(z, t, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const):
+    """
+    Right-hand side of the forward-sensitivity system z = [y, vec(∂y/∂θ)] of a compiled network.
+    """
+    n_params = params.shape[0]
+    y = z[:n_states]
+    sens = z[n_states:].reshape((n_states, n_params))
+    dzdt = np.empty_like(z)
+    args = (params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param, k_const)
+    dzdt[:n_states] = network_rhs(y, t, *args)
+    dsens = network_jacobian(y, t, *args) @ sens + param_jacobian(y, t, *args)
+    dzdt[n_states:] = dsens.ravel()
+    return dzdt
+
+
+@njit(cache=True)
+def sensitivity_jacobian(z, t, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param,
+                         k_const):
+    """
+    Block-diagonal Jacobian of the forward-sensitivity system; the ∂²f/∂θ∂y coupling is
+    omitted, which only affects the Newton iteration of the stiff integrator.
+    """
+    n_params = params.shape[0]
+    J = network_jacobian(z[:n_states], t, params, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef,
+                         k_param, k_const)
+    size = n_states * (1 + n_params)
+    jac = np.zeros((size, size))
+    jac[:n_states, :n_states] = J
+    for i in range(n_states):
+        for j in range(n_states):
+            if J[i, j] != 0.0:
+                for k in range(n_params):
+                    jac[n_states + i * n_params + k, n_states + j * n_params + k] = J[i, j]
+    return jac
+
+
+@njit(cache=True, parallel=True)
+def linear_system_batch(param_matrix, n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef, k_param,
+                        k_const):
+    """
+    Build the linear forms of a first-order network for every row of a parameter matrix.
+
+    Returns:
+        Ms (np.ndarray): System matrices of shape (N, n_states, n_states).
+        bs (np.ndarray): Constant input vectors of shape (N, n_states).
+    """
+    N = param_matrix.shape[0]
+    Ms = np.empty((N, n_states, n_states))
+    bs = np.empty((N, n_states))
+    for i in prange(N):
+        M, b = linear_system(param_matrix[i], n_states, r_ptr, r_species, r_order, s_ptr, s_species, s_coef,
+                             k_param, k_const)
+        Ms[i] = M
+        bs[i] = b
+    return Ms, bs
+
+
+class ReactionNetwork:
+    """
+    Declarative mass-action reaction network that provides the model interface of
+    `distmod`, `succmod` and `randmod`.
+
+    Species and parameters are lists of names; a name containing `{i}` is a site family
+    expanded for i = 1..num_psites. Reactions are strings `'reactants -> products : rate'`
+    where each side is a `+`-separated list of optionally weighted species (`'2 P'`), either
+    side may be empty (source or sink), and the rate is a parameter name, a number, or
+    `number * parameter`. A reaction containing `{i}`, `{i+1}` or `{i-1}` is expanded for
+    every site; expansions that refer to a site outside 1..num_psites are skipped.
+
+    The species list must start with mRNA and protein; the pipeline fits the mRNA and the
+    `num_psites` species that follow the protein, as for the hand-written models.
+
+    For each site count the network is lowered to index tables (`tables`) that are evaluated
+    by generic Numba kernels (`rhs_into`, `jacobian_into`, `param_jacobian`, `linear_system`),
+    so every network shares the compiled, cached hot path.
+    """
+
+    def __init__(self, name, species, parameters, reactions):
+        """
+        Args:
+            name (str): Display name of the model.
+            species (list): Species names and site families, starting with mRNA and protein.
+            parameters (list): Parameter names and site families, in parameter-vector order.
+            reactions (list): Reaction strings.
+        """
+        self.name = name
+        self.species = list(species)
+        self.parameters = list(parameters)
+        self.reactions = list(reactions)
+        self._families = [_family_pattern(n) for n in self.species + self.parameters if _SITE_INDEX.search(n)]
+        self._tables = {}
+        self._parsed = {}
+
+    @staticmethod
+    def _expand_names(templates, num_psites):
+        names = []
+        for template in templates:
+            if _SITE_INDEX.search(template):
+                names += [_expand(template, i) for i in range(1, num_psites + 1)]
+            else:
+                names.append(template)
+        return names
+
+    def get_param_names(self, num_psites):
+        """
+        Parameter names in parameter-vector order.
+
+        Args:
+            num_psites (int): Number of phosphorylation sites.
+
+        Returns:
+            list: Parameter names.
+        """
+        return self._expand_names(self.parameters, num_psites)
+
+    def generate_labels(self, num_psites):
+        """
+        State labels in state-vector order.
+
+        Args:
+            num_psites (int): Number of phosphorylation sites.
+
+        Returns:
+            list: State labels.
+        """
+        return self._expand_names(self.species, num_psites)
+
+    def unpack_params(self, params, num_psites):
+        """
+        Map a parameter vector to parameter names.
+
+        Args:
+            params (np.ndarray): Parameter vector.
+            num_psites (int): Number of phosphorylation sites.
+
+        Returns:
+            dict: Parameter values by name.
+        """
+        return dict(zip(self.get_param_names(num_psites), np.asarray(params, dtype=float)))
+
+    def expand_reactions(self, num_psites):
+        """
+        Expand the reaction templates for a site count.
+
+        Args:
+            num_psites (int): Number of phosphorylation sites.
+
+        Returns:
+            list: Tuples (reactants, products, rate_param, rate_const), where reactants and
+            products map species names to coefficients and rate_param is a parameter name or None.
+        """
+        if num_psites in self._parsed:
+            return self._parsed[num_psites]
+        species = set(self.generate_labels(num_psites))
+        parameters = set(self.get_param_names(num_psites))
+        expanded = []
+        for template in self.reactions:
+            indices = range(1, num_psites + 1) if _SITE_INDEX.search(template) else [None]
+            for i in indices:
+                text = template if i is None else _expand(template, i)
+                if '->' not in text or ':' not in text:
+                    raise ValueError(f"Invalid reaction '{template}', expected 'reactants -> products : rate'")
+                sides, rate = text.rsplit(':', 1)
+                lhs, rhs = sides.split('->')
+                reactants, products = _parse_side(lhs), _parse_side(rhs)
+                rate_param, rate_const = self._parse_rate(rate.strip(), parameters, template)
+                names = list(reactants) + list(products) + ([rate_param] if rate_param else [])
+                unknown = [n for n in names if n not in species and n not in parameters]
+                if unknown:
+                    # Site families outside 1..num_psites drop the reaction; anything else is an error
+                    if i is not None and all(any(f.match(n) for f in self._families) for n in unknown):
+                        continue
+                    raise ValueError(f"Unknown species or parameter {unknown} in reaction '{template}'")
+                expanded.append((reactants, products, rate_param, rate_const))
+        self._parsed[num_psites] = expanded
+        return expanded
+
+    @staticmethod
+    def _parse_rate(rate, parameters, template):
+        factors = [f.strip() for f in rate.split('*')]
+        rate_param, rate_const = None, 1.0
+        for factor in factors:
+            try:
+                rate_const *= float(factor)
+            except ValueError:
+                if rate_param is not None:
+                    raise ValueError(f"Rate of '{template}' may contain a single parameter") from None
+                rate_param = factor
+        return rate_param, rate_const
+
+    def is_linear(self, num_psites):
+        """
+        Whether every reaction is at most first order, i.e. dy/dt = M·y + b.
+
+        Args:
+            num_psites (int): Number of phosphorylation sites.
+
+        Returns:
+            bool: True for linear networks.
+        """
+        return all(sum(r.values()) <= 1 for r, _, _, _ in self.expand_reactions(num_psites))
+
+    def tables(self, num_psites):
+        """
+        Lower the network to the index tables evaluated by the compiled kernels (cached per site count).
+
+        Args:
+            num_psites (int): Number of phosphorylation sites.
+
+        Returns:
+            n_states (int): Number of species.
+            r_ptr (np.ndarray): Reactant offsets of each reaction.
+            r_species (np.ndarray): Reactant species indices.
+            r_order (np.ndarray): Reactant stoichiometric coefficients.
+            s_ptr (np.ndarray): Offsets of the net stoichiometry of each reaction.
+            s_species (np.ndarray): Species changed by each reaction.
+            s_coef (np.ndarray): Net stoichiometric coefficients.
+            k_param (np.ndarray): Parameter index of each rate constant (-1 for a literal rate).
+            k_const (np.ndarray): Literal factor of each rate constant.
+        """
+        if num_psites in self._tables:
+            return self._tables[num_psites]
+        species = {n: k for k, n in enumerate(self.generate_labels(num_psites))}
+        parameters = {n: k for k, n in enumerate(self.get_param_names(num_psites))}
+        r_ptr, r_species, r_order = [0], [], []
+        s_ptr, s_species, s_coef = [0], [], []
+        k_param, k_const = [], []
+        for reactants, products, rate_param, rate_const in self.expand_reactions(num_psites):
+            for name, order in reactants.items():
+                r_species.append(species[name])
+                r_order.append(order)
+            r_ptr.append(len(r_species))
+            for name in dict.fromkeys(list(reactants) + list(products)):
+                coef = products.get(name, 0) - reactants.get(name, 0)
+                if coef != 0:
+                    s_species.append(species[name])
+                    s_coef.append(float(coef))
+            s_ptr.append(len(s_species))
+            k_param.append(parameters[rate_param] if rate_param else -1)
+            k_const.append(rate_const)
+        tables = (
+            len(species),
+            np.array(r_ptr, dtype=np.int64), np.array(r_species, dtype=np.int64), np.array(r_order, dtype=np.int64),
+            np.array(s_ptr, dtype=np.int64), np.array(s_species, dtype=np.int64), np.array(s_coef, dtype=float),
+            np.array(k_param, dtype=np.int64), np.array(k_const, dtype=float),
+        )
+        self._tables[num_psites] = tables
+        return tables
+
+    def solve_ode(self, params, init_cond, num_psites, t, dense=False):
+        """
+        Solve the network ODE system; same interface as the hand-written models.
+
+        Args:
+            params (np.ndarray): Parameter vector.
+            init_cond (np.ndarray): Initial conditions.
+            num_psites (int): Number of phosphorylation sites.
+            t (np.ndarray): Time points.
+            dense (bool): If True, return the cached continuous solution starting at t[0]
+                (linear networks only).
+
+        Returns:
+            sol (np.ndarray): Solution of shape (len(t), n_states).
+            fit (np.ndarray): Flat fit vector.
+        """
+        params = np.asarray(params, dtype=float)
+        y0 = np.asarray(init_cond, dtype=float)
+        tables = self.tables(num_psites)
+        linear = self.is_linear(num_psites)
+
+        if dense:
+            if not linear:
+                raise ValueError(f"Dense output requires a linear network; '{self.name}' has higher-order reactions")
+            key = (self.name, params.tobytes(), y0.tobytes(), num_psites, float(t[0]))
+            return cached_dense_solution(key, lambda: DenseSolution(
+                *linear_system(params, *tables), y0, t[0], num_psites, 5, NORMALIZE_MODEL_OUTPUT))
+
+        if linear:
+            M, b = linear_system(params, *tables)
+            J = M
+        else:
+            J = network_jacobian(y0, t[0], params, *tables)
+        method = select_solver(J, t, linear) if ODE_SOLVER == 'auto' else ODE_SOLVER
+        if not linear and method in ('expm', 'eig', 'bdf', 'radau'):
+            # These backends need the linear form; LSODA handles nonlinear networks
+            method = 'odeint'
+        rtol, atol = get_tolerances()
+
+        if method in ('expm', 'eig'):
+            sol = solve_linear(M, b, y0, t, method=method)
+        elif method == 'sdirk':
+            sol = solve_sdirk(network_rhs, network_jacobian, y0, np.asarray(t, dtype=float), (params, *tables),
+                              rtol, atol)
+        elif method in ('bdf', 'radau'):
+            sol = solve_ivp_linear(M, b, y0, t, method, rtol, atol)
+        elif linear:
+            # Constant Jacobian, as in the hand-written models
+            sol = odeint(odeint_rhs, y0, t, args=(params, *tables, np.empty(y0.size), M), Dfun=constant_jacobian,
+                         rtol=rtol, atol=atol)
+        else:
+            sol = odeint(odeint_rhs, y0, t, args=(params, *tables, np.empty(y0.size), np.empty((y0.size, y0.size))),
+                         Dfun=odeint_jacobian, rtol=rtol, atol=atol)
+
+        sol = np.asarray(sol)
+        fit = postprocess_fit(sol, y0, num_psites, 5, NORMALIZE_MODEL_OUTPUT)
+        return sol, fit
+
+    def solve_ode_with_sensitivities(self, params, init_cond, num_psites, t):
+        """
+        Solve the network together with the Jacobian of the fit vector.
+
+        Args:
+            params (np.ndarray): Parameter vector.
+            init_cond (np.ndarray): Initial conditions.
+            num_psites (int): Number of phosphorylation sites.
+            t (np.ndarray): Time points.
+
+        Returns:
+            sol (np.ndarray): Solution, as returned by `solve_ode`.
+            fit (np.ndarray): Fit vector, as returned by `solve_ode`.
+            jac (np.ndarray): Jacobian of the fit vector of shape (len(fit), len(params)).
+        """
+        params = np.asarray(params, dtype=float)
+        y0 = np.asarray(init_cond, dtype=float)
+        tables = self.tables(num_psites)
+        method = None
+        if self.is_linear(num_psites):
+            M, b = linear_system(params, *tables)
+            method = select_solver(M, t) if ODE_SOLVER == 'auto' else ODE_SOLVER
+        if method in ('expm', 'eig'):
+            dM, db = linear_sensitivity_terms(lambda y: param_jacobian(y, 0.0, params, *tables), y0.size)
+            raw, sens = solve_linear_sensitivities(M, b, dM, db, y0, t, method=method)
+        else:
+            raw, sens = integrate_sensitivities(sensitivity_rhs, sensitivity_jacobian, y0, params.size, t,
+                                                (params, *tables))
+        jac = fit_vector_jacobian(raw, sens, y0, num_psites, 5, NORMALIZE_MODEL_OUTPUT)
+        sol, fit = postprocess_solution(raw, y0, num_psites, 5, NORMALIZE_MODEL_OUTPUT)
+        return sol, fit, jac
+
+    def solve_ode_batch(self, param_matrix, init_cond, num_psites, t):
+        """
+        Solve the network for many parameter sets; linear networks use the compiled ensemble solver.
+
+        Args:
+            param_matrix (np.ndarray): Parameter sets of shape (N, n_params).
+            init_cond (np.ndarray): Initial conditions shared by all parameter sets.
+            num_psites (int): Number of phosphorylation sites.
+            t (np.ndarray): Time points.
+
+        Returns:
+            sol (np.ndarray): Solutions of shape (N, len(t), n_states).
+        """
+        param_matrix = np.ascontiguousarray(np.atleast_2d(param_matrix), dtype=float)
+        y0 = np.asarray(init_cond, dtype=float)
+        t = np.asarray(t, dtype=float)
+        tables = self.tables(num_psites)
+        if self.is_linear(num_psites):
+            Ms, bs = linear_system_batch(param_matrix, *tables)
+            sol = solve_linear_batch(Ms, bs, y0, t)
+        else:
+            buffers = (np.empty(y0.size), np.empty((y0.size, y0.size)))
+            sol = np.stack([odeint(odeint_rhs, y0, t, args=(params, *tables, *buffers), Dfun=odeint_jacobian)
+                            for params in param_matrix])
+        return postprocess_batch(sol, y0, NORMALIZE_MODEL_OUTPUT)
+
+    def initial_condition(self, num_psites):
+        """
+        Steady state of the network with all parameters set to one, used as the initial condition.
+
+        Linear networks are solved directly from M·y = -b; otherwise the steady-state
+        equations are solved with SLSQP under positivity bounds, as in `steady`.
+
+        Args:
+            num_psites (int): Number of phosphorylation sites.
+
+        Returns:
+            list: Steady-state values in state-vector order.
+
+        Raises:
+            ValueError: If no steady state is found.
+        """
+        tables = self.tables(num_psites)
+        n_states = tables[0]
+        params = np.ones(len(self.get_param_names(num_psites)))
+        if self.is_linear(num_psites):
+            M, b = linear_system(params, *tables)
+            try:
+                y = np.linalg.solve(M, -b)
+            except np.linalg.LinAlgError:
+                y = None
+            if y is not None and np.all(np.isfinite(y)) and np.all(y > 0):
+                return y.tolist()
+        result = minimize(
+            lambda y: 0,
+            np.ones(n_states),
+            method='SLSQP',
+            bounds=[(1e-6, None)] * n_states,
+            constraints={'type': 'eq', 'fun': lambda y: network_rhs(y, 0.0, params, *tables)}
+        )
+        if result.success:
+            return result.x.tolist()
+        raise ValueError("Failed to find steady-state conditions")
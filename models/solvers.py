@@ -0,0 +1,988 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import numpy as np
+import scipy.sparse as sp
+from numba import njit, prange
+from scipy.integrate import odeint, solve_ivp
+from scipy.linalg import expm
+from scipy.sparse.linalg import expm_multiply
+
+from config.constants import ODE_TOLERANCE_SCHEDULE
+
+# Above this condition number the eigenvector basis is treated as (nearly) defective.
+EIG_COND_LIMIT = 1e8
+
+# Number of dense solutions kept by `cached_dense_solution` (least recently used are dropped).
+DENSE_CACHE_SIZE = 8
+
+# Thresholds of the 'auto' solver policy (`select_solver`), chosen from `models.benchmark`
+# timings: the exact eigen solution beats every integrator up to ~100 states, the compiled
+# SDIRK beats LSODA on small stiff systems, and LSODA with the analytic Jacobian wins beyond.
+AUTO_EXACT_MAX_STATES = 100
+AUTO_SDIRK_MAX_STATES = 16
+# Stiffness index ‖J‖₁·(t_end - t_0) above which a system is treated as stiff.
+AUTO_STIFF_INDEX = 100.0
+
+# (rtol, atol) of the current estimation stage, see `tolerance_stage`. A context variable, so
+# that a stage entered in one thread (or task) never leaks into another.
+_tolerances = ContextVar('ode_tolerances', default=ODE_TOLERANCE_SCHEDULE['final'])
+
+# Coefficients and 1-norm threshold of the degree-13 Padé approximant (Higham, 2005).
+PADE13_COEFFS = np.array([
+    64764752532480000.0, 32382376266240000.0, 7771770303897600.0, 1187353796428800.0,
+    129060195264000.0, 10559470521600.0, 670442572800.0, 33522128640.0,
+    1323241920.0, 40840800.0, 960960.0, 16380.0, 182.0, 1.0
+])
+PADE13_THETA = 5.371920351148152
+
+# L-stable, stiffly accurate SDIRK method of order 4 with an embedded order-3 solution
+# (Hairer & Wanner, Solving ODEs II, Table IV.6.5), used by `solve_sdirk`.
+SDIRK_GAMMA = 0.25
+SDIRK_A = np.array([
+    [1 / 4, 0.0, 0.0, 0.0, 0.0],
+    [1 / 2, 1 / 4, 0.0, 0.0, 0.0],
+    [17 / 50, -1 / 25, 1 / 4, 0.0, 0.0],
+    [371 / 1360, -137 / 2720, 15 / 544, 1 / 4, 0.0],
+    [25 / 24, -49 / 48, 125 / 16, -85 / 12, 1 / 4],
+])
+SDIRK_C = np.array([1 / 4, 3 / 4, 11 / 20, 1 / 2, 1.0])
+SDIRK_B = SDIRK_A[4].copy()
+SDIRK_E = SDIRK_B - np.array([59 / 48, -17 / 96, 225 / 32, -85 / 12, 0.0])
+
+# Default tolerances of the compiled integrator (the defaults of odeint).
+SDIRK_RTOL = 1.49012e-8
+SDIRK_ATOL = 1.49012e-8
+
+
+def augment_linear_system(M, b):
+    """
+    Embed the affine system dy/dt = M·y + b into a homogeneous one of size n + 1.
+
+    Args:
+        M (np.ndarray): System matrix of shape (n, n).
+        b (np.ndarray): Constant input vector of length n.
+
+    Returns:
+        Ma (np.ndarray): Augmented matrix [[M, b], [0, 0]] of shape (n + 1, n + 1).
+    """
+    n = M.shape[0]
+    Ma = np.zeros((n + 1, n + 1))
+    Ma[:n, :n] = M
+    Ma[:n, n] = b
+    return Ma
+
+
+def solve_linear_expm(M, b, y0, t):
+    """
+    Exact solution of dy/dt = M·y + b at the time points t using the matrix exponential.
+
+    The solution is propagated from one time point to the next with exp(Ma·Δt),
+    where Ma is the augmented system matrix. All propagators are computed in a
+    single batched call to `scipy.linalg.expm`.
+
+    Args:
+        M (np.ndarray): System matrix of shape (n, n).
+        b (np.ndarray): Constant input vector of length n.
+        y0 (np.ndarray): State at t[0].
+        t (np.ndarray): Increasing time points.
+
+    Returns:
+        sol (np.ndarray): Solution of shape (len(t), n).
+    """
+    t = np.asarray(t, dtype=float)
+    n = M.shape[0]
+    z = np.empty((t.size, n + 1))
+    z[0, :n] = y0
+    z[0, n] = 1.0
+    if t.size > 1:
+        Ma = augment_linear_system(M, b)
+        props = expm(np.diff(t)[:, None, None] * Ma[None, :, :])
+        for k in range(t.size - 1):
+            z[k + 1] = props[k] @ z[k]
+    return z[:, :n]
+
+
+def solve_linear_eig(M, b, y0, t):
+    """
+    Exact solution of dy/dt = M·y + b at the time points t using the eigendecomposition of M.
+
+    With M = V·diag(w)·V⁻¹ and steady state y* = -M⁻¹·b the solution is
+    y(t) = y* + V·exp(w·(t - t0))·V⁻¹·(y0 - y*). Falls back to `solve_linear_expm`
+    when M is singular or its eigenvector basis is ill-conditioned.
+
+    Args:
+        M (np.ndarray): System matrix of shape (n, n).
+        b (np.ndarray): Constant input vector of length n.
+        y0 (np.ndarray): State at t[0].
+        t (np.ndarray): Increasing time points.
+
+    Returns:
+        sol (np.ndarray): Solution of shape (len(t), n).
+    """
+    t = np.asarray(t, dtype=float)
+    w, V = np.linalg.eig(M)
+    scale = max(1.0, np.max(np.abs(w)))
+    if np.min(np.abs(w)) < 1e-12 * scale or np.linalg.cond(V) > EIG_COND_LIMIT:
+        return solve_linear_expm(M, b, y0, t)
+    y_ss = -np.linalg.solve(M, b)
+    c = np.linalg.solve(V, np.asarray(y0, dtype=float) - y_ss)
+    sol = (np.exp(np.outer(t - t[0], w)) * c) @ V.T
+    return sol.real + y_ss
+
+
+def solve_linear(M, b, y0, t, method='expm'):
+    """
+    Dispatch to the exact linear solver selected by `method`.
+
+    Args:
+        M (np.ndarray): System matrix of shape (n, n).
+        b (np.ndarray): Constant input vector of length n.
+        y0 (np.ndarray): State at t[0].
+        t (np.ndarray): Increasing time points.
+        method (str): 'expm' or 'eig'.
+
+    Returns:
+        sol (np.ndarray): Solution of shape (len(t), n).
+    """
+    if method == 'expm':
+        return solve_linear_expm(M, b, y0, t)
+    if method == 'eig':
+        return solve_linear_eig(M, b, y0, t)
+    raise ValueError(f"Unknown linear solver '{method}'")
+
+
+def get_tolerances():
+    """
+    Integration tolerances of the current estimation stage.
+
+    Returns:
+        rtol (float): Relative tolerance.
+        atol (float): Absolute tolerance.
+    """
+    return _tolerances.get()
+
+
+@contextmanager
+def tolerance_stage(stage):
+    """
+    Use the tolerances of `ODE_TOLERANCE_SCHEDULE[stage]` for every solve inside the block.
+
+    The stage is local to the current thread, so concurrent fits cannot restore each other's stage.
+
+    Args:
+        stage (str): Key of `ODE_TOLERANCE_SCHEDULE`, e.g. 'search' or 'final'.
+    """
+    token = _tolerances.set(ODE_TOLERANCE_SCHEDULE[stage])
+    try:
+        yield _tolerances.get()
+    finally:
+        _tolerances.reset(token)
+
+
+def stiffness_index(J, t):
+    """
+    Cheap stiffness probe: ‖J‖₁ times the integration span.
+
+    ‖J‖₁ bounds the spectral radius of J, so the index estimates how many steps a
+    non-stiff method would need for stability alone.
+
+    Args:
+        J (np.ndarray): Jacobian (or system matrix) of shape (n, n).
+        t (np.ndarray): Time points.
+
+    Returns:
+        float: Stiffness index.
+    """
+    return float(np.abs(J).sum(axis=0).max() * (t[-1] - t[0]))
+
+
+def select_solver(J, t, linear=True):
+    """
+    Backend chosen by the 'auto' solver policy.
+
+    Linear systems of moderate size are solved exactly with 'eig'; small stiff systems use
+    the compiled 'sdirk' integrator; everything else uses LSODA ('odeint'), which switches
+    between Adams and BDF on its own.
+
+    Args:
+        J (np.ndarray): Jacobian (or system matrix) at the initial state.
+        t (np.ndarray): Time points.
+        linear (bool): Whether the system is linear (the exact backends apply).
+
+    Returns:
+        str: 'eig', 'sdirk' or 'odeint'.
+    """
+    n = J.shape[0]
+    if linear and n <= AUTO_EXACT_MAX_STATES:
+        return 'eig'
+    if n <= AUTO_SDIRK_MAX_STATES and stiffness_index(J, t) >= AUTO_STIFF_INDEX:
+        return 'sdirk'
+    return 'odeint'
+
+
+def solve_ivp_linear(M, b, y0, t, method, rtol, atol):
+    """
+    Integrate dy/dt = M·y + b with an implicit `solve_ivp` method and the constant Jacobian M.
+
+    Args:
+        M (np.ndarray or sp.spmatrix): System matrix of shape (n, n).
+        b (np.ndarray): Constant input vector of length n.
+        y0 (np.ndarray): State at t[0].
+        t (np.ndarray): Increasing time points.
+        method (str): 'bdf' or 'radau'.
+        rtol (float): Relative tolerance.
+        atol (float): Absolute tolerance.
+
+    Returns:
+        sol (np.ndarray): Solution of shape (len(t), n).
+
+    Raises:
+        RuntimeError: If the integration fails.
+    """
+    t = np.asarray(t, dtype=float)
+    res = solve_ivp(lambda _, y: M @ y + b, (t[0], t[-1]), y0, method={'bdf': 'BDF', 'radau': 'Radau'}[method],
+                    t_eval=t, jac=M, rtol=rtol, atol=atol)
+    if not res.success:
+        raise RuntimeError(f"{method} integration failed: {res.message}")
+    return res.y.T
+
+
+def solve_linear_sparse(M, b, y0, t):
+    """
+    Exact solution of dy/dt = M·y + b at the time points t for a sparse M.
+
+    The augmented state [y, 1] is propagated from one time point to the next with the action
+    of exp(Ma·Δt) (`expm_multiply`), so neither the exponential nor an LU factorization of M
+    is formed and no integration tolerance applies. Independent systems can be solved in one
+    call by passing their block-diagonal M and stacked b and y0.
+
+    Args:
+        M (sp.spmatrix): System matrix of shape (n, n).
+        b (np.ndarray): Constant input vector of length n.
+        y0 (np.ndarray): State at t[0].
+        t (np.ndarray): Increasing time points.
+
+    Returns:
+        sol (np.ndarray): Solution of shape (len(t), n).
+    """
+    t = np.asarray(t, dtype=float)
+    n = M.shape[0]
+    Ma = sp.bmat([[M, sp.csr_matrix(np.asarray(b, dtype=float)[:, None])], [None, sp.csr_matrix((1, 1))]],
+                 format='csr')
+    trace = M.diagonal().sum()
+    z = np.append(np.asarray(y0, dtype=float), 1.0)
+    sol = np.empty((t.size, n))
+    for k in range(t.size):
+        step = t[k] - t[k - 1] if k else 0.0
+        if step > 0:
+            z = expm_multiply(step * Ma, z, traceA=step * trace)
+        sol[k] = z[:n]
+    return sol
+
+
+class DenseSolution:
+    """
+    Continuous solution of dy/dt = M·y + b with y(t0) = y0 that can be evaluated at any time.
+
+    The system is linear, so no integration is needed: for a dense M the eigendecomposition
+    is computed once and y(t) = y* + V·exp(w·(t - t0))·c is evaluated directly (falling back to
+    the matrix exponential of the augmented system when M is singular or close to defective);
+    for a sparse M the action of the augmented exponential is applied with `expm_multiply`.
+    Raw states are memoised per time grid, so evaluating the MS grid, the RNA grid or
+    extrapolated future times repeatedly costs a lookup.
+
+    Calling the object applies the `solve_ode` post-processing and returns `(sol, fit)`.
+    """
+
+    def __init__(self, M, b, y0, t0, num_cols, offset, normalize):
+        """
+        Args:
+            M (np.ndarray or sp.spmatrix): System matrix of shape (n, n).
+            b (np.ndarray): Constant input vector of length n.
+            y0 (np.ndarray): State at t0.
+            t0 (float): Initial time.
+            num_cols (int): Number of phosphorylated states in the fit vector.
+            offset (int): Number of leading time points dropped from the mRNA rows.
+            normalize (bool): Whether to normalise the output to the initial condition.
+        """
+        self.M = M
+        self.b = np.asarray(b, dtype=float)
+        self.y0 = np.asarray(y0, dtype=float)
+        self.t0 = float(t0)
+        self.num_cols = num_cols
+        self.offset = offset
+        self.normalize = normalize
+        self._eig = None
+        self._states = {}
+        if not sp.issparse(M):
+            w, V = np.linalg.eig(M)
+            scale = max(1.0, np.max(np.abs(w)))
+            if np.min(np.abs(w)) >= 1e-12 * scale and np.linalg.cond(V) <= EIG_COND_LIMIT:
+                y_ss = -np.linalg.solve(M, self.b)
+                self._eig = (w, V, np.linalg.solve(V, self.y0 - y_ss), y_ss)
+
+    def states(self, t):
+        """
+        Raw (unclipped) states at the time points t.
+
+        Args:
+            t (np.ndarray): Time points (any order, may lie beyond the fitted range).
+
+        Returns:
+            np.ndarray: Read-only array of shape (len(t), n).
+        """
+        t = np.asarray(t, dtype=float)
+        key = t.tobytes()
+        sol = self._states.get(key)
+        if sol is None:
+            dt = t - self.t0
+            n = self.y0.size
+            if self._eig is not None:
+                w, V, c, y_ss = self._eig
+                sol = (np.exp(np.outer(dt, w)) * c) @ V.T
+                sol = sol.real + y_ss
+            else:
+                z0 = np.append(self.y0, 1.0)
+                if sp.issparse(self.M) and dt.size and dt.min() >= 0:
+                    # Step through the sorted times instead of starting every time point at t0
+                    grid, inverse = np.unique(dt, return_inverse=True)
+                    sol = solve_linear_sparse(self.M, self.b, self.y0, np.append(0.0, grid))[1:][inverse]
+                elif sp.issparse(self.M):
+                    Ma = sp.bmat([[self.M, sp.csr_matrix(self.b[:, None])], [None, sp.csr_matrix((1, 1))]],
+                                 format='csr')
+                    sol = np.array([expm_multiply(step * Ma, z0)[:n] for step in dt])
+                else:
+                    Ma = augment_linear_system(self.M, self.b)
+                    sol = (expm(dt[:, None, None] * Ma[None, :, :]) @ z0)[:, :n]
+            sol = sol.reshape(t.size, n)
+            sol.setflags(write=False)
+            self._states[key] = sol
+        return sol
+
+    def __call__(self, t):
+        """
+        Evaluate the solution at t with the `solve_ode` post-processing.
+
+        Args:
+            t (np.ndarray): Time points.
+
+        Returns:
+            sol (np.ndarray): Post-processed solution of shape (len(t), n).
+            fit (np.ndarray): Flat fit vector.
+        """
+        return postprocess_solution(self.states(t), self.y0, self.num_cols, self.offset, self.normalize)
+
+
+_dense_cache = OrderedDict()
+
+
+def cached_dense_solution(key, build):
+    """
+    Return the dense solution stored under `key`, building it with `build()` on a miss.
+
+    Args:
+        key (tuple): Hashable key identifying the model, parameters and initial condition.
+        build (callable): Function without arguments returning a `DenseSolution`.
+
+    Returns:
+        DenseSolution: Cached or newly built solution.
+    """
+    sol = _dense_cache.get(key)
+    if sol is None:
+        sol = build()
+        _dense_cache[key] = sol
+        if len(_dense_cache) > DENSE_CACHE_SIZE:
+            _dense_cache.popitem(last=False)
+    else:
+        _dense_cache.move_to_end(key)
+    return sol
+
+
+def linear_sensitivity_terms(param_jac, n_states):
+    """
+    Recover ∂M/∂θ and ∂b/∂θ of an affine system from its parameter Jacobian.
+
+    For f(y) = M(θ)·y + b(θ) the parameter Jacobian F(y) = ∂f/∂θ is affine in y,
+    so F(0) = ∂b/∂θ and F(e_l) - F(0) is the l-th column of every ∂M/∂θ_k.
+
+    Args:
+        param_jac (callable): Function returning ∂f/∂θ of shape (n_states, n_params) for a state y.
+        n_states (int): Number of states.
+
+    Returns:
+        dM (np.ndarray): Derivatives of M of shape (n_params, n_states, n_states).
+        db (np.ndarray): Derivatives of b of shape (n_params, n_states).
+    """
+    F0 = param_jac(np.zeros(n_states))
+    dM = np.empty((F0.shape[1], n_states, n_states))
+    for col in range(n_states):
+        unit = np.zeros(n_states)
+        unit[col] = 1.0
+        dM[:, :, col] = (param_jac(unit) - F0).T
+    return dM, F0.T
+
+
+def solve_linear_sensitivities_expm(M, b, dM, db, y0, t):
+    """
+    Exact solution and parameter sensitivities of dy/dt = M·y + b using the matrix exponential.
+
+    For every parameter the block matrix [[Ma, 0], [∂Ma/∂θ_k, Ma]] (Van Loan) is
+    exponentiated, which yields the propagator exp(Ma·Δt) and its derivative in a
+    single batched `scipy.linalg.expm` call over all intervals and parameters.
+
+    Args:
+        M (np.ndarray): System matrix of shape (n, n).
+        b (np.ndarray): Constant input vector of length n.
+        dM (np.ndarray): Derivatives of M of shape (p, n, n).
+        db (np.ndarray): Derivatives of b of shape (p, n).
+        y0 (np.ndarray): State at t[0] (independent of the parameters).
+        t (np.ndarray): Increasing time points.
+
+    Returns:
+        sol (np.ndarray): Solution of shape (len(t), n).
+        sens (np.ndarray): Sensitivities ∂y/∂θ of shape (len(t), n, p).
+    """
+    t = np.asarray(t, dtype=float)
+    n = M.shape[0]
+    p = dM.shape[0]
+    z = np.zeros((t.size, n + 1))
+    z[0, :n] = y0
+    z[0, n] = 1.0
+    s = np.zeros((t.size, p, n + 1))
+    if t.size > 1:
+        Ma = augment_linear_system(M, b)
+        blocks = np.zeros((p, 2 * (n + 1), 2 * (n + 1)))
+        blocks[:, :n + 1, :n + 1] = Ma
+        blocks[:, n + 1:, n + 1:] = Ma
+        blocks[:, n + 1:2 * n + 1, :n] = dM
+        blocks[:, n + 1:2 * n + 1, n] = db
+        props = expm(np.diff(t)[:, None, None, None] * blocks[None, :, :, :])
+        for k in range(t.size - 1):
+            E = props[k, 0, :n + 1, :n + 1]
+            L = props[k, :, n + 1:, :n + 1]
+            z[k + 1] = E @ z[k]
+            s[k + 1] = L @ z[k] + s[k] @ E.T
+    return z[:, :n], s[:, :, :n].transpose(0, 2, 1)
+
+
+def solve_linear_sensitivities_eig(M, b, dM, db, y0, t):
+    """
+    Exact solution and parameter sensitivities of dy/dt = M·y + b using the eigendecomposition
+    of the augmented matrix Ma = V·diag(w)·V⁻¹.
+
+    The derivative of exp(Ma·τ) in direction ∂Ma/∂θ_k follows the Daleckii-Krein formula
+    V·(G(τ) ∘ (V⁻¹·∂Ma/∂θ_k·V))·V⁻¹ with G_ij = (exp(w_i·τ) - exp(w_j·τ)) / (w_i - w_j),
+    so all time points and parameters are evaluated without any matrix exponential.
+    Falls back to `solve_linear_sensitivities_expm` when the eigenvector basis is ill-conditioned.
+
+    Args:
+        M (np.ndarray): System matrix of shape (n, n).
+        b (np.ndarray): Constant input vector of length n.
+        dM (np.ndarray): Derivatives of M of shape (p, n, n).
+        db (np.ndarray): Derivatives of b of shape (p, n).
+        y0 (np.ndarray): State at t[0] (independent of the parameters).
+        t (np.ndarray): Increasing time points.
+
+    Returns:
+        sol (np.ndarray): Solution of shape (len(t), n).
+        sens (np.ndarray): Sensitivities ∂y/∂θ of shape (len(t), n, p).
+    """
+    t = np.asarray(t, dtype=float)
+    n = M.shape[0]
+    Ma = augment_linear_system(M, b)
+    w, V = np.linalg.eig(Ma)
+    if np.linalg.cond(V) > EIG_COND_LIMIT:
+        return solve_linear_sensitivities_expm(M, b, dM, db, y0, t)
+    V_inv = np.linalg.inv(V)
+
+    dMa = np.zeros((dM.shape[0], n + 1, n + 1))
+    dMa[:, :n, :n] = dM
+    dMa[:, :n, n] = db
+    W = V_inv[np.newaxis, :, :] @ dMa @ V[np.newaxis, :, :]
+
+    z0 = np.append(np.asarray(y0, dtype=float), 1.0)
+    u0 = V_inv @ z0
+    tau = t - t[0]
+    ew = np.exp(np.outer(tau, w))
+    diff = w[:, None] - w[None, :]
+    close = np.abs(diff) < 1e-10 * max(1.0, np.max(np.abs(w)))
+    G = np.where(close[None, :, :],
+                 tau[:, None, None] * ew[:, :, None],
+                 (ew[:, :, None] - ew[:, None, :]) / np.where(close, 1.0, diff)[None, :, :])
+
+    z = (ew * u0[np.newaxis, :]) @ V.T
+    s = np.einsum('ij,tpjk,k->tip', V, G[:, np.newaxis, :, :] * W[np.newaxis, :, :, :], u0)
+    return z[:, :n].real, s[:, :n, :].real
+
+
+def solve_linear_sensitivities(M, b, dM, db, y0, t, method='expm'):
+    """
+    Dispatch to the exact linear sensitivity solver selected by `method`.
+
+    Args:
+        M (np.ndarray): System matrix of shape (n, n).
+        b (np.ndarray): Constant input vector of length n.
+        dM (np.ndarray): Derivatives of M of shape (p, n, n).
+        db (np.ndarray): Derivatives of b of shape (p, n).
+        y0 (np.ndarray): State at t[0] (independent of the parameters).
+        t (np.ndarray): Increasing time points.
+        method (str): 'expm' or 'eig'.
+
+    Returns:
+        sol (np.ndarray): Solution of shape (len(t), n).
+        sens (np.ndarray): Sensitivities ∂y/∂θ of shape (len(t), n, p).
+    """
+    if method == 'expm':
+        return solve_linear_sensitivities_expm(M, b, dM, db, y0, t)
+    if method == 'eig':
+        return solve_linear_sensitivities_eig(M, b, dM, db, y0, t)
+    raise ValueError(f"Unknown linear solver '{method}'")
+
+
+def postprocess_solution(sol, init_cond, num_cols, offset, normalize):
+    """
+    Apply the `solve_ode` post-processing to a raw solution.
+
+    Clips negative concentrations, optionally normalises to the initial condition,
+    and builds the flat fit vector [R(t[offset:]), P_1(t), ..., P_k(t)].
+
+    Args:
+        sol (np.ndarray): Raw solution of shape (T, n_states).
+        init_cond (np.ndarray): Initial conditions of the model.
+        num_cols (int): Number of phosphorylated states in the fit vector.
+        offset (int): Number of leading time points dropped from the mRNA rows.
+        normalize (bool): Whether to normalise the output to the initial condition.
+
+    Returns:
+        sol (np.ndarray): Post-processed solution of shape (T, n_states).
+        fit (np.ndarray): Flat fit vector.
+    """
+    sol = np.array(sol, dtype=float)
+    return sol, postprocess_fit(sol, np.asarray(init_cond, dtype=float), num_cols, offset, normalize)
+
+
+@njit(cache=True)
+def postprocess_fit(sol, init_cond, num_cols, offset, normalize):
+    """
+    Fused `solve_ode` post-processing: clip and normalise the solution in place
+    and build the flat fit vector [R(t[offset:]), P_1(t), ..., P_k(t)] in one pass.
+
+    Args:
+        sol (np.ndarray): Raw solution of shape (T, n_states); modified in place.
+        init_cond (np.ndarray): Initial conditions of the model.
+        num_cols (int): Number of phosphorylated states in the fit vector.
+        offset (int): Number of leading time points dropped from the mRNA rows.
+        normalize (bool): Whether to normalise the output to the initial condition.
+
+    Returns:
+        fit (np.ndarray): Flat fit vector.
+    """
+    T, n = sol.shape
+    fit = np.empty(T - offset + num_cols * T)
+    for i in range(T):
+        for j in range(n):
+            v = sol[i, j]
+            if v < 0.0:
+                v = 0.0
+            if normalize:
+                v *= 1.0 / init_cond[j]
+            sol[i, j] = v
+            if j == 0:
+                if i >= offset:
+                    fit[i - offset] = v
+            elif 2 <= j < 2 + num_cols:
+                fit[T - offset + (j - 2) * T + i] = v
+    return fit
+
+
+def constant_jacobian(y, t, *args):
+    """
+    `Dfun` for odeint when the Jacobian of a linear system is passed, precomputed, as the last extra argument.
+
+    Args:
+        y (np.ndarray): Current state (unused).
+        t (float): Current time (unused).
+        *args: Extra arguments of the right-hand side; the last one is the Jacobian.
+
+    Returns:
+        jac (np.ndarray): The precomputed Jacobian.
+    """
+    return args[-1]
+
+
+def integrate_sensitivities(sens_rhs, sens_jac, y0, num_params, t, args, rtol=None, atol=None):
+    """
+    Integrate the forward-sensitivity system z = [y, vec(∂y/∂θ)] with odeint.
+
+    The sensitivities start at zero because the initial conditions do not
+    depend on the kinetic parameters.
+
+    Args:
+        sens_rhs (callable): Right-hand side of the augmented system, `sens_rhs(z, t, *args)`.
+        sens_jac (callable): Jacobian of the augmented system, `sens_jac(z, t, *args)`.
+        y0 (np.ndarray): Initial state of the model.
+        num_params (int): Number of kinetic parameters.
+        t (np.ndarray): Time points.
+        args (tuple): Extra arguments passed to `sens_rhs` and `sens_jac`.
+        rtol (float): Relative tolerance (defaults to the current stage, see `get_tolerances`).
+        atol (float): Absolute tolerance (defaults to the current stage).
+
+    Returns:
+        sol (np.ndarray): Model solution of shape (len(t), n_states).
+        sens (np.ndarray): Sensitivities of shape (len(t), n_states, num_params).
+    """
+    y0 = np.asarray(y0, dtype=float)
+    n = y0.size
+    z0 = np.zeros(n * (1 + num_params))
+    z0[:n] = y0
+    stage_rtol, stage_atol = get_tolerances()
+    z = odeint(sens_rhs, z0, t, args=args, Dfun=sens_jac,
+               rtol=stage_rtol if rtol is None else rtol, atol=stage_atol if atol is None else atol)
+    return z[:, :n], z[:, n:].reshape(len(t), n, num_params)
+
+
+def fit_vector_jacobian(sol, sens, init_cond, num_cols, offset, normalize):
+    """
+    Map state sensitivities onto the flat fit vector returned by `solve_ode`.
+
+    Mirrors the post-processing of `solve_ode`: clipped states get a zero
+    derivative, normalisation divides by the initial condition, and the rows
+    are ordered as [R(t[offset:]), P_1(t), ..., P_k(t)].
+
+    Args:
+        sol (np.ndarray): Unclipped model solution of shape (T, n_states).
+        sens (np.ndarray): Sensitivities of shape (T, n_states, n_params).
+        init_cond (np.ndarray): Initial conditions of the model.
+        num_cols (int): Number of phosphorylated states in the fit vector.
+        offset (int): Number of leading time points dropped from the mRNA rows.
+        normalize (bool): Whether the model output is normalised to the initial condition.
+
+    Returns:
+        jac (np.ndarray): Jacobian of the fit vector of shape (len(fit), n_params).
+    """
+    sens = np.where((sol > 0)[:, :, None], sens, 0.0)
+    if normalize:
+        sens = sens / np.asarray(init_cond, dtype=float)[None, :, None]
+    R_jac = sens[offset:, 0, :]
+    P_jac = sens[:, 2:2 + num_cols, :].transpose(1, 0, 2).reshape(-1, sens.shape[2])
+    return np.concatenate((R_jac, P_jac))
+
+
+@njit(cache=True)
+def expm_pade(A):
+    """
+    Matrix exponential by scaling and squaring with a degree-13 Padé approximant.
+
+    Compiled counterpart of `scipy.linalg.expm` for use inside Numba kernels.
+
+    Args:
+        A (np.ndarray): Square matrix.
+
+    Returns:
+        E (np.ndarray): exp(A).
+    """
+    n = A.shape[0]
+    c = PADE13_COEFFS
+    norm = 0.0
+    for j in range(n):
+        col = 0.0
+        for i in range(n):
+            col += abs(A[i, j])
+        norm = max(norm, col)
+    s = 0
+    if norm > PADE13_THETA:
+        s = int(np.ceil(np.log2(norm / PADE13_THETA)))
+    A = A / (2.0 ** s)
+
+    ident = np.eye(n)
+    A2 = A @ A
+    A4 = A2 @ A2
+    A6 = A4 @ A2
+    U = A @ (A6 @ (c[13] * A6 + c[11] * A4 + c[9] * A2) + c[7] * A6 + c[5] * A4 + c[3] * A2 + c[1] * ident)
+    V = A6 @ (c[12] * A6 + c[10] * A4 + c[8] * A2) + c[6] * A6 + c[4] * A4 + c[2] * A2 + c[0] * ident
+    E = np.ascontiguousarray(np.linalg.solve(V - U, V + U))
+    for _ in range(s):
+        E = E @ E
+    return E
+
+
+@njit(cache=True, parallel=True)
+def solve_linear_batch(Ms, bs, y0, t):
+    """
+    Exact solutions of N linear systems dy/dt = M_i·y + b_i on a common time grid.
+
+    Each system is propagated between consecutive time points with the compiled
+    matrix exponential of its augmented matrix; the samples run in parallel.
+
+    Args:
+        Ms (np.ndarray): System matrices of shape (N, n, n).
+        bs (np.ndarray): Constant input vectors of shape (N, n).
+        y0 (np.ndarray): Common initial state of length n at t[0].
+        t (np.ndarray): Increasing time points.
+
+    Returns:
+        sol (np.ndarray): Solutions of shape (N, len(t), n).
+    """
+    N, n = bs.shape
+    T = t.size
+    sol = np.empty((N, T, n))
+    for i in prange(N):
+        Ma = np.zeros((n + 1, n + 1))
+        Ma[:n, :n] = Ms[i]
+        Ma[:n, n] = bs[i]
+        z = np.empty(n + 1)
+        z[:n] = y0
+        z[n] = 1.0
+        sol[i, 0, :] = y0
+        for k in range(T - 1):
+            z = expm_pade(Ma * (t[k + 1] - t[k])) @ z
+            sol[i, k + 1, :] = z[:n]
+    return sol
+
+
+def postprocess_batch(sol, init_cond, normalize):
+    """
+    Apply the `solve_ode` post-processing (clipping and normalisation) to a batch of solutions in place.
+
+    Args:
+        sol (np.ndarray): Solutions of shape (N, T, n_states).
+        init_cond (np.ndarray): Initial conditions of the model.
+        normalize (bool): Whether to normalise the output to the initial condition.
+
+    Returns:
+        sol (np.ndarray): The post-processed solutions.
+    """
+    np.clip(sol, 0, None, out=sol)
+    if normalize:
+        sol *= (1.0 / np.asarray(init_cond, dtype=sol.dtype))[np.newaxis, np.newaxis, :]
+    return sol
+
+
+@njit(cache=True)
+def _lu_factor(A, LU, piv):
+    """
+    LU factorization with partial pivoting of A, written into preallocated buffers.
+
+    Args:
+        A (np.ndarray): Square matrix (not modified).
+        LU (np.ndarray): Output buffer for the packed unit-lower and upper triangular factors.
+        piv (np.ndarray): Output buffer for the row permutation.
+    """
+    n = A.shape[0]
+    for i in range(n):
+        piv[i] = i
+        for j in range(n):
+            LU[i, j] = A[i, j]
+    for k in range(n):
+        p = k
+        for i in range(k + 1, n):
+            if abs(LU[i, k]) > abs(LU[p, k]):
+                p = i
+        if p != k:
+            for j in range(n):
+                tmp = LU[k, j]
+                LU[k, j] = LU[p, j]
+                LU[p, j] = tmp
+            tmp_i = piv[k]
+            piv[k] = piv[p]
+            piv[p] = tmp_i
+        pivot = LU[k, k]
+        if pivot == 0.0:
+            continue
+        for i in range(k + 1, n):
+            LU[i, k] /= pivot
+            lik = LU[i, k]
+            if lik != 0.0:
+                for j in range(k + 1, n):
+                    LU[i, j] -= lik * LU[k, j]
+
+
+@njit(cache=True)
+def _lu_solve(LU, piv, b, x):
+    """
+    Solve A·x = b from the factors computed by `_lu_factor`, writing the solution into x.
+
+    Args:
+        LU (np.ndarray): Packed LU factors.
+        piv (np.ndarray): Row permutation.
+        b (np.ndarray): Right-hand side.
+        x (np.ndarray): Output buffer (must not alias b).
+    """
+    n = b.shape[0]
+    for i in range(n):
+        acc = b[piv[i]]
+        for j in range(i):
+            acc -= LU[i, j] * x[j]
+        x[i] = acc
+    for i in range(n - 1, -1, -1):
+        acc = x[i]
+        for j in range(i + 1, n):
+            acc -= LU[i, j] * x[j]
+        x[i] = acc / LU[i, i]
+
+
+@njit(cache=True)
+def _scaled_norm(v, y, y_new, rtol, atol):
+    """
+    Root-mean-square norm of v scaled by atol + rtol * max(|y|, |y_new|).
+    """
+    acc = 0.0
+    for i in range(v.shape[0]):
+        sc = atol + rtol * max(abs(y[i]), abs(y_new[i]))
+        acc += (v[i] / sc) ** 2
+    return np.sqrt(acc / v.shape[0])
+
+
+@njit(cache=True)
+def _initial_step(y0, f0, rtol, atol, span):
+    """
+    Initial step size from the scaled norms of the state and its derivative.
+    """
+    d0 = _scaled_norm(y0, y0, y0, rtol, atol)
+    d1 = _scaled_norm(f0, y0, y0, rtol, atol)
+    if d0 < 1e-5 or d1 < 1e-5:
+        h = 1e-6
+    else:
+        h = 0.01 * d0 / d1
+    return min(h, span)
+
+
+@njit(cache=True)
+def _step_factor(err):
+    """
+    Step-size factor of an order-4(3) pair, limited to [0.2, 5].
+    """
+    if err == 0.0:
+        return 5.0
+    return min(5.0, max(0.2, 0.9 * err ** -0.25))
+
+
+@njit
+def solve_sdirk(rhs, jac, y0, t, args, rtol=SDIRK_RTOL, atol=SDIRK_ATOL, max_steps=100000):
+    """
+    Integrate dy/dt = rhs(y, t, *args) with a compiled, adaptive SDIRK method.
+
+    Five-stage, L-stable SDIRK of order 4 with an embedded order-3 error estimate
+    (filtered through the iteration matrix for stiff components). Stage equations are
+    solved by simplified Newton iterations with one LU factorization of I - h·γ·J per
+    step; for linear systems they converge in a single iteration. Steps are shortened to
+    land exactly on the requested time points, so no interpolation is involved. The whole
+    time loop runs in compiled code on preallocated buffers, so the right-hand side and
+    Jacobian must be Numba functions; the driver is compiled once per (rhs, jac) pair and
+    process.
+
+    Args:
+        rhs (callable): Numba right-hand side `rhs(y, t, *args)`.
+        jac (callable): Numba Jacobian `jac(y, t, *args)` of shape (n, n).
+        y0 (np.ndarray): Initial state at t[0].
+        t (np.ndarray): Increasing time points.
+        args (tuple): Extra arguments of `rhs` and `jac`.
+        rtol (float): Relative tolerance.
+        atol (float): Absolute tolerance.
+        max_steps (int): Maximum number of step attempts.
+
+    Returns:
+        sol (np.ndarray): Solution of shape (len(t), n).
+    """
+    n = y0.shape[0]
+    sol = np.empty((t.shape[0], n))
+    sol[0] = y0
+    y = y0.copy()
+    Y = np.empty(n)
+    base = np.empty(n)
+    r = np.empty(n)
+    dY = np.empty(n)
+    err_vec = np.empty(n)
+    F = np.empty((5, n))
+    W = np.empty((n, n))
+    LU = np.empty((n, n))
+    piv = np.empty(n, dtype=np.int64)
+
+    tc = t[0]
+    h = _initial_step(y, rhs(y, tc, *args), rtol, atol, t[-1] - t[0])
+    eta = 1.0
+    steps = 0
+
+    for k in range(1, t.shape[0]):
+        t_end = t[k]
+        while tc < t_end:
+            steps += 1
+            if steps > max_steps:
+                raise RuntimeError("solve_sdirk: maximum number of steps exceeded")
+            h_step = h
+            clipped = tc + h_step >= t_end
+            if clipped:
+                h_step = t_end - tc
+            hg = h_step * SDIRK_GAMMA
+
+            # Iteration matrix I - h·γ·J, factorized once per step
+            J = jac(y, tc, *args)
+            for i in range(n):
+                for j in range(n):
+                    W[i, j] = -hg * J[i, j]
+                W[i, i] += 1.0
+            _lu_factor(W, LU, piv)
+
+            converged = True
+            for s in range(5):
+                # Explicit part of the stage and initial guess
+                for i in range(n):
+                    acc = y[i]
+                    for j in range(s):
+                        acc += h_step * SDIRK_A[s, j] * F[j, i]
+                    base[i] = acc
+                    Y[i] = acc
+
+                # Simplified Newton iterations for Y = base + h·γ·f(Y)
+                eta = max(eta, 2.2e-16) ** 0.8
+                dn_old = 1.0
+                converged = False
+                for it in range(7):
+                    fY = rhs(Y, tc + SDIRK_C[s] * h_step, *args)
+                    for i in range(n):
+                        r[i] = base[i] + hg * fY[i] - Y[i]
+                    _lu_solve(LU, piv, r, dY)
+                    for i in range(n):
+                        Y[i] += dY[i]
+                    dn = _scaled_norm(dY, y, Y, rtol, atol)
+                    if it > 0:
+                        theta = dn / dn_old
+                        if theta >= 0.99:
+                            break
+                        eta = theta / (1.0 - theta)
+                    if dn == 0.0 or eta * dn <= 0.03:
+                        converged = True
+                        break
+                    dn_old = dn
+                if not converged:
+                    break
+                for i in range(n):
+                    F[s, i] = (Y[i] - base[i]) / hg
+
+            if not converged:
+                # Newton failed: retry with a smaller step and a fresh convergence estimate
+                h = 0.5 * h_step
+                eta = 1.0
+                continue
+
+            # Error estimate filtered through the iteration matrix; the method is stiffly
+            # accurate, so the last stage is the new solution
+            for i in range(n):
+                acc = 0.0
+                for s in range(5):
+                    acc += SDIRK_E[s] * F[s, i]
+                r[i] = h_step * acc
+            _lu_solve(LU, piv, r, err_vec)
+            err = _scaled_norm(err_vec, y, Y, rtol, atol)
+            fac = _step_factor(err)
+            if err <= 1.0:
+                tc = t_end if clipped else tc + h_step
+                for i in range(n):
+                    y[i] = Y[i]
+                h = max(h, h_step * fac) if clipped else h_step * fac
+            else:
+                h = h_step * fac
+        sol[k] = y
+    return sol
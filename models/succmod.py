@@ -1,26 +1,30 @@
 import numpy as np
-from numba import njit
+from numba import njit, prange
 from scipy.integrate import odeint
 
-from config.constants import NORMALIZE_MODEL_OUTPUT
+from config.constants import NORMALIZE_MODEL_OUTPUT, ODE_SOLVER
+from models.solvers import solve_linear, solve_linear_batch, postprocess_batch, solve_linear_sensitivities, linear_sensitivity_terms, \
+    integrate_sensitivities, fit_vector_jacobian, postprocess_solution, postprocess_fit, constant_jacobian, solve_sdirk, \
+    DenseSolution, cached_dense_solution, select_solver, get_tolerances, solve_ivp_linear
 
 
 @njit(cache=True)
-def ode_core(y, t, A, B, C, D, S_rates, D_rates):
+def ode_core_into(y, A, B, C, D, S_rates, D_rates, dydt):
     """
-    The core of the ODE system for the successive ODE model.
+    Right-hand side of the successive ODE system written into a preallocated buffer.
 
     Args:
-        y (np.array): The current state of the system.
-        t (float): The current time.
-        A (float): The mRNA production rate.
-        B (float): The mRNA degradation rate.
-        C (float): The protein production rate.
-        D (float): The protein degradation rate.
-        S_rates (np.array): The phosphorylation rates for each site.
-        D_rates (np.array): The dephosphorylation rates for each site.
+        y: array of concentrations
+        A: mRNA production rate
+        B: mRNA degradation rate
+        C: protein production rate
+        D: protein degradation rate
+        S_rates: phosphorylation rates for each site
+        D_rates: dephosphorylation rates for each site
+        dydt: output buffer of the same length as y
+
     Returns:
-        dydt (np.array): The derivatives of the state variables.
+        dydt: the filled output buffer
     """
     # mRNA
     R = y[0]
@@ -46,8 +50,7 @@ def ode_core(y, t, A, B, C, D, S_rates, D_rates):
         # Add dephosphorylation feedback from the first phosphorylated site
         dP_dt += y[2]
 
-    # Prepare output array for derivatives
-    dydt = np.empty_like(y)
+    # Store the derivatives in the output buffer
     dydt[0] = dR_dt
     dydt[1] = dP_dt
 
@@ -89,6 +92,43 @@ def ode_core(y, t, A, B, C, D, S_rates, D_rates):
 
     return dydt
 
+@njit(cache=True)
+def ode_core(y, t, A, B, C, D, S_rates, D_rates):
+    """
+    The core of the ODE system for the successive ODE model.
+
+    Args:
+        y (np.array): The current state of the system.
+        t (float): The current time.
+        A (float): The mRNA production rate.
+        B (float): The mRNA degradation rate.
+        C (float): The protein production rate.
+        D (float): The protein degradation rate.
+        S_rates (np.array): The phosphorylation rates for each site.
+        D_rates (np.array): The dephosphorylation rates for each site.
+    Returns:
+        dydt (np.array): The derivatives of the state variables.
+    """
+    return ode_core_into(y, A, B, C, D, S_rates, D_rates, np.empty_like(y))
+
+@njit(cache=True)
+def odeint_rhs(y, t, A, B, C, D, S_rates, D_rates, dydt, jac):
+    """
+    Allocation-free right-hand side passed to odeint by `solve_ode`.
+
+    Args:
+        y: array of concentrations
+        t: time
+        A, B, C, D, S_rates, D_rates: same as in `ode_core`
+        dydt: output buffer reused across calls (odeint copies the result)
+        jac: precomputed system matrix; unused here, it shares the argument tuple
+            with `constant_jacobian`
+
+    Returns:
+        dydt: array of derivatives
+    """
+    return ode_core_into(y, A, B, C, D, S_rates, D_rates, dydt)
+
 
 @njit(cache=True)
 def unpack_params(params, num_psites):
@@ -111,7 +151,162 @@ def unpack_params(params, num_psites):
     D_rates = params[4 + num_psites : 4 + 2 * num_psites]
     return A, B, C, D, S_rates, D_rates
 
-def solve_ode(params, init_cond, num_psites, t):
+@njit(cache=True)
+def linear_system(A, B, C, D, S_rates, D_rates):
+    """
+    Build the linear form dy/dt = M·y + b of the successive ODE system.
+
+    Args:
+        A (float): The mRNA production rate.
+        B (float): The mRNA degradation rate.
+        C (float): The protein production rate.
+        D (float): The protein degradation rate.
+        S_rates (np.array): The phosphorylation rates for each site.
+        D_rates (np.array): The dephosphorylation rates for each site.
+    Returns:
+        M (np.array): The system matrix of shape (n + 2, n + 2).
+        b (np.array): The constant input vector of length n + 2.
+    """
+    num_psites = S_rates.shape[0]
+    M = np.zeros((num_psites + 2, num_psites + 2))
+    b = np.zeros(num_psites + 2)
+
+    # mRNA dynamics
+    b[0] = A
+    M[0, 0] = -B
+
+    # Protein dynamics
+    M[1, 0] = C
+    M[1, 1] = -D
+    if num_psites > 0:
+        M[1, 1] -= S_rates[0]
+        M[1, 2] = 1.0
+
+    # Phosphorylated sites: driven by the preceding species, drained by the next site
+    for i in range(num_psites):
+        M[2 + i, 1 + i] = S_rates[i]
+        M[2 + i, 2 + i] = -(1.0 + D_rates[i])
+        if i < num_psites - 1:
+            M[2 + i, 2 + i] -= S_rates[i + 1]
+            M[2 + i, 3 + i] = 1.0
+
+    return M, b
+
+@njit(cache=True)
+def ode_jacobian(y, t, A, B, C, D, S_rates, D_rates):
+    """
+    Jacobian of the successive ODE system with respect to the state (∂f/∂y).
+
+    Args:
+        y (np.array): The current state of the system.
+        t (float): The current time.
+        A (float): The mRNA production rate.
+        B (float): The mRNA degradation rate.
+        C (float): The protein production rate.
+        D (float): The protein degradation rate.
+        S_rates (np.array): The phosphorylation rates for each site.
+        D_rates (np.array): The dephosphorylation rates for each site.
+    Returns:
+        jac (np.array): Dense Jacobian of shape (n + 2, n + 2).
+    """
+    return linear_system(A, B, C, D, S_rates, D_rates)[0]
+
+
+@njit(cache=True)
+def param_jacobian(y, t, A, B, C, D, S_rates, D_rates):
+    """
+    Jacobian of the successive ODE system with respect to the parameters (∂f/∂θ),
+    with θ ordered as [A, B, C, D, S_1..S_n, D_1..D_n].
+
+    Args:
+        y (np.array): The current state of the system.
+        t (float): The current time.
+        A (float): The mRNA production rate.
+        B (float): The mRNA degradation rate.
+        C (float): The protein production rate.
+        D (float): The protein degradation rate.
+        S_rates (np.array): The phosphorylation rates for each site.
+        D_rates (np.array): The dephosphorylation rates for each site.
+    Returns:
+        jac (np.array): Dense Jacobian of shape (n + 2, 4 + 2n).
+    """
+    num_psites = S_rates.shape[0]
+    R = y[0]
+    P = y[1]
+    jac = np.zeros((num_psites + 2, 4 + 2 * num_psites))
+
+    # mRNA dynamics
+    jac[0, 0] = 1.0
+    jac[0, 1] = -R
+
+    # Protein dynamics
+    jac[1, 2] = R
+    jac[1, 3] = -P
+    if num_psites > 0:
+        jac[1, 4] = -P
+
+    # Phosphorylated sites: S_i drives site i, S_(i+1) drains it, D_i degrades it
+    for i in range(num_psites):
+        jac[2 + i, 4 + i] = y[1 + i]
+        if i < num_psites - 1:
+            jac[2 + i, 5 + i] = -y[2 + i]
+        jac[2 + i, 4 + num_psites + i] = -y[2 + i]
+
+    return jac
+
+
+@njit(cache=True)
+def sensitivity_rhs(z, t, A, B, C, D, S_rates, D_rates):
+    """
+    Right-hand side of the forward-sensitivity system z = [y, vec(∂y/∂θ)],
+    where d(∂y/∂θ)/dt = (∂f/∂y)·(∂y/∂θ) + ∂f/∂θ.
+
+    Args:
+        z (np.array): The augmented state of length (n + 2) * (5 + 2n).
+        t (float): The current time.
+        A, B, C, D, S_rates, D_rates: The model parameters as in `ode_core`.
+    Returns:
+        dzdt (np.array): The derivative of the augmented state.
+    """
+    n_states = S_rates.shape[0] + 2
+    n_params = 2 * n_states
+    y = z[:n_states]
+    sens = z[n_states:].reshape((n_states, n_params))
+    dzdt = np.empty_like(z)
+    dzdt[:n_states] = ode_core(y, t, A, B, C, D, S_rates, D_rates)
+    dsens = ode_jacobian(y, t, A, B, C, D, S_rates, D_rates) @ sens + param_jacobian(y, t, A, B, C, D, S_rates, D_rates)
+    dzdt[n_states:] = dsens.ravel()
+    return dzdt
+
+
+@njit(cache=True)
+def sensitivity_jacobian(z, t, A, B, C, D, S_rates, D_rates):
+    """
+    Block-diagonal Jacobian of the forward-sensitivity system. The state block and
+    every sensitivity column share ∂f/∂y; the coupling through ∂²f/∂θ∂y is omitted,
+    which only affects the Newton iteration of the stiff integrator, not the solution.
+
+    Args:
+        z (np.array): The augmented state of length (n + 2) * (5 + 2n).
+        t (float): The current time.
+        A, B, C, D, S_rates, D_rates: The model parameters as in `ode_core`.
+    Returns:
+        jac (np.array): The dense Jacobian of the augmented system.
+    """
+    n_states = S_rates.shape[0] + 2
+    n_blocks = 1 + 2 * n_states
+    J = ode_jacobian(z[:n_states], t, A, B, C, D, S_rates, D_rates)
+    jac = np.zeros((n_states * n_blocks, n_states * n_blocks))
+    jac[:n_states, :n_states] = J
+    # Sensitivities are stored row-major as sens[state, param]
+    for i in range(n_states):
+        for j in range(n_states):
+            for k in range(n_blocks - 1):
+                jac[n_states + i * (n_blocks - 1) + k, n_states + j * (n_blocks - 1) + k] = J[i, j]
+    return jac
+
+
+def solve_ode(params, init_cond, num_psites, t, dense=False):
     """
     Solve the ODE system using the given parameters and initial conditions.
     The function integrates the ODE system over time and returns the solution.
@@ -120,30 +315,125 @@ def solve_ode(params, init_cond, num_psites, t):
     :param init_cond:
     :param num_psites:
     :param t:
+    :param dense: if True, return the continuous solution starting at t[0] instead
+                  (a `DenseSolution`, cached per parameter set and initial condition)
     :return: solution, solution of phosphorylated sites
     """
 
     # Unpack the parameters
     A, B, C, D, S_rates, D_rates = unpack_params(params, num_psites)
 
-    # Call the odeint function to solve the ODE system
-    sol = np.clip(np.asarray(odeint(ode_core, init_cond, t,
-                                    args=(A, B, C, D, S_rates, D_rates))),  0, None)
+    if dense:
+        # Exact continuous solution; evaluating it on other time grids needs no integration
+        y0 = np.asarray(init_cond, dtype=float)
+        key = (__name__, np.asarray(params, dtype=float).tobytes(), y0.tobytes(), num_psites, float(t[0]))
+        return cached_dense_solution(key, lambda: DenseSolution(
+            *linear_system(A, B, C, D, S_rates, D_rates), y0, t[0], num_psites, 5, NORMALIZE_MODEL_OUTPUT))
+
+    # The system is linear: build M and b once and resolve the 'auto' policy on M
+    M, b = linear_system(A, B, C, D, S_rates, D_rates)
+    method = select_solver(M, t) if ODE_SOLVER == 'auto' else ODE_SOLVER
+    rtol, atol = get_tolerances()
+
+    if method in ('expm', 'eig'):
+        # Evaluate the exact solution of the linear system at the time points
+        sol = solve_linear(M, b, np.asarray(init_cond, dtype=float), t, method=method)
+    elif method == 'sdirk':
+        # Run the whole time loop in the compiled SDIRK integrator
+        sol = solve_sdirk(ode_core, ode_jacobian, np.asarray(init_cond, dtype=float), np.asarray(t, dtype=float),
+                          (A, B, C, D, S_rates, D_rates), rtol, atol)
+    elif method in ('bdf', 'radau'):
+        # Implicit solve_ivp methods with the constant Jacobian
+        sol = solve_ivp_linear(M, b, np.asarray(init_cond, dtype=float), t, method, rtol, atol)
+    else:
+        # Call the odeint function to solve the ODE system; the system is linear, so the
+        # Jacobian is the constant system matrix and both callbacks reuse preallocated buffers
+        sol = odeint(odeint_rhs, init_cond, t, args=(A, B, C, D, S_rates, D_rates, np.empty(M.shape[0]), M),
+                     Dfun=constant_jacobian, rtol=rtol, atol=atol)
+
+    # Clip, normalize (if NORMALIZE_MODEL_OUTPUT is True) and extract the mRNA
+    # and phosphorylated sites in a single pass
+    sol = np.asarray(sol)
+    fit = postprocess_fit(sol, np.asarray(init_cond, dtype=float), num_psites, 5, NORMALIZE_MODEL_OUTPUT)
+
+    # Return the solution and the fit vector
+    return sol, fit
+
+
+def solve_ode_with_sensitivities(params, init_cond, num_psites, t):
+    """
+    Solve the successive ODE system together with its parameter sensitivities in a single pass.
+
+    With the 'expm' or 'eig' backends (or when the 'auto' policy picks 'eig') the state and
+    sensitivities are propagated exactly through the matrix exponential; otherwise the
+    forward-sensitivity system is integrated with odeint at the current stage tolerances.
+
+    :param params: array of parameters
+    :param init_cond: initial conditions
+    :param num_psites: number of phosphorylation sites
+    :param t: time points
+    :return: solution, fit vector, and Jacobian of the fit vector of shape (len(fit), 4 + 2 * num_psites)
+    """
+    A, B, C, D, S_rates, D_rates = unpack_params(params, num_psites)
+    y0 = np.asarray(init_cond, dtype=float)
+
+    M, b = linear_system(A, B, C, D, S_rates, D_rates)
+    method = select_solver(M, t) if ODE_SOLVER == 'auto' else ODE_SOLVER
+
+    if method in ('expm', 'eig'):
+        dM, db = linear_sensitivity_terms(
+            lambda y: param_jacobian(y, 0.0, A, B, C, D, S_rates, D_rates), num_psites + 2
+        )
+        raw, sens = solve_linear_sensitivities(M, b, dM, db, y0, t, method=method)
+    else:
+        raw, sens = integrate_sensitivities(sensitivity_rhs, sensitivity_jacobian, y0, 4 + 2 * num_psites, t,
+                                            (A, B, C, D, S_rates, D_rates))
+
+    jac = fit_vector_jacobian(raw, sens, y0, num_psites, 5, NORMALIZE_MODEL_OUTPUT)
+    sol, fit = postprocess_solution(raw, y0, num_psites, 5, NORMALIZE_MODEL_OUTPUT)
+    return sol, fit, jac
+
+@njit(cache=True, parallel=True)
+def linear_system_batch(param_matrix, num_psites):
+    """
+    Build the linear forms of the successive ODE system for every row of a parameter matrix.
 
-    # Normalize the solution if NORMALIZE_MODEL_OUTPUT is True
-    if NORMALIZE_MODEL_OUTPUT:
-        # Normalize the solution to the initial condition
-        norm_init = np.array(init_cond, dtype=sol.dtype)
-        # Calculate the reciprocal of the norm_init
-        recip = 1.0 / norm_init
-        # Normalize the solution by multiplying by the reciprocal of the norm_init
-        sol *= recip[np.newaxis, :]
+    Args:
+        param_matrix: parameter sets of shape (N, 4 + 2 * num_psites)
+        num_psites: number of phosphorylation sites
+
+    Returns:
+        Ms: system matrices of shape (N, num_psites + 2, num_psites + 2)
+        bs: constant input vectors of shape (N, num_psites + 2)
+    """
+    N = param_matrix.shape[0]
+    Ms = np.empty((N, num_psites + 2, num_psites + 2))
+    bs = np.empty((N, num_psites + 2))
+    for i in prange(N):
+        A, B, C, D, S_rates, D_rates = unpack_params(param_matrix[i], num_psites)
+        M, b = linear_system(A, B, C, D, S_rates, D_rates)
+        Ms[i] = M
+        bs[i] = b
+    return Ms, bs
+
+def solve_ode_batch(param_matrix, init_cond, num_psites, t):
+    """
+    Solve the successive ODE system for many parameter sets in one compiled, parallel call.
 
-    # Extract the mRNA from the solution
-    R_fitted = sol[5:, 0].T
+    The system is linear, so every parameter set is propagated exactly between the
+    time points with the matrix exponential; the output is post-processed like `solve_ode`.
 
-    # Extract the phosphorylated sites from the solution
-    P_fitted = sol[:, 2:].T
+    Args:
+        param_matrix: parameter sets of shape (N, 4 + 2 * num_psites)
+        init_cond: initial conditions shared by all parameter sets
+        num_psites: number of phosphorylation sites
+        t: time points
 
-    # Return the solution and the phosphorylated sites
-    return sol, np.concatenate((R_fitted.flatten(), P_fitted.flatten()))
+    Returns:
+        sol: solutions of shape (N, len(t), num_psites + 2)
+    """
+    param_matrix = np.ascontiguousarray(np.atleast_2d(param_matrix), dtype=float)
+    init_cond = np.asarray(init_cond, dtype=float)
+    Ms, bs = linear_system_batch(param_matrix, num_psites)
+    sol = solve_linear_batch(Ms, bs, init_cond, np.asarray(t, dtype=float))
+    return postprocess_batch(sol, init_cond, NORMALIZE_MODEL_OUTPUT)
@@ -0,0 +1,21 @@
+from models.network import ReactionNetwork
+
+# Successive phosphorylation model declared as a reaction network (select with ODE_MODEL = 'succnet').
+# Same equations and steady state as `succmod` (`steady.initsucc`); copy this file and edit the reactions
+# to add a site-specific variant.
+NETWORK = ReactionNetwork(
+    name='SuccessiveNetwork',
+    species=['R', 'P', 'P{i}'],
+    parameters=['A', 'B', 'C', 'D', 'S{i}', 'D{i}'],
+    reactions=[
+        '       -> R      : A',      # transcription
+        'R      ->        : B',      # mRNA degradation
+        'R      -> R + P  : C',      # translation
+        'P      ->        : D',      # protein degradation
+        'P      -> P1     : S1',     # first phosphorylation
+        'P{i-1} -> P{i}   : S{i}',   # successive phosphorylation (i >= 2)
+        'P1     -> P      : 1',      # dephosphorylation of the first site
+        'P{i+1} -> P{i}   : 1',      # successive dephosphorylation
+        'P{i}   ->        : D{i}',   # degradation of phosphorylated states
+    ],
+)
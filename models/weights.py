@@ -52,24 +52,46 @@ def early_emphasis(p_data, time_points, num_psites):
     return custom_weights.ravel()
 
 
-def get_protein_weights(
-        gene,
-        input1_path=Path(__file__).resolve().parent.parent / 'processing' / 'input1_wstd.csv',
-        input2_path=Path(__file__).resolve().parent.parent / 'kinopt' / 'data' / 'input2.csv'
-):
+# Default sources of the measurement uncertainties (x1_std ... x14_std per GeneID and Psite)
+WEIGHTS_INPUT1 = current_dir.parent / 'processing' / 'input1_wstd.csv'
+WEIGHTS_INPUT2 = current_dir.parent / 'kinopt' / 'data' / 'input2.csv'
+
+# Weight indices keyed on the source files and their modification times
+_weight_indices = {}
+
+# Memoised weight options, keyed on the gene and the arguments they are computed from
+_weight_options_cache = {}
+
+
+def _file_key(path):
     """
-    Function to extract weights for a specific gene from the input files.
+    Identify a source file by its path, size and modification time.
+
+    Args:
+        path (Path): Path to the file.
+
+    Returns:
+        tuple: (path, size, mtime in ns).
+    """
+    stat = Path(path).stat()
+    return str(path), stat.st_size, stat.st_mtime_ns
+
+
+def build_weight_index(input1_path=WEIGHTS_INPUT1, input2_path=WEIGHTS_INPUT2):
+    """
+    Build the gene -> weight index from the input files.
+
+    The two files are read and merged once; each gene maps to its read-only σ vector
+    (the x1_std ... x14_std values of its phosphorylation sites, in the order of input2.csv),
+    or to the error message describing the (GeneID, Psite) pairs missing from input1_wstd.csv.
 
     Args:
-        gene (str): Gene ID to filter the weights.
         input1_path (Path): Path to the input1_wstd.csv file.
         input2_path (Path): Path to the input2.csv file.
 
     Returns:
-        weights (numpy.ndarray): Extracted weights for the specified gene.
+        dict: Mapping of GeneID to a weight vector or an error message.
     """
-
-    # Load input1_wstd and input2
     input1 = pd.read_csv(input1_path)
     input2 = pd.read_csv(input2_path)
 
@@ -77,26 +99,70 @@ def get_protein_weights(
     input1.columns = input1.columns.str.strip()
     input2.columns = input2.columns.str.strip()
 
-    # Filter input2 for the given GeneID
-    input2_gene = input2[input2['GeneID'] == gene]
+    merged = pd.merge(input2, input1, on=['GeneID', 'Psite'], how='left')
+    missing_rows = merged.isnull().any(axis=1).to_numpy()
+    std_columns = [f'x{i}_std' for i in range(1, 15)]
+
+    index = {}
+    for gene, rows in merged.groupby('GeneID', sort=False).indices.items():
+        if missing_rows[rows].any():
+            missing = merged.iloc[rows][missing_rows[rows]][['GeneID', 'Psite']]
+            index[gene] = f"Missing (GeneID, Psite) pairs for {gene} in input1_wstd.csv:\n{missing}"
+        else:
+            weights = merged.iloc[rows][std_columns].to_numpy().flatten()
+            weights.setflags(write=False)
+            index[gene] = weights
+    return index
 
-    if input2_gene.empty:
-        raise ValueError(f"No entries for GeneID {gene} found in input2.csv")
 
-    # Merge to get corresponding x1_std to x14_std values
-    merged = pd.merge(
-        input2_gene, input1,
-        on=['GeneID', 'Psite'],
-        how='left'
-    )
+def get_weight_index(input1_path=WEIGHTS_INPUT1, input2_path=WEIGHTS_INPUT2):
+    """
+    Return the weight index of the input files, building it on first use.
 
-    if merged.isnull().any().any():
-        missing = merged[merged.isnull().any(axis=1)][['GeneID', 'Psite']]
-        raise ValueError(f"Missing (GeneID, Psite) pairs for {gene} in input1_wstd.csv:\n{missing}")
+    The index is kept for the lifetime of the process and rebuilt only when one of the
+    files changes (size or modification time).
+
+    Args:
+        input1_path (Path): Path to the input1_wstd.csv file.
+        input2_path (Path): Path to the input2.csv file.
+
+    Returns:
+        dict: Mapping of GeneID to a weight vector or an error message.
+    """
+    key = (_file_key(input1_path), _file_key(input2_path))
+    index = _weight_indices.get(key)
+    if index is None:
+        index = build_weight_index(input1_path, input2_path)
+        _weight_indices.clear()
+        _weight_indices[key] = index
+    return index
 
-    # Extract weights
-    std_columns = [f'x{i}_std' for i in range(1, 15)]
-    weights = merged[std_columns].to_numpy().flatten()
+
+def get_protein_weights(
+        gene,
+        input1_path=WEIGHTS_INPUT1,
+        input2_path=WEIGHTS_INPUT2
+):
+    """
+    Function to extract weights for a specific gene from the input files.
+
+    The lookup goes through the in-memory index of `get_weight_index`, so the files are only
+    read once per process.
+
+    Args:
+        gene (str): Gene ID to filter the weights.
+        input1_path (Path): Path to the input1_wstd.csv file.
+        input2_path (Path): Path to the input2.csv file.
+
+    Returns:
+        weights (numpy.ndarray): Extracted weights for the specified gene (read-only).
+    """
+    weights = get_weight_index(input1_path, input2_path).get(gene)
+
+    if weights is None:
+        raise ValueError(f"No entries for GeneID {gene} found in input2.csv")
+    if isinstance(weights, str):
+        raise ValueError(weights)
 
     return weights
 
@@ -194,3 +260,39 @@ def get_weight_options(target, t_target, num_psites, use_regularization, reg_len
         base_weights = {"uncertainties_from_data": base_weights["uncertainties_from_data"]}
 
     return base_weights
+
+
+def gene_weight_options(gene, target, time_points, num_psites, use_regularization, reg_len, p_data):
+    """
+    Memoised weight options of a gene.
+
+    Computes the early-emphasis and measurement-uncertainty weights and the resulting
+    `get_weight_options` once per gene and argument set; later calls (e.g. further λ values
+    handled by the same worker, or the final fit) return the cached dictionary.
+
+    Args:
+        gene (str): Gene ID.
+        target (numpy.ndarray): The target data for which weights are calculated.
+        time_points (numpy.ndarray): The time points corresponding to the target data.
+        num_psites (int): Number of phosphorylation sites.
+        use_regularization (bool): Flag to indicate if regularization is used.
+        reg_len (int): Length of the regularization term.
+        p_data (numpy.ndarray): Phosphorylation data of shape (num_psites, n_times).
+
+    Returns:
+        dict: A dictionary containing different weight options.
+    """
+    target = np.ascontiguousarray(target, dtype=np.float64)
+    time_points = np.ascontiguousarray(time_points, dtype=np.float64)
+    key = (gene, target.tobytes(), time_points.tobytes(), num_psites, bool(use_regularization), reg_len)
+    options = _weight_options_cache.get(key)
+    if options is None:
+        if len(_weight_options_cache) >= 256:
+            _weight_options_cache.clear()
+        early_weights = early_emphasis(np.ascontiguousarray(p_data, dtype=np.float64), time_points, num_psites)
+        options = get_weight_options(target, time_points, num_psites, use_regularization, reg_len,
+                                     early_weights, get_protein_weights(gene))
+        for sigma in options.values():
+            sigma.setflags(write=False)
+        _weight_options_cache[key] = options
+    return options
@@ -0,0 +1,215 @@
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from config.config import score_fit
+from config.constants import ODE_MODEL, USE_REGULARIZATION, USE_CUSTOM_WEIGHTS, INITIAL_GUESS, BATCH_MAX_ITER, \
+    BATCH_TOL
+from config.logconf import setup_logger
+from models import solve_ode_batch
+from models.weights import gene_weight_options
+from .initguess import initial_guess
+from .normest import parameter_bounds, model_jacobian, fit_covariance, finalize_estimate, _format_lambda
+
+logger = setup_logger()
+
+
+def batch_model_vectors(X, lams, init_cond, num_psites, time_points, r_len, use_regularization=True):
+    """
+    Fitted model vectors of many parameter sets, evaluated in one `solve_ode_batch` call.
+
+    Args:
+        X: Parameters (as seen by the optimiser) of shape (N, num_params).
+        lams: Regularization parameter of every row, shape (N,).
+        init_cond: Initial conditions shared by all rows.
+        num_psites: Number of phosphorylation sites.
+        time_points: Time points.
+        r_len: Number of mRNA rows of the fit vector.
+        use_regularization: Whether the regularization rows are part of the model vector.
+
+    Returns:
+        Model vectors [R(t[-r_len:]), P_1(t), ..., P_k(t), regularization] of shape (N, rows).
+    """
+    param_matrix = np.exp(X) if ODE_MODEL == 'randmod' else X
+    sol = solve_ode_batch(param_matrix, init_cond, num_psites, time_points)
+    N, T, _ = sol.shape
+    parts = [sol[:, T - r_len:, 0], sol[:, :, 2:2 + num_psites].transpose(0, 2, 1).reshape(N, -1)]
+    if use_regularization:
+        parts.append(lams[:, np.newaxis] / X.shape[1] * np.square(X))
+    return np.concatenate(parts, axis=1)
+
+
+def batch_least_squares(X0, targets, sigmas, lams, free_bounds, init_cond, num_psites, time_points, r_len,
+                        use_regularization=True, max_iter=BATCH_MAX_ITER, tol=BATCH_TOL):
+    """
+    Independent weighted least-squares problems of identical shape, solved together.
+
+    The stacked problem is block-diagonal, so every member takes its own projected
+    Levenberg-Marquardt step; parameters at a bound that the gradient pushes outwards are held.
+    Each iteration evaluates the trial points of all active members, and the forward-difference
+    Jacobians of the members whose step was accepted, in one batched call. Members drop out of
+    the batch once their relative cost decrease or step falls below `tol`, or their damping
+    diverges.
+
+    Args:
+        X0: Starting parameters of shape (N, num_params).
+        targets: Target vectors of shape (N, rows).
+        sigmas: Weights of shape (N, rows).
+        lams: Regularization parameters of shape (N,).
+        free_bounds: Parameter bounds shared by all members.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        time_points: Time points for the model fitting.
+        r_len: Number of mRNA rows of the fit vector.
+        use_regularization: Whether the regularization rows are part of the model vector.
+        max_iter: Maximum number of iterations.
+        tol: Relative tolerance on the cost decrease and on the step.
+
+    Returns:
+        Tuple of the parameters reached (N, num_params), the costs 0.5 * ||r||² (N,) and
+        whether each member converged (N,).
+    """
+    lower, upper = (np.asarray(b, dtype=float) for b in free_bounds)
+    X = np.clip(np.array(X0, dtype=float), lower, upper)
+    N, P = X.shape
+    lams = np.asarray(lams, dtype=float)
+
+    def residuals(X, idx):
+        return (batch_model_vectors(X, lams[idx], init_cond, num_psites, time_points, r_len,
+                                    use_regularization) - targets[idx]) / sigmas[idx]
+
+    def jacobians(X, idx, res):
+        # Forward differences, backward where the step would leave the box
+        h = np.sqrt(np.finfo(float).eps) * np.maximum(np.abs(X), 1.0)
+        h = np.where(X + h > upper, -h, h)
+        shifted = X[:, np.newaxis, :] + h[:, np.newaxis, :] * np.eye(P)[np.newaxis]
+        res_shift = residuals(shifted.reshape(-1, P), np.repeat(idx, P)).reshape(len(idx), P, -1)
+        return ((res_shift - res[:, np.newaxis, :]) / h[:, :, np.newaxis]).transpose(0, 2, 1)
+
+    all_idx = np.arange(N)
+    res = residuals(X, all_idx)
+    cost = 0.5 * np.sum(np.square(res), axis=1)
+    jac = jacobians(X, all_idx, res)
+    mu, nu = np.full(N, 1e-3), np.full(N, 2.0)
+    active = np.ones(N, dtype=bool)
+    converged = np.zeros(N, dtype=bool)
+
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+        J, r = jac[idx], res[idx]
+        JtJ = np.einsum('nri,nrj->nij', J, J)
+        grad = np.einsum('nri,nr->ni', J, r)
+        damping = mu[idx, np.newaxis] * np.maximum(np.diagonal(JtJ, axis1=1, axis2=2), 1e-12)
+        A = JtJ + damping[:, :, np.newaxis] * np.eye(P)[np.newaxis]
+        # Parameters at a bound that the gradient pushes outwards are held there
+        held = ((X[idx] <= lower) & (grad > 0)) | ((X[idx] >= upper) & (grad < 0))
+        A = np.where(held[:, :, np.newaxis] | held[:, np.newaxis, :], 0.0, A)
+        A[:, np.arange(P), np.arange(P)] = np.where(held, 1.0, A[:, np.arange(P), np.arange(P)])
+        step = np.linalg.solve(A, -np.where(held, 0.0, grad)[:, :, np.newaxis])[:, :, 0]
+        X_trial = np.clip(X[idx] + step, lower, upper)
+
+        res_trial = residuals(X_trial, idx)
+        cost_trial = 0.5 * np.sum(np.square(res_trial), axis=1)
+        accept = np.isfinite(cost_trial) & (cost_trial < cost[idx])
+        # Gain ratio of the actual to the decrease predicted by the damped linear model
+        taken = X_trial - X[idx]
+        predicted = -np.einsum('ni,ni->n', taken, grad) - 0.5 * np.einsum('ni,nij,nj->n', taken, JtJ, taken)
+        gain = (cost[idx] - cost_trial) / np.maximum(predicted, np.finfo(float).tiny)
+        moved = np.linalg.norm(taken, axis=1)
+
+        done = accept & (((cost[idx] - cost_trial) <= tol * cost[idx]) |
+                         (moved <= tol * (np.linalg.norm(X[idx], axis=1) + tol)))
+        done |= ~accept & (mu[idx] > 1e10)
+
+        # Damping update of Nielsen (1999)
+        acc, rej = idx[accept], idx[~accept]
+        X[acc], res[acc], cost[acc] = X_trial[accept], res_trial[accept], cost_trial[accept]
+        mu[acc] *= np.maximum(1 / 3, 1 - (2 * np.minimum(gain[accept], 1.0) - 1) ** 3)
+        nu[acc] = 2.0
+        mu[rej] *= nu[rej]
+        nu[rej] *= 2.0
+        converged[idx[done & accept]] = True
+        active[idx[done]] = False
+
+        refresh = acc[active[acc]]
+        if refresh.size:
+            jac[refresh] = jacobians(X[refresh], refresh, res[refresh])
+
+    return X, cost, converged
+
+
+def batch_normest(genes, p_datas, r_datas, init_cond, num_psites, time_points, bounds, bootstraps,
+                  lambdas=np.logspace(-2, 0, 10), use_regularization=USE_REGULARIZATION):
+    """
+    Estimate the parameters of several genes with the same number of phosphorylation sites together.
+
+    Every (gene, λ, weight scheme) candidate of the regularization search is a member of one
+    `batch_least_squares` call. For each gene the candidate with the best `score_fit` is kept, its
+    covariance is taken from the analytic Jacobian, and it goes through the same confidence
+    intervals, bootstrap and outputs as `normest`.
+
+    Args:
+        genes: Gene names.
+        p_datas: Phosphorylation data of every gene, each of shape (num_psites, len(time_points)).
+        r_datas: mRNA data of every gene.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        time_points: Time points for the model fitting.
+        bounds: Parameter bounds for the optimization.
+        bootstraps: Number of bootstrap iterations.
+        lambdas: Candidate regularization parameters.
+        use_regularization: Whether to use regularization in the fitting process.
+
+    Returns:
+        Dictionary mapping every gene to the result of `normest` (estimated parameters,
+        model fits, error values and regularization term).
+    """
+    free_bounds = parameter_bounds(bounds, num_psites)
+    lambdas = lambdas if use_regularization else np.zeros(1)
+    rows = []
+    for gene, p_data, r_data in zip(genes, p_datas, r_datas):
+        np.random.seed(42)
+        if INITIAL_GUESS == 'data':
+            p0 = initial_guess(gene, p_data, r_data, init_cond, num_psites, time_points, free_bounds)
+        else:
+            p0 = np.array([np.random.uniform(low=l, high=u) for l, u in zip(*free_bounds)])
+        target = np.concatenate([r_data.flatten(), p_data.flatten()])
+        target_fit = np.concatenate([target, np.zeros(len(p0))]) if use_regularization else target
+        options = gene_weight_options(gene, target, time_points, num_psites, use_regularization, len(p0), p_data)
+        for lam in lambdas:
+            for key, sigma in options.items():
+                rows.append((gene, p0, target, target_fit, lam, key, sigma))
+
+    r_len = np.asarray(r_datas[0]).size
+    logger.info(f"[{num_psites} sites] Fitting {len(genes)} genes as one batch of {len(rows)} candidates...")
+    X, _, converged = batch_least_squares(
+        np.array([row[1] for row in rows]), np.array([row[3] for row in rows]), np.array([row[6] for row in rows]),
+        np.array([row[4] for row in rows]), free_bounds, init_cond, num_psites, time_points, r_len,
+        use_regularization
+    )
+    model = batch_model_vectors(X, np.zeros(len(rows)), init_cond, num_psites, time_points, r_len, False)
+
+    best = {}
+    for i, (gene, _, target, _, _, _, _) in enumerate(rows):
+        score = score_fit(np.exp(X[i]) if ODE_MODEL == 'randmod' else X[i], target, model[i])
+        if gene not in best or score < best[gene][1]:
+            best[gene] = (i, score)
+
+    results = {}
+    for gene in genes:
+        i, score = best[gene]
+        _, p0, target, target_fit, lam, key, sigma = rows[i]
+        if not converged[i]:
+            logger.warning(f"[{gene}]      Batched fit did not converge in {BATCH_MAX_ITER} iterations")
+        logger.info(f"[{gene}]      Using λ = {_format_lambda(lam, p0)}")
+        logger.info(f"[{gene}]      Using '{' '.join(w.capitalize() for w in key.split('_'))}' as weights")
+        logger.info(f"[{gene}]      Fit Score: {score:.2f}")
+        jac = model_jacobian(X[i], init_cond, num_psites, time_points, lam, use_regularization) / sigma[:, np.newaxis]
+        fun = (np.concatenate([model[i], lam / len(X[i]) * np.square(X[i])]) if use_regularization
+               else model[i]) - target_fit
+        fit = OptimizeResult(x=X[i], jac=jac, fun=fun / sigma, cost=0.5 * np.sum(np.square(fun / sigma)))
+        pcov = fit_covariance(fit, absolute_sigma=not USE_CUSTOM_WEIGHTS)
+        results[gene] = finalize_estimate(gene, X[i], pcov, target, target_fit, sigma, lam, use_regularization,
+                                          free_bounds, init_cond, num_psites, time_points, bootstraps)
+    return results
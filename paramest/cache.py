@@ -0,0 +1,118 @@
+import gzip
+import hashlib
+import os
+import pickle
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from config.constants import PROJECT_ROOT, RESULT_CACHE_DIR
+from config.logconf import setup_logger
+from models.weights import get_protein_weights
+
+logger = setup_logger()
+
+# Packages whose source determines the result of a gene
+CODE_PACKAGES = ('config', 'models', 'paramest', 'steady', 'knockout', 'sensitivity')
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """
+    Hash of the source of the packages that produce a gene result.
+
+    Any edit of the model, estimation or configuration code (including config/constants.py)
+    changes it, so results computed by other code are never reused.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    for package in CODE_PACKAGES:
+        for path in sorted((PROJECT_ROOT / package).rglob('*.py')):
+            digest.update(str(path.relative_to(PROJECT_ROOT)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def gene_key(gene, kinase_data, mrna_data, time_points, bounds, bootstraps):
+    """
+    Content address of the result of one gene.
+
+    Hashes the gene's phosphorylation and mRNA rows, the time points, the parameter bounds, the
+    number of bootstraps, the gene's measurement weights and the code version.
+
+    Args:
+        gene (str): Gene name.
+        kinase_data (pd.DataFrame): DataFrame containing kinase data.
+        mrna_data (pd.DataFrame): DataFrame containing mRNA data.
+        time_points (list): List of time points for the experiment.
+        bounds (dict): Bounds for parameter estimation.
+        bootstraps (int): Number of bootstrap iterations.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    digest.update(code_version().encode())
+    digest.update(str(gene).encode())
+    for rows in (kinase_data[kinase_data['Gene'] == gene], mrna_data[mrna_data['mRNA'] == gene]):
+        digest.update(rows.to_csv(index=False).encode())
+    digest.update(np.asarray(time_points, dtype=float).tobytes())
+    digest.update(repr(sorted((name, tuple(map(float, bound))) for name, bound in bounds.items())).encode())
+    digest.update(str(int(bootstraps)).encode())
+    try:
+        digest.update(np.asarray(get_protein_weights(gene), dtype=float).tobytes())
+    except Exception as e:
+        # Genes without weights fail the same way on every run
+        digest.update(str(e).encode())
+    return digest.hexdigest()
+
+
+def _path(key, cache_dir):
+    return Path(cache_dir) / key[:2] / f"{key}.pkl.gz"
+
+
+def load_result(key, cache_dir=RESULT_CACHE_DIR):
+    """
+    Load a cached gene result.
+
+    Args:
+        key (str): Key from `gene_key`.
+        cache_dir (str or Path): Cache directory. Defaults to RESULT_CACHE_DIR.
+
+    Returns:
+        dict or None: The result of `process_gene`, or None if it is not cached or unreadable.
+    """
+    path = _path(key, cache_dir)
+    if not path.is_file():
+        return None
+    try:
+        with gzip.open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable cache entry {path.name}: {e}")
+        return None
+
+
+def store_result(key, result, cache_dir=RESULT_CACHE_DIR):
+    """
+    Store a gene result. The file is written under a temporary name and renamed, so an
+    interrupted run never leaves a truncated entry.
+
+    Args:
+        key (str): Key from `gene_key`.
+        result (dict): Result of `process_gene`.
+        cache_dir (str or Path): Cache directory. Defaults to RESULT_CACHE_DIR.
+    """
+    path = _path(key, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with gzip.open(tmp, 'wb', compresslevel=6) as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception as e:
+        logger.warning(f"[{result.get('gene')}]      Could not cache the result: {e}")
+        tmp.unlink(missing_ok=True)
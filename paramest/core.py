@@ -1,19 +1,55 @@
 import os
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import pandas as pd
 from sklearn.metrics import mean_squared_error, mean_absolute_error
-from knockout import apply_knockout, generate_knockout_combinations
-from config.constants import get_param_names, generate_labels, OUT_DIR, SENSITIVITY_ANALYSIS, TIME_POINTS
+from knockout import knockout_screen, plot_knockout_screen
+from config.constants import get_param_names, generate_labels, OUT_DIR, SENSITIVITY_ANALYSIS, TIME_POINTS, \
+    GENE_EXECUTOR, ESTIMATION_MODE, BATCH_SIZE, RESULT_CACHE, KNOCKOUT_SITE_ORDER, KNOCKOUT_PLOTS
 from models.diagram import illustrate
-from paramest.toggle import estimate_parameters
+from paramest.toggle import estimate_parameters, estimate_parameters_batch
+from paramest.normest import set_lambda_workers
+from paramest.pool import warm_up, MP_CONTEXT
+from paramest.cache import gene_key, load_result, store_result
 from sensitivity import sensitivity_analysis
 from models import solve_ode
-from steady import initial_condition
+from steady import initial_condition, precompute_initial_conditions
 from plotting import Plotter
 from config.logconf import setup_logger
 
 logger = setup_logger()
 
+# Executors selectable through GENE_EXECUTOR. There is no thread executor: gene workers keep
+# per-process state (`_worker_data`, the λ workers) and plot with pyplot, which is not thread-safe.
+EXECUTORS = {'process': partial(ProcessPoolExecutor, mp_context=MP_CONTEXT)}
+
+# Input tables of a gene-level worker, set once per worker by `_init_gene_worker`
+_worker_data = {}
+
+
+def gene_arrays(gene, kinase_data, mrna_data):
+    """
+    Extract the measurements of one gene.
+
+    Args:
+        gene (str): Gene name.
+        kinase_data (pd.DataFrame): DataFrame containing kinase data.
+        mrna_data (pd.DataFrame): DataFrame containing mRNA data.
+
+    Returns:
+        tuple: Site labels, phosphorylation data (one row per site) and mRNA data.
+    """
+    # Extract protein-group data
+    gene_data = kinase_data[kinase_data['Gene'] == gene]
+
+    # Extract mRNA data
+    rna_data = mrna_data[mrna_data['mRNA'] == gene]
+
+    # Get the residue and position values, the FC values for TIME_POINTS and for TIME_POINTS_RNA
+    return gene_data['Psite'].values, gene_data.iloc[:, 2:].values, rna_data.iloc[:, 1:].values
+
+
 def process_gene(
         gene,
         kinase_data,
@@ -21,7 +57,8 @@ def process_gene(
         time_points,
         bounds,
         bootstraps=0,
-        out_dir=OUT_DIR
+        out_dir=OUT_DIR,
+        estimate=None
 ):
     """
     Process a single gene by estimating its parameters and generating plots.
@@ -34,6 +71,8 @@ def process_gene(
         bounds (tuple): Bounds for parameter estimation.
         bootstraps (int, optional): Number of bootstrap iterations. Defaults to 0.
         out_dir (str, optional): Output directory for saving results. Defaults to OUT_DIR.
+        estimate (tuple, optional): Result of `estimate_parameters` computed beforehand (batched
+            estimation); if None, the parameters are estimated here.
 
     Returns:
         - gene: The gene being processed.
@@ -51,36 +90,24 @@ def process_gene(
         - perturbation_analysis: Sensitivity analysis results.
         - perturbation_curves_params: Trajectories with parameters for sensitivity analysis.
         - knockout_results: Dictionary of knockout results.
+        - knockout_effects: Effect sizes of the knockouts against the wild type.
         - regularization: Regularization value used in parameter estimation.
 
     """
-    # Extract protein-group data
-    gene_data = kinase_data[kinase_data['Gene'] == gene]
-
-    # Extract mRNA data
-    rna_data = mrna_data[mrna_data['mRNA'] == gene]
+    # Extract the site labels and the protein-group and mRNA data
+    psite_values, P_data, R_data = gene_arrays(gene, kinase_data, mrna_data)
 
     # Get the number of phosphorylation sites
-    num_psites = gene_data.shape[0]
-
-    # Get the residue and position values
-    psite_values = gene_data['Psite'].values
-
-    # Get the FC value for TIME_POINTS
-    P_data = gene_data.iloc[:, 2:].values
-
-    # Get the FC value for TIME_POINTS_RNA
-    R_data = rna_data.iloc[:, 1:].values
+    num_psites = P_data.shape[0]
 
     # Get initial conditions
     init_cond = initial_condition(num_psites)
 
-    logger.info(f"[{gene}]      Fitting to data...")
-
     # Estimate parameters
-    model_fits, estimated_params, seq_model_fit, errors, regularization_val = estimate_parameters(
-        gene, P_data, R_data, init_cond, num_psites, time_points, bounds, bootstraps
-    )
+    if estimate is None:
+        logger.info(f"[{gene}]      Fitting to data...")
+        estimate = estimate_parameters(gene, P_data, R_data, init_cond, num_psites, time_points, bounds, bootstraps)
+    model_fits, estimated_params, seq_model_fit, errors, regularization_val = estimate
 
     # Error Metrics
     mse = mean_squared_error(np.concatenate((R_data.flatten(), P_data.flatten())), seq_model_fit.flatten())
@@ -98,8 +125,10 @@ def process_gene(
     for i, name in enumerate(get_param_names(num_psites)):
         gene_psite_dict_local[name] = [final_params[i]]
 
-    # Solve ODE with final parameters
-    sol_full, _ = solve_ode(final_params, init_cond, num_psites, time_points)
+    # Solve ODE with final parameters; the continuous solution is cached, so any
+    # further time grid is evaluated without integrating again
+    final_solution = solve_ode(final_params, init_cond, num_psites, time_points, dense=True)
+    sol_full, _ = final_solution(time_points)
 
     # Generate Labels
     labels = generate_labels(num_psites)
@@ -127,54 +156,22 @@ def process_gene(
     # Plot ODE model fits
     plotter.plot_model_fit(seq_model_fit, P_data, R_data.flatten(), sol_full, num_psites, psite_values, time_points)
 
-    # Simulate wild-type
-    sol_wt, p_fit_wt = solve_ode(final_params, init_cond, num_psites, time_points)
-
-    # Generate combinations for knockouts
-    knockout_combinations = generate_knockout_combinations(num_psites)
-    knockout_results = {}
-
-    # Loop through those combinations
-    for knockout_setting in knockout_combinations:
-
-        # Apply knockout settings
-        final_params_ko = apply_knockout(final_params, knockout_setting, num_psites)
-
-        # Solve ODE with knockout settings
-        sol_ko, p_fit_ko = solve_ode(final_params_ko, init_cond, num_psites, time_points)
-
-        # Create a descriptive title for the plot and report
-        knockout_name = []
-        if knockout_setting['transcription']:
-            knockout_name.append("Transcription KO")
-        if knockout_setting['translation']:
-            knockout_name.append("Translation KO")
-        phospho = knockout_setting['phosphorylation']
-        if phospho is True:
-            knockout_name.append("Phospho KO")
-        elif isinstance(phospho, list) and phospho:
-            knockout_name.append(f"PhosphoSite KO {','.join(psite_values[p] for p in phospho)}")
-        if not knockout_name:
-            knockout_name = ["WT"]
-
-        # Save the knockout result
-        knockout_results["_".join(knockout_name)] = {
-            "knockout_setting": knockout_setting,
-            "sol_ko": sol_ko,
-            "p_fit_ko": p_fit_ko,
-        }
-
-        # Update the file names based on KO
-        plotter.gene = f"{gene}_knockouts_" + "_".join(knockout_name)
-
-        # Create the dictionary to pass
-        knockout_dict = {
-            'WT': (time_points, sol_wt, p_fit_wt),
-            'KO': (time_points, sol_ko, p_fit_ko),
+    # Simulate all knockout settings in one batched solve
+    screen = knockout_screen(final_params, init_cond, num_psites, time_points, psite_values,
+                             site_order=KNOCKOUT_SITE_ORDER)
+    screen['effects'].to_csv(os.path.join(out_dir, f"{gene}_knockout_effects.csv"), index=False)
+    knockout_results = {
+        name: {
+            "knockout_setting": setting,
+            "sol_ko": screen['solutions'][i],
+            "p_fit_ko": screen['fits'][i],
         }
+        for i, (name, setting) in enumerate(zip(screen['names'], screen['settings']))
+    }
 
-        # Plot the knockout results
-        plotter.plot_knockouts(knockout_dict, num_psites, psite_values)
+    # Plot the knockout results
+    if KNOCKOUT_PLOTS:
+        plot_knockout_screen(screen, plotter, gene, num_psites, psite_values, time_points)
 
     # Save Parameters
     df_params = pd.DataFrame(estimated_params, columns=get_param_names(num_psites))
@@ -214,11 +211,13 @@ def process_gene(
         "perturbation_analysis": perturbation_analysis if SENSITIVITY_ANALYSIS else None,
         "perturbation_curves_params": trajectories_w_params if SENSITIVITY_ANALYSIS else None,
         "knockout_results": knockout_results,
+        "knockout_effects": screen['effects'],
         "regularization": regularization_val
     }
 
 
-def process_gene_wrapper(gene, kinase_data, mrna_data, time_points, bounds, bootstraps, out_dir=OUT_DIR):
+def process_gene_wrapper(gene, kinase_data, mrna_data, time_points, bounds, bootstraps, out_dir=OUT_DIR,
+                         estimate=None):
     """
     Wrapper function to process a gene.
 
@@ -230,6 +229,7 @@ def process_gene_wrapper(gene, kinase_data, mrna_data, time_points, bounds, boot
         bounds (tuple): Bounds for parameter estimation.
         bootstraps (int, optional): Number of bootstrap iterations. Defaults to 0.
         out_dir (str, optional): Output directory for saving results. Defaults to OUT_DIR.
+        estimate (tuple, optional): Result of `estimate_parameters` computed beforehand.
 
     Returns:
         dict: A dictionary containing the results of the gene processing.
@@ -241,5 +241,173 @@ def process_gene_wrapper(gene, kinase_data, mrna_data, time_points, bounds, boot
         time_points=time_points,
         bounds=bounds,
         bootstraps=bootstraps,
-        out_dir=out_dir
+        out_dir=out_dir,
+        estimate=estimate
     )
+
+
+def _init_gene_worker(kinase_data, mrna_data, lambda_workers, site_counts=()):
+    """
+    Initializer of a gene-level worker: keeps the input tables for all genes the worker
+    processes, sets the number of processes its λ search may use, warms up the model kernels and
+    solves the steady states of the site counts it will see.
+
+    Args:
+        kinase_data (pd.DataFrame): DataFrame containing kinase data.
+        mrna_data (pd.DataFrame): DataFrame containing mRNA data.
+        lambda_workers (int): Worker processes available to `find_best_lambda`.
+        site_counts (iterable, optional): Numbers of phosphorylation sites of the genes.
+    """
+    _worker_data['kinase_data'] = kinase_data
+    _worker_data['mrna_data'] = mrna_data
+    set_lambda_workers(lambda_workers)
+    warm_up()
+    precompute_initial_conditions(site_counts)
+
+
+def _process_gene_task(gene, time_points, bounds, bootstraps, out_dir, estimate=None):
+    """
+    Process one gene in a gene-level worker, using the tables set by `_init_gene_worker`.
+
+    Args:
+        gene (str): Gene name.
+        time_points (list): List of time points for the experiment.
+        bounds (tuple): Bounds for parameter estimation.
+        bootstraps (int): Number of bootstrap iterations.
+        out_dir (str): Output directory for saving results.
+        estimate (tuple, optional): Result of `estimate_parameters` computed beforehand.
+
+    Returns:
+        dict: A dictionary containing the results of the gene processing.
+    """
+    return process_gene_wrapper(gene, _worker_data['kinase_data'], _worker_data['mrna_data'],
+                                time_points, bounds, bootstraps, out_dir, estimate)
+
+
+def estimate_gene_batches(genes, kinase_data, mrna_data, time_points, bounds, bootstraps, batch_size=BATCH_SIZE):
+    """
+    Batched estimation (ESTIMATION_MODE = 'batch'): genes are grouped by their number of
+    phosphorylation sites and every group is fitted in chunks of `batch_size` genes.
+
+    Args:
+        genes (list): Gene names.
+        kinase_data (pd.DataFrame): DataFrame containing kinase data.
+        mrna_data (pd.DataFrame): DataFrame containing mRNA data.
+        time_points (list): List of time points for the experiment.
+        bounds (tuple): Bounds for parameter estimation.
+        bootstraps (int): Number of bootstrap iterations.
+        batch_size (int, optional): Maximum number of genes per batch. Defaults to BATCH_SIZE.
+
+    Returns:
+        dict: The result of `estimate_parameters` for every gene whose batch completed.
+    """
+    groups = {}
+    for gene in genes:
+        _, P_data, R_data = gene_arrays(gene, kinase_data, mrna_data)
+        groups.setdefault(P_data.shape[0], []).append((gene, P_data, R_data))
+
+    estimates = {}
+    for num_psites, members in sorted(groups.items()):
+        init_cond = initial_condition(num_psites)
+        for i in range(0, len(members), batch_size):
+            chunk = members[i:i + batch_size]
+            names = [gene for gene, _, _ in chunk]
+            try:
+                estimates.update(estimate_parameters_batch(
+                    names, [p for _, p, _ in chunk], [r for _, _, r in chunk], init_cond, num_psites,
+                    time_points, bounds, bootstraps
+                ))
+            except Exception:
+                logger.exception(f"[{num_psites} sites] Batched estimation failed for {', '.join(names)}; "
+                                 f"skipping genes.")
+    return estimates
+
+
+def process_genes(genes, kinase_data, mrna_data, time_points, bounds, bootstraps,
+                  max_workers=1, executor=GENE_EXECUTOR, out_dir=OUT_DIR, use_cache=RESULT_CACHE):
+    """
+    Process several genes in parallel and yield their results as they finish.
+
+    The phosphorylation and mRNA tables are handed to each worker once through the executor
+    initializer instead of being pickled with every gene. A gene that raises is logged and
+    skipped, so a single failure does not stop the run. With `use_cache`, genes whose inputs,
+    settings and code are unchanged are loaded from the result cache (`paramest.cache`) and
+    every newly completed gene is stored there.
+
+    Args:
+        genes (list): Gene names.
+        kinase_data (pd.DataFrame): DataFrame containing kinase data.
+        mrna_data (pd.DataFrame): DataFrame containing mRNA data.
+        time_points (list): List of time points for the experiment.
+        bounds (tuple): Bounds for parameter estimation.
+        bootstraps (int): Number of bootstrap iterations.
+        max_workers (int, optional): Number of genes processed at the same time. Defaults to 1.
+        executor (str or type, optional): 'process', 'serial' or an Executor class accepting
+            `max_workers`, `initializer` and `initargs`. Defaults to GENE_EXECUTOR.
+        out_dir (str, optional): Output directory for saving results. Defaults to OUT_DIR.
+        use_cache (bool, optional): Whether to use the result cache. Defaults to RESULT_CACHE.
+
+    Yields:
+        dict: Result of `process_gene` for every gene that completed.
+    """
+    if use_cache:
+        keys = {gene: gene_key(gene, kinase_data, mrna_data, time_points, bounds, bootstraps) for gene in genes}
+        pending = []
+        for gene in genes:
+            result = load_result(keys[gene])
+            if result is None:
+                pending.append(gene)
+            else:
+                logger.info(f"[{gene}]      Loaded from the result cache.")
+                yield result
+        logger.info(f"Result cache: {len(genes) - len(pending)} genes loaded, {len(pending)} to process.")
+        for result in process_genes(pending, kinase_data, mrna_data, time_points, bounds, bootstraps,
+                                    max_workers, executor, out_dir, use_cache=False):
+            store_result(keys[result['gene']], result)
+            yield result
+        return
+
+    if not genes:
+        return
+
+    estimates = None
+    if ESTIMATION_MODE == 'batch':
+        # Fit all genes first, batched by site count; the workers then only post-process them
+        estimates = estimate_gene_batches(genes, kinase_data, mrna_data, time_points, bounds, bootstraps)
+        genes = [gene for gene in genes if gene in estimates]
+        if not genes:
+            return
+
+    # The initial conditions only depend on the number of sites: solve each one once up front
+    site_counts = kinase_data.loc[kinase_data['Gene'].isin(genes), 'Gene'].value_counts().unique().tolist()
+    precompute_initial_conditions(site_counts)
+
+    max_workers = max(1, min(int(max_workers), len(genes)))
+    if executor == 'serial' or max_workers == 1:
+        for gene in genes:
+            logger.info(f"[{gene}]      Processing...")
+            try:
+                yield process_gene_wrapper(gene, kinase_data, mrna_data, time_points, bounds, bootstraps, out_dir,
+                                           None if estimates is None else estimates[gene])
+            except Exception:
+                logger.exception(f"[{gene}]      Processing failed; skipping gene.")
+        return
+
+    if isinstance(executor, str) and executor not in EXECUTORS:
+        raise ValueError(f"Unknown GENE_EXECUTOR '{executor}'; use 'process' or 'serial'")
+    executor_cls = EXECUTORS[executor] if isinstance(executor, str) else executor
+    # Split the cores between the gene workers and the λ search running inside each of them
+    lambda_workers = max(1, (os.cpu_count() or 1) // max_workers)
+    with executor_cls(max_workers=max_workers, initializer=_init_gene_worker,
+                      initargs=(kinase_data, mrna_data, lambda_workers, site_counts)) as pool:
+        futures = {}
+        for gene in genes:
+            logger.info(f"[{gene}]      Processing...")
+            futures[pool.submit(_process_gene_task, gene, time_points, bounds, bootstraps, out_dir,
+                                None if estimates is None else estimates[gene])] = gene
+        for future in as_completed(futures):
+            gene = futures[future]
+            try:
+                yield future.result()
+            except Exception:
+                logger.exception(f"[{gene}]      Processing failed; skipping gene.")
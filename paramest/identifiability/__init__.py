@@ -1 +1,2 @@
 from .ci import confidence_intervals
+from .profile import profile_likelihood
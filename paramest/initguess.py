@@ -0,0 +1,188 @@
+import re
+
+import numpy as np
+from scipy.stats import qmc
+
+from config.constants import get_param_names, ODE_MODEL, LHS_STARTS
+from config.logconf import setup_logger
+from models import solve_ode
+from models.solvers import tolerance_stage
+
+logger = setup_logger()
+
+
+def relaxation_rate(t, y, y0):
+    """
+    Rate k of a first-order relaxation y(t) = y_inf + (y0 - y_inf) * exp(-k t) through the data.
+
+    The last value is taken as y_inf; k is the least-squares slope of log((y - y_inf) / (y0 - y_inf))
+    over the points that still lie on the side of y0.
+
+    Args:
+        t (np.ndarray): Time points (t > 0).
+        y (np.ndarray): Values at the time points.
+        y0 (float): Value at t = 0.
+
+    Returns:
+        float or None: The rate, or None if the data carry no usable relaxation.
+    """
+    y_inf = y[-1]
+    ratio = (y[:-1] - y_inf) / (y0 - y_inf) if abs(y0 - y_inf) > 1e-8 else np.zeros(y.size - 1)
+    mask = (ratio > 1e-3) & (ratio < 1.0) & (t[:-1] > 0)
+    if not mask.any():
+        return None
+    k = -np.sum(t[:-1][mask] * np.log(ratio[mask])) / np.sum(np.square(t[:-1][mask]))
+    return k if np.isfinite(k) and k > 0 else None
+
+
+def data_driven_guess(p_data, r_data, init_cond, num_psites, time_points):
+    """
+    Starting rates derived from the measured time courses.
+
+    - mRNA synthesis A and decay B from the relaxation of the mRNA time course (A = B * R_inf).
+    - Site rates D(i) from the relaxation of each phosphorylation curve and S(i) from its early slope,
+      dP_i/dt(0) = S_i * P(0) - (1 + D_i) * P_i(0).
+    - Protein degradation D from the relaxation of the summed phosphorylation signal and translation C
+      from the steady-state balance C * R = D * P + sum_i D_i * P_i at the last time point.
+
+    Rates that cannot be derived keep the reference value 1 of the steady-state initial condition.
+    Random-model state rates (D12, D123, ...) take the mean of the rates of their sites.
+
+    Args:
+        p_data (np.ndarray): Phosphorylation data of shape (num_psites, n_times).
+        r_data (np.ndarray): mRNA data at the last time points.
+        init_cond (np.ndarray): Initial conditions [R, P, ...].
+        num_psites (int): Number of phosphorylation sites.
+        time_points (np.ndarray): Time points of the phosphorylation data.
+
+    Returns:
+        np.ndarray: Parameter vector in the order of `get_param_names`.
+    """
+    time_points = np.asarray(time_points, dtype=float)
+    p_data = np.asarray(p_data, dtype=float).reshape(num_psites, -1)
+    r = np.asarray(r_data, dtype=float).ravel()
+    R0, P0 = max(init_cond[0], 1e-8), max(init_cond[1], 1e-8)
+
+    # mRNA: synthesis and decay
+    R_inf = max(r[-1], 1e-8)
+    B = relaxation_rate(time_points[-r.size:], r, R0) or 1.0
+    A = B * R_inf
+
+    # Phosphorylation sites: turnover from the relaxation, phosphorylation from the early slope
+    early = (time_points > 0) & (time_points <= 2.0)
+    D_sites, S_sites = np.ones(num_psites), np.ones(num_psites)
+    for i in range(num_psites):
+        p_i = p_data[i]
+        k = relaxation_rate(time_points[1:], p_i[1:], p_i[0])
+        D_sites[i] = max(k - 1.0, 0.0) if k is not None else 1.0
+        if early.any():
+            slope = np.sum(time_points[early] * (p_i[early] - p_i[0])) / np.sum(np.square(time_points[early]))
+            S_sites[i] = max((slope + (1.0 + D_sites[i]) * p_i[0]) / P0, 0.0)
+
+    # Protein: degradation from the total signal, translation from the steady-state balance
+    total = p_data.sum(axis=0)
+    D = relaxation_rate(time_points[1:], total[1:], total[0]) or 1.0
+    P_inf = P0 * total[-1] / total[0] if total[0] > 0 else P0
+    C = (D * P_inf + np.sum(D_sites * p_data[:, -1])) / R_inf
+
+    rates = {'A': A, 'B': B, 'C': C, 'D': D}
+    guess = []
+    for name in get_param_names(num_psites):
+        site = re.fullmatch(r'([SD])(\d+)', name)
+        if name in rates:
+            guess.append(rates[name])
+        elif site and site.group(1) == 'S' and int(site.group(2)) <= num_psites:
+            guess.append(S_sites[int(site.group(2)) - 1])
+        elif site and site.group(1) == 'D':
+            digits = [int(d) - 1 for d in site.group(2)] if ODE_MODEL == 'randmod' else [int(site.group(2)) - 1]
+            guess.append(np.mean(D_sites[digits]) if max(digits) < num_psites else 1.0)
+        else:
+            guess.append(1.0)
+    return np.asarray(guess, dtype=float)
+
+
+def inner_bounds(free_bounds):
+    """
+    Bounds shrunk by 0.1% of their width, so that starting points lie strictly inside.
+
+    Args:
+        free_bounds (tuple): Lower and upper bounds as seen by the optimiser.
+
+    Returns:
+        tuple: Inner lower and upper bounds as arrays (infinite upper bounds become lower + 1000).
+    """
+    lower, upper = np.asarray(free_bounds[0], dtype=float), np.asarray(free_bounds[1], dtype=float)
+    width = np.where(np.isfinite(upper - lower), upper - lower, 1.0)
+    return lower + 1e-3 * width, np.where(np.isfinite(upper), upper - 1e-3 * width, lower + 1e3)
+
+
+def latin_hypercube_starts(free_bounds, n, seed=42):
+    """
+    Latin-hypercube sample of starting points inside the bounds.
+
+    Args:
+        free_bounds (tuple): Lower and upper bounds as seen by the optimiser.
+        n (int): Number of points.
+        seed (int): Seed of the sample.
+
+    Returns:
+        np.ndarray: Starting points of shape (n, len(bounds)).
+    """
+    inner_lower, inner_upper = inner_bounds(free_bounds)
+    if n <= 0:
+        return np.empty((0, inner_lower.size))
+    sample = qmc.LatinHypercube(d=inner_lower.size, seed=seed).random(n)
+    return qmc.scale(sample, inner_lower, inner_upper)
+
+
+def initial_guess(gene, p_data, r_data, init_cond, num_psites, time_points, free_bounds, n_lhs=LHS_STARTS, seed=42):
+    """
+    Initial guess for the fit of a gene, screened by a cheap simulation.
+
+    The data-driven guess (`data_driven_guess`) competes with `n_lhs` Latin-hypercube starts inside the
+    bounds; every candidate is simulated once and the one with the smallest squared error against the
+    data is returned. If the data-driven guess cannot be simulated, the best Latin-hypercube start wins.
+
+    Args:
+        gene (str): Gene name.
+        p_data (np.ndarray): Phosphorylation data of shape (num_psites, n_times).
+        r_data (np.ndarray): mRNA data.
+        init_cond (np.ndarray): Initial conditions for the ODE solver.
+        num_psites (int): Number of phosphorylation sites.
+        time_points (np.ndarray): Time points for the model fitting.
+        free_bounds (tuple): Lower and upper bounds as seen by the optimiser (log-space for 'randmod').
+        n_lhs (int): Number of Latin-hypercube starts.
+        seed (int): Seed of the Latin-hypercube sample.
+
+    Returns:
+        np.ndarray: Initial guess as seen by the optimiser.
+    """
+    log_space = ODE_MODEL == 'randmod'
+    # Keep the starting point strictly inside the bounds
+    inner_lower, inner_upper = inner_bounds(free_bounds)
+
+    candidates = {}
+    guess = data_driven_guess(p_data, r_data, init_cond, num_psites, time_points)
+    guess = np.log(np.maximum(guess, 1e-8)) if log_space else guess
+    candidates['data'] = np.clip(guess, inner_lower, inner_upper)
+    for j, point in enumerate(latin_hypercube_starts(free_bounds, n_lhs, seed)):
+        candidates[f'lhs{j + 1}'] = point
+
+    target = np.concatenate([np.ravel(r_data), np.ravel(p_data)])
+    errors = {}
+    with tolerance_stage('search'):
+        for key, params in candidates.items():
+            try:
+                _, fit = solve_ode(np.exp(params) if log_space else params, init_cond, num_psites, time_points)
+                error = np.sum(np.square(fit - target))
+            except Exception:
+                error = np.inf
+            errors[key] = error if np.isfinite(error) else np.inf
+
+    best = min(errors, key=errors.get)
+    if not np.isfinite(errors[best]):
+        logger.warning(f"[{gene}]      No initial guess could be simulated; using the centre of the bounds")
+        return (inner_lower + inner_upper) / 2
+    logger.info(f"[{gene}]      Initial guess: {'data-driven' if best == 'data' else 'Latin hypercube'} "
+                f"(SSE = {errors[best]:.3g}, data-driven SSE = {errors['data']:.3g})")
+    return candidates[best]
@@ -1,23 +1,559 @@
 
+import math
 import os
 import numpy as np
 import pandas as pd
-from scipy.optimize import curve_fit
-from itertools import combinations
-from typing import cast, Tuple
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import scipy.sparse as sp
+from scipy.optimize import least_squares
+from typing import Tuple
+from concurrent.futures import as_completed
 
 from config.config import score_fit
 from config.constants import get_param_names, USE_REGULARIZATION, ODE_MODEL, ALPHA_CI, OUT_DIR, \
-    USE_CUSTOM_WEIGHTS
+    USE_CUSTOM_WEIGHTS, LAMBDA_SEARCH, RACING_BUDGET, RACING_ETA, PATH_CHAINS, PATH_CONFIRM, BOOTSTRAP_SEED, \
+    INITIAL_GUESS, MULTISTART_TOL, LSQ_JACOBIAN, LSQ_SPARSE_DENSITY, LSQ_LOSS, LSQ_F_SCALE, CI_METHOD, \
+    SPARSE_RANDMOD_SENS_MIN_SITES
 from config.logconf import setup_logger
-from models import solve_ode
-from models.weights import early_emphasis, get_weight_options, get_protein_weights
+from models import solve_ode, solve_ode_with_sensitivities, sensitivity_sparsity
+from models.solvers import tolerance_stage
+from models.weights import gene_weight_options
 from plotting import Plotter
-from .identifiability import confidence_intervals
+from .identifiability import confidence_intervals, profile
+from .initguess import initial_guess, latin_hypercube_starts
+from .pool import get_worker_pool
 
 logger = setup_logger()
 
+# Number of worker processes used by the λ search of one gene. Lowered in gene-level
+# workers (paramest.core.process_genes) so that the nested pools do not oversubscribe the cores.
+_lambda_workers = os.cpu_count()
+
+
+def set_lambda_workers(max_workers: int) -> None:
+    """
+    Set the number of worker processes used by `find_best_lambda` in this process.
+
+    Args:
+        max_workers: Number of workers; 1 evaluates the λ values serially without a pool.
+    """
+    global _lambda_workers
+    _lambda_workers = max(1, int(max_workers))
+
+
+def model_jacobian(params, init_cond, num_psites, tpts, lam, use_regularization=True, sparse=False):
+    """
+    Analytic Jacobian of the fitted model vector with respect to the optimised parameters.
+
+    The model rows come from a single forward-sensitivity solve. For 'randmod' the
+    optimiser works in log-space, so the chain rule with exp(params) is applied.
+    The regularization rows lam / len(params) * params**2 contribute a diagonal block.
+
+    Args:
+        params: Parameters as seen by the optimiser.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        tpts: Time points.
+        lam: Regularization parameter.
+        use_regularization: Whether the regularization rows are part of the model vector.
+        sparse: Return a CSR matrix instead of a dense array.
+
+    Returns:
+        Jacobian of shape (len(model vector), len(params)).
+    """
+    params = np.asarray(params)
+    if ODE_MODEL == 'randmod':
+        param_vec = np.exp(params)
+        _, _, jac = solve_ode_with_sensitivities(param_vec, init_cond, num_psites, np.atleast_1d(tpts))
+        jac = jac * param_vec[np.newaxis, :]
+    else:
+        _, _, jac = solve_ode_with_sensitivities(params, init_cond, num_psites, np.atleast_1d(tpts))
+    if sparse:
+        if use_regularization:
+            return sp.vstack([sp.csr_matrix(jac), sp.diags(2 * lam / len(params) * params)], format='csr')
+        return sp.csr_matrix(jac)
+    if use_regularization:
+        jac = np.vstack([jac, np.diag(2 * lam / len(params) * params)])
+    return jac
+
+
+def model_functions(init_cond, num_psites, lam, use_regularization=True, sparse=False):
+    """
+    Build the model function `model_func(tpts, *params)` and its analytic Jacobian.
+
+    Args:
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        lam: Regularization parameter.
+        use_regularization: Whether the regularization rows are part of the model vector.
+        sparse: Whether the Jacobian is returned as a CSR matrix.
+
+    Returns:
+        Tuple of `model_func(tpts, *params)` and `model_jac(tpts, *params)`.
+    """
+
+    def model_func(tpts, *params):
+        if ODE_MODEL == 'randmod':
+            param_vec = np.exp(np.asarray(params))
+        else:
+            param_vec = np.asarray(params)
+        _, p_fitted = solve_ode(param_vec, init_cond, num_psites, np.atleast_1d(tpts))
+        y_model = p_fitted.flatten()
+        if use_regularization:
+            reg = lam / len(param_vec) * np.square(params)
+            return np.concatenate([y_model, reg])
+        return y_model
+
+    def model_jac(tpts, *params):
+        return model_jacobian(params, init_cond, num_psites, tpts, lam, use_regularization, sparse)
+
+    return model_func, model_jac
+
+
+# Structural sparsity pattern of the Jacobian per (model, site count, time points, regularization)
+_sparsity_cache = {}
+
+
+def jacobian_sparsity(init_cond, num_psites, tpts, use_regularization=True):
+    """
+    Structural sparsity pattern of the Jacobian of the fitted model vector.
+
+    A parameter is marked for every row of a fitted trajectory (mRNA or one phosphorylation
+    state) if it affects that trajectory at any time point. Models that derive this from their
+    transition graph ('randmod', see `sensitivity_sparsity`) need no integration; for the others
+    the sensitivities are evaluated once at a generic positive parameter set. The regularization
+    rows add a diagonal block. Cached per model, site count, time points and regularization.
+
+    Args:
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        tpts: Time points.
+        use_regularization: Whether the regularization rows are part of the model vector.
+
+    Returns:
+        Boolean array of shape (len(model vector), number of parameters).
+    """
+    tpts = np.atleast_1d(np.asarray(tpts, dtype=float))
+    key = (ODE_MODEL, num_psites, tpts.tobytes(), use_regularization)
+    if key not in _sparsity_cache:
+        num_params = len(get_param_names(num_psites))
+        T = tpts.size
+        # Rows are [R(t[5:]), P_1(t), ..., P_k(t)]: one block per fitted trajectory
+        if sensitivity_sparsity is not None:
+            states = sensitivity_sparsity(num_psites)
+            sizes = [max(T - 5, 0)] + [T] * num_psites
+        else:
+            params = np.random.default_rng(0).uniform(0.5, 1.5, num_params)
+            _, _, jac = solve_ode_with_sensitivities(params, init_cond, num_psites, tpts)
+            nonzero = jac != 0
+            r_rows = nonzero.shape[0] - num_psites * T
+            bounds = np.cumsum([0, r_rows] + [T] * num_psites)
+            states = np.array([nonzero[lo:hi].any(axis=0) for lo, hi in zip(bounds[:-1], bounds[1:])])
+            sizes = np.diff(bounds)
+        pattern = np.repeat(states, sizes, axis=0)
+        if use_regularization:
+            pattern = np.vstack([pattern, np.eye(num_params, dtype=bool)])
+        _sparsity_cache[key] = pattern
+    return _sparsity_cache[key]
+
+
+def jacobian_mode(init_cond, num_psites, tpts, use_regularization=True):
+    """
+    Resolve LSQ_JACOBIAN for one problem.
+
+    With 'auto', 'randmod' from SPARSE_RANDMOD_SENS_MIN_SITES sites on uses plain finite
+    differences (one solve per parameter), which beat its forward-sensitivity solve there. Its
+    sparsity pattern is dense in the phosphorylation rows, so no two parameters could share a
+    solve. Otherwise the analytic Jacobian is dense or sparse depending on the density of the
+    structural pattern.
+
+    Args:
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        tpts: Time points.
+        use_regularization: Whether the regularization rows are part of the model vector.
+
+    Returns:
+        The mode: 'analytic', 'sparse', '2-point' or '3-point'.
+    """
+    if LSQ_JACOBIAN != 'auto':
+        return LSQ_JACOBIAN
+    if ODE_MODEL == 'randmod' and num_psites >= SPARSE_RANDMOD_SENS_MIN_SITES:
+        return '2-point'
+    pattern = jacobian_sparsity(init_cond, num_psites, tpts, use_regularization)
+    return 'sparse' if pattern.mean() <= LSQ_SPARSE_DENSITY else 'analytic'
+
+
+def fit_model(
+        x0: np.ndarray,
+        target_fit: np.ndarray,
+        sigma: np.ndarray,
+        lam: float,
+        use_regularization: bool,
+        free_bounds: Tuple[np.ndarray, np.ndarray],
+        init_cond: np.ndarray,
+        num_psites: int,
+        time_points: np.ndarray,
+        max_nfev: int = 20000,
+        fixed: Tuple[int, float] = None
+):
+    """
+    Weighted, regularized least-squares fit with `least_squares`.
+
+    The residuals are (model - target_fit) / sigma with the loss LSQ_LOSS. The Jacobian is
+    the analytic one (dense or CSR) or finite differences, as selected by `jacobian_mode`. With `fixed`, one parameter is held at a value
+    and only the others are optimised (profile likelihood).
+
+    Args:
+        x0: Starting parameters (as seen by the optimiser).
+        target_fit: Target vector of the fit (including the regularization rows).
+        sigma: Weights of the fit.
+        lam: Regularization parameter.
+        use_regularization: Whether the regularization rows are part of the model vector.
+        free_bounds: Parameter bounds for the optimization.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        time_points: Time points for the model fitting.
+        max_nfev: Maximum number of function evaluations.
+        fixed: (index, value) of a parameter held fixed, or None.
+
+    Returns:
+        The `OptimizeResult` of `least_squares`; with `fixed`, `x` holds the free parameters only.
+    """
+    mode = jacobian_mode(init_cond, num_psites, time_points, use_regularization)
+    model_func, model_jac = model_functions(init_cond, num_psites, lam, use_regularization, sparse=mode == 'sparse')
+    sigma = np.asarray(sigma, dtype=float)
+    x0 = np.asarray(x0, dtype=float)
+    free = np.ones(x0.size, dtype=bool)
+    full = x0.copy()
+    if fixed is not None:
+        free[fixed[0]] = False
+        full[fixed[0]] = fixed[1]
+        x0 = x0[free]
+        free_bounds = (np.asarray(free_bounds[0], dtype=float)[free], np.asarray(free_bounds[1], dtype=float)[free])
+
+    def expand(params):
+        if fixed is None:
+            return params
+        full[free] = params
+        return full
+
+    def residuals(params):
+        return (model_func(time_points, *expand(params)) - target_fit) / sigma
+
+    if mode == 'sparse':
+        row_scale = sp.diags(1 / sigma)
+        jac = lambda params: (row_scale @ model_jac(time_points, *expand(params)))[:, free]
+    elif mode == 'analytic':
+        jac = lambda params: model_jac(time_points, *expand(params))[:, free] / sigma[:, np.newaxis]
+    else:
+        jac = mode
+
+    return least_squares(residuals, x0, jac=jac, bounds=free_bounds, x_scale='jac', loss=LSQ_LOSS,
+                         f_scale=LSQ_F_SCALE, max_nfev=max_nfev)
+
+
+def fit_covariance(result, absolute_sigma: bool) -> np.ndarray:
+    """
+    Covariance of the parameters of a `least_squares` fit, computed as in `curve_fit`.
+
+    Args:
+        result: `OptimizeResult` of `fit_model`.
+        absolute_sigma: If False, the covariance is scaled by the reduced chi-squared.
+
+    Returns:
+        Covariance matrix (filled with inf if it cannot be estimated).
+    """
+    jac = result.jac.toarray() if sp.issparse(result.jac) else result.jac
+    _, s, VT = np.linalg.svd(jac, full_matrices=False)
+    threshold = np.finfo(float).eps * max(jac.shape) * s[0]
+    s = s[s > threshold]
+    VT = VT[:s.size]
+    pcov = np.dot(VT.T / s ** 2, VT)
+    if not absolute_sigma:
+        dof = result.fun.size - result.x.size
+        if dof > 0:
+            pcov = pcov * (2 * result.cost / dof)
+        else:
+            pcov = np.full_like(pcov, np.inf)
+    return pcov
+
+
+def fit_parameters(*args, **kwargs) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converged fit with covariance; the arguments are those of `fit_model`.
+
+    Returns:
+        Tuple of the fitted parameters and their covariance.
+
+    Raises:
+        RuntimeError: If the fit did not converge.
+    """
+    result = fit_model(*args, **kwargs)
+    if not result.success or result.status <= 0:
+        raise RuntimeError(f"Optimal parameters not found: {result.message}")
+    return result.x, fit_covariance(result, absolute_sigma=not USE_CUSTOM_WEIGHTS)
+
+
+class RunningMean:
+    """
+    Online (Welford) mean of a stream of arrays, so replicates need not be kept in memory.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+
+    def update(self, value):
+        """
+        Add one array to the mean.
+
+        Args:
+            value: Array of the same shape as the previous ones.
+        """
+        value = np.asarray(value, dtype=float)
+        self.count += 1
+        if self.mean is None:
+            self.mean = value.copy()
+        else:
+            self.mean += (value - self.mean) / self.count
+
+
+def bootstrap_replicates(
+        seeds,
+        popt_best: np.ndarray,
+        target_fit: np.ndarray,
+        sigma: np.ndarray,
+        lam: float,
+        use_regularization: bool,
+        free_bounds: Tuple[np.ndarray, np.ndarray],
+        init_cond: np.ndarray,
+        num_psites: int,
+        time_points: np.ndarray
+) -> list:
+    """
+    Fit a chunk of bootstrap replicates.
+
+    Each replicate multiplies the target with 5% Gaussian noise drawn from its own random
+    stream and is fitted starting from `popt_best`.
+
+    Args:
+        seeds: One np.random.SeedSequence per replicate.
+        popt_best: Best-fit parameters (as seen by the optimiser), used as the starting point.
+        target_fit: Target vector of the fit (including the regularization rows).
+        sigma: Weights of the fit.
+        lam: Regularization parameter.
+        use_regularization: Whether the regularization rows are part of the model vector.
+        free_bounds: Parameter bounds for the optimization.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        time_points: Time points for the model fitting.
+
+    Returns:
+        List of (parameters, covariance or None) per replicate; failed fits return `popt_best`.
+    """
+    results = []
+    for seed in seeds:
+        noise = np.random.default_rng(seed).normal(0, 0.05, size=target_fit.shape)
+        noisy_target = target_fit * (1 + noise)
+        try:
+            popt_bs, pcov_bs = fit_parameters(popt_best, noisy_target, sigma, lam, use_regularization,
+                                              free_bounds, init_cond, num_psites, time_points)
+        except Exception as e:
+            logger.warning(f"Bootstrapping iteration failed: {e}")
+            popt_bs, pcov_bs = popt_best, None
+        results.append((popt_bs, pcov_bs))
+    return results
+
+
+def bootstrap(
+        bootstraps: int,
+        popt_best: np.ndarray,
+        target_fit: np.ndarray,
+        sigma: np.ndarray,
+        lam: float,
+        use_regularization: bool,
+        free_bounds: Tuple[np.ndarray, np.ndarray],
+        init_cond: np.ndarray,
+        num_psites: int,
+        time_points: np.ndarray,
+        seed: int = BOOTSTRAP_SEED,
+        max_workers: int = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run bootstrap replicates in parallel and aggregate them online.
+
+    Replicates get independent random streams spawned from `seed`, are fitted in chunks in the
+    shared worker pool and are folded into running means in replicate order, so the result is
+    reproducible and independent of the number of workers.
+
+    Args:
+        bootstraps: Number of replicates.
+        popt_best: Best-fit parameters (as seen by the optimiser).
+        target_fit: Target vector of the fit (including the regularization rows).
+        sigma: Weights of the fit.
+        lam: Regularization parameter.
+        use_regularization: Whether the regularization rows are part of the model vector.
+        free_bounds: Parameter bounds for the optimization.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        time_points: Time points for the model fitting.
+        seed: Root seed of the replicate streams.
+        max_workers: Number of workers of the shared pool; defaults to the λ search budget.
+
+    Returns:
+        Tuple of the mean parameters and the mean covariance of the successful fits (or None).
+    """
+    max_workers = _lambda_workers if max_workers is None else max_workers
+    seeds = np.random.SeedSequence(seed).spawn(bootstraps)
+    args = (popt_best, target_fit, sigma, lam, use_regularization, free_bounds, init_cond, num_psites, time_points)
+
+    if max_workers <= 1:
+        chunks = (bootstrap_replicates(seeds, *args),)
+    else:
+        size = math.ceil(bootstraps / (4 * max_workers))
+        executor = get_worker_pool(max_workers)
+        futures = [executor.submit(bootstrap_replicates, seeds[i:i + size], *args)
+                   for i in range(0, bootstraps, size)]
+        chunks = (future.result() for future in futures)
+
+    estimates, covariances = RunningMean(), RunningMean()
+    for chunk in chunks:
+        for popt_bs, pcov_bs in chunk:
+            estimates.update(popt_bs)
+            if pcov_bs is not None:
+                covariances.update(pcov_bs)
+    return estimates.mean, covariances.mean
+
+
+def local_fit(
+        gene: str,
+        x0: np.ndarray,
+        target: np.ndarray,
+        target_fit: np.ndarray,
+        sigma: np.ndarray,
+        lam: float,
+        use_regularization: bool,
+        free_bounds: Tuple[np.ndarray, np.ndarray],
+        init_cond: np.ndarray,
+        num_psites: int,
+        time_points: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Local fit of the final estimation problem from one starting point.
+
+    Args:
+        gene: Gene name.
+        x0: Starting parameters (as seen by the optimiser).
+        target: Target data.
+        target_fit: Target vector of the fit (including the regularization rows).
+        sigma: Weights of the fit.
+        lam: Regularization parameter.
+        use_regularization: Whether the regularization rows are part of the model vector.
+        free_bounds: Parameter bounds for the optimization.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        time_points: Time points for the model fitting.
+
+    Returns:
+        Tuple of the fitted parameters, their covariance (None if the fit failed) and the score.
+        A failed fit returns `x0`.
+    """
+    try:
+        popt, pcov = fit_parameters(x0, target_fit, sigma, lam, use_regularization, free_bounds, init_cond,
+                                    num_psites, time_points)
+    except Exception as e:
+        logger.warning(f"[{gene}] Final fit failed: {e}")
+        popt, pcov = np.asarray(x0), None
+    param_vec = np.exp(popt) if ODE_MODEL == 'randmod' else popt
+    _, pred = solve_ode(param_vec, init_cond, num_psites, time_points)
+    return popt, pcov, score_fit(param_vec, target, pred)
+
+
+def multistart(
+        gene: str,
+        p0: np.ndarray,
+        starts: int,
+        target: np.ndarray,
+        target_fit: np.ndarray,
+        sigma: np.ndarray,
+        lam: float,
+        use_regularization: bool,
+        free_bounds: Tuple[np.ndarray, np.ndarray],
+        init_cond: np.ndarray,
+        num_psites: int,
+        time_points: np.ndarray,
+        tol: float = MULTISTART_TOL,
+        max_workers: int = None
+) -> Tuple[np.ndarray, np.ndarray, float, pd.DataFrame]:
+    """
+    Parallel multi-start estimation with clustering of the local minima.
+
+    Local fits start from `p0` and from `starts - 1` Latin-hypercube points and run in the shared
+    worker pool. Solutions are visited from the best score on; a solution whose relative distance
+    to the representative of an existing cluster is below `tol` joins that cluster, otherwise it
+    starts a new one.
+
+    Args:
+        gene: Gene name.
+        p0: Initial guess (as seen by the optimiser).
+        starts: Number of local fits.
+        target: Target data.
+        target_fit: Target vector of the fit (including the regularization rows).
+        sigma: Weights of the fit.
+        lam: Regularization parameter.
+        use_regularization: Whether the regularization rows are part of the model vector.
+        free_bounds: Parameter bounds for the optimization.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        time_points: Time points for the model fitting.
+        tol: Relative distance below which two solutions are the same local minimum.
+        max_workers: Number of workers of the shared pool; defaults to the λ search budget.
+
+    Returns:
+        Tuple of the best parameters, their covariance, their score and a DataFrame with one row
+        per local minimum (score, number of starts that reached it and its parameters).
+    """
+    max_workers = _lambda_workers if max_workers is None else max_workers
+    x0s = [np.asarray(p0)] + list(latin_hypercube_starts(free_bounds, starts - 1))
+    args = (target, target_fit, sigma, lam, use_regularization, free_bounds, init_cond, num_psites, time_points)
+
+    if max_workers <= 1:
+        fits = [local_fit(gene, x0, *args) for x0 in x0s]
+    else:
+        executor = get_worker_pool(max_workers)
+        futures = [executor.submit(local_fit, gene, x0, *args) for x0 in x0s]
+        fits = [future.result() for future in futures]
+
+    clusters = []
+    for popt, pcov, score in sorted(fits, key=lambda fit: fit[2]):
+        for cluster in clusters:
+            centre = cluster['popt']
+            if np.linalg.norm(popt - centre) <= tol * max(np.linalg.norm(centre), 1.0):
+                cluster['starts'] += 1
+                break
+        else:
+            clusters.append({'popt': popt, 'pcov': pcov, 'score': score, 'starts': 1})
+
+    scores = np.array([fit[2] for fit in fits])
+    logger.info(f"[{gene}]      Multi-start: {len(fits)} local fits, {len(clusters)} distinct minima | "
+                f"Score best = {scores.min():.2f}, median = {np.median(scores):.2f}, worst = {scores.max():.2f}")
+
+    minima = pd.DataFrame(
+        [np.exp(c['popt']) if ODE_MODEL == 'randmod' else c['popt'] for c in clusters],
+        columns=get_param_names(num_psites)
+    )
+    minima.insert(0, 'Starts', [c['starts'] for c in clusters])
+    minima.insert(0, 'Score', [c['score'] for c in clusters])
+    best = clusters[0]
+    return best['popt'], best['pcov'], best['score'], minima
+
+
+def _format_lambda(lam: float, p0: np.ndarray) -> str:
+    """
+    λ as logged by every regularization search: the penalty lam / len(p0) · Σ p0² at the initial guess.
+    """
+    return f"{lam / len(p0) * np.sum(np.square(p0)):6.2f}"
+
 
 def worker_find_lambda(
         lam: float,
@@ -48,69 +584,300 @@ def worker_find_lambda(
         Tuple containing the lambda value, score, and weight key.
     """
 
-    def model_func(tpts, *params):
-        param_vec = np.exp(np.asarray(params)) if ODE_MODEL == 'randmod' else np.asarray(params)
-        _, p_fitted = solve_ode(param_vec, init_cond, num_psites, np.atleast_1d(tpts))
-        y_model = p_fitted.flatten()
-        reg = lam / len(params) * np.square(params)
-        return np.concatenate([y_model, reg])
-
     tf = np.concatenate([target, np.zeros(len(p0))])
-    early_weights = early_emphasis(p_data, time_points, num_psites)
-    ms_gauss_weights = get_protein_weights(gene)
-
-    weight_options = get_weight_options(
-        target, time_points, num_psites,
-        use_regularization=True,
-        reg_len=len(p0),
-        early_weights=early_weights,
-        ms_gauss_weights=ms_gauss_weights
-    )
+    weight_options = gene_weight_options(gene, target, time_points, num_psites,
+                                         use_regularization=True, reg_len=len(p0), p_data=p_data)
 
     best_score = float("inf")
     best_weight_key = None
 
-    for weight_key, sigma in weight_options.items():
-
-        result = cast(Tuple[np.ndarray, np.ndarray], curve_fit(
-            model_func,
-            time_points,
-            tf,
-            p0=p0,
-            bounds=free_bounds,
-            sigma=sigma,
-            x_scale='jac',
-            absolute_sigma=not USE_CUSTOM_WEIGHTS,
-            maxfev=20000
-        ))
-
-        popt_try, _ = result
-
-        _, pred = solve_ode(
-            np.exp(popt_try) if ODE_MODEL == 'randmod' else popt_try,
-            init_cond,
-            num_psites,
-            time_points
-        )
+    # Exploratory fits only rank the candidate λ values, so they use the looser
+    # 'search' tolerances of ODE_TOLERANCE_SCHEDULE
+    with tolerance_stage('search'):
+        for weight_key, sigma in weight_options.items():
 
-        score = score_fit(np.exp(popt_try) if ODE_MODEL == 'randmod'
-        else popt_try, target, pred)
+            popt_try, _ = fit_parameters(p0, tf, sigma, lam, True, free_bounds, init_cond, num_psites,
+                                         time_points)
 
-        if score < best_score:
-            best_score = score
-            best_weight_key = weight_key
+            _, pred = solve_ode(
+                np.exp(popt_try) if ODE_MODEL == 'randmod' else popt_try,
+                init_cond,
+                num_psites,
+                time_points
+            )
+
+            score = score_fit(np.exp(popt_try) if ODE_MODEL == 'randmod'
+            else popt_try, target, pred)
+
+            if score < best_score:
+                best_score = score
+                best_weight_key = weight_key
 
     if best_weight_key:
         logger.info(f"[{gene}]\t\t| "
-                    f"λ = {lam / len(p0) * np.sum(np.square(p0)):6.2f} | "
+                    f"λ = {_format_lambda(lam, p0)} | "
                     f"Weight: {(' '.join(w.capitalize() for w in best_weight_key.split('_'))):20} | "
                     f"Score = {best_score:6.2f}")
     else:
-        logger.warning(f"[{gene}] All fits failed for lambda = {lam:.2f}")
+        logger.warning(f"[{gene}] All fits failed for λ = {_format_lambda(lam, p0)}")
 
     return lam, best_score, best_weight_key
 
 
+def fit_candidate(
+        lam: float,
+        weight_key: str,
+        x0: np.ndarray,
+        p0: np.ndarray,
+        max_nfev: int,
+        gene: str,
+        target: np.ndarray,
+        time_points: np.ndarray,
+        free_bounds: Tuple[np.ndarray, np.ndarray],
+        init_cond: np.ndarray,
+        num_psites: int,
+        p_data: np.ndarray
+) -> Tuple[float, str, np.ndarray, float, bool]:
+    """
+    Fit one (λ, weight) candidate of the racing search with a budget of function evaluations.
+
+    Solves the same weighted, regularized least-squares problem as `worker_find_lambda`,
+    but does not require convergence, so that a fit stopped by `max_nfev` still returns
+    the point it reached and can be resumed from there.
+
+    Args:
+        lam: Regularization parameter.
+        weight_key: Key of the weight scheme in `get_weight_options`.
+        x0: Starting parameters (as seen by the optimiser).
+        p0: Initial parameter guess of the search, which scales the logged λ.
+        max_nfev: Maximum number of function evaluations.
+        gene: Gene name.
+        target: Target data.
+        time_points: Time points for the model fitting.
+        free_bounds: Parameter bounds for the optimization.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        p_data: Measurement data.
+
+    Returns:
+        Tuple of the lambda value, weight key, parameters reached, score and whether the fit converged.
+    """
+    sigma = gene_weight_options(gene, target, time_points, num_psites,
+                                use_regularization=True, reg_len=len(x0), p_data=p_data)[weight_key]
+    tf = np.concatenate([target, np.zeros(len(x0))])
+
+    with tolerance_stage('search'):
+        try:
+            result = fit_model(x0, tf, sigma, lam, True, free_bounds, init_cond, num_psites, time_points, max_nfev)
+        except Exception as e:
+            logger.warning(f"[{gene}] Fit failed for λ = {_format_lambda(lam, p0)}, weight '{weight_key}': {e}")
+            return lam, weight_key, x0, np.inf, True
+        param_vec = np.exp(result.x) if ODE_MODEL == 'randmod' else result.x
+        _, pred = solve_ode(param_vec, init_cond, num_psites, time_points)
+
+    return lam, weight_key, result.x, score_fit(param_vec, target, pred), result.status > 0
+
+
+def race_lambda_weights(
+        gene: str,
+        target: np.ndarray,
+        p0: np.ndarray,
+        time_points: np.ndarray,
+        free_bounds: Tuple[np.ndarray, np.ndarray],
+        init_cond: np.ndarray,
+        num_psites: int,
+        p_data: np.ndarray,
+        lambdas=np.logspace(-2, 0, 10),
+        max_workers: int = 1,
+        budget: int = RACING_BUDGET,
+        eta: int = RACING_ETA
+) -> Tuple[float, str]:
+    """
+    Successive-halving search over all (λ, weight scheme) candidates.
+
+    Every candidate starts from `p0` with `budget` function evaluations. After each rung the
+    candidates are ranked by `score_fit`, the best 1 / `eta` (at least `eta`) continue from
+    the parameters they reached with `eta` times the budget, and the rest are dropped. Once
+    at most `eta` candidates are left they are fitted to convergence (maxfev=20000, as in the
+    exhaustive search) and the best one is returned.
+
+    Args:
+        gene: Gene name.
+        target: Target data.
+        p0: Initial parameter guess.
+        time_points: Time points for the model fitting.
+        free_bounds: Parameter bounds for the optimization.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        p_data: Measurement data.
+        lambdas: Candidate regularization parameters.
+        max_workers: Number of workers of the shared pool; 1 fits the candidates serially.
+        budget: Function evaluations per candidate in the first rung.
+        eta: Reduction factor between rungs.
+
+    Returns:
+        Tuple of the best lambda value and weight key.
+    """
+    weight_keys = gene_weight_options(gene, target, time_points, num_psites,
+                                      use_regularization=True, reg_len=len(p0), p_data=p_data).keys()
+    args = (gene, target, time_points, free_bounds, init_cond, num_psites, p_data)
+    candidates = [(lam, key, p0, np.inf, False) for lam in lambdas for key in weight_keys]
+
+    def run(candidates, max_nfev):
+        pending = [c for c in candidates if not c[4]]
+        done = [c for c in candidates if c[4]]
+        if max_workers <= 1:
+            return done + [fit_candidate(lam, key, x, p0, max_nfev, *args) for lam, key, x, _, _ in pending]
+        executor = get_worker_pool(max_workers)
+        futures = [executor.submit(fit_candidate, lam, key, x, p0, max_nfev, *args) for lam, key, x, _, _ in pending]
+        return done + [future.result() for future in futures]
+
+    rung = 0
+    while len(candidates) > eta:
+        candidates = sorted(run(candidates, budget), key=lambda c: c[3])
+        keep = max(eta, math.ceil(len(candidates) / eta))
+        logger.info(f"[{gene}]\t\t| Rung {rung}: {len(candidates)} candidates at {budget} evaluations, "
+                    f"keeping {keep} | Best: λ = {_format_lambda(candidates[0][0], p0)}, "
+                    f"Weight: {' '.join(w.capitalize() for w in candidates[0][1].split('_'))}, "
+                    f"Score = {candidates[0][3]:.2f}")
+        candidates = candidates[:keep]
+        budget *= eta
+        rung += 1
+
+    candidates = sorted(run(candidates, 20000), key=lambda c: c[3])
+    for lam, key, _, score, _ in candidates:
+        logger.info(f"[{gene}]\t\t| "
+                    f"λ = {_format_lambda(lam, p0)} | "
+                    f"Weight: {(' '.join(w.capitalize() for w in key.split('_'))):20} | "
+                    f"Score = {score:6.2f}")
+
+    best_lambda, best_weight, _, best_score, _ = candidates[0]
+    if not np.isfinite(best_score):
+        logger.warning(f"[{gene}] All racing fits failed")
+    return best_lambda, best_weight
+
+
+def path_segment(
+        lambdas: np.ndarray,
+        weight_key: str,
+        x0: np.ndarray,
+        gene: str,
+        target: np.ndarray,
+        time_points: np.ndarray,
+        free_bounds: Tuple[np.ndarray, np.ndarray],
+        init_cond: np.ndarray,
+        num_psites: int,
+        p_data: np.ndarray
+) -> list:
+    """
+    Follow the regularization path of one weight scheme over consecutive λ values.
+
+    Each fit starts from the optimum of the previous λ; only the first one starts from `x0`.
+
+    Args:
+        lambdas: λ values in the order they are visited (strong to weak).
+        weight_key: Key of the weight scheme in `get_weight_options`.
+        x0: Starting parameters of the first fit, which also scale the logged λ.
+        gene: Gene name.
+        target: Target data.
+        time_points: Time points for the model fitting.
+        free_bounds: Parameter bounds for the optimization.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        p_data: Measurement data.
+
+    Returns:
+        List of (lambda value, weight key, parameters, score, converged) tuples, one per λ.
+    """
+    results = []
+    x = x0
+    for lam in lambdas:
+        result = fit_candidate(lam, weight_key, x, x0, 20000, gene, target, time_points, free_bounds,
+                               init_cond, num_psites, p_data)
+        if np.isfinite(result[3]):
+            x = result[2]
+        results.append(result)
+    return results
+
+
+def regularization_path(
+        gene: str,
+        target: np.ndarray,
+        p0: np.ndarray,
+        time_points: np.ndarray,
+        free_bounds: Tuple[np.ndarray, np.ndarray],
+        init_cond: np.ndarray,
+        num_psites: int,
+        p_data: np.ndarray,
+        lambdas=np.logspace(-2, 0, 10),
+        max_workers: int = 1,
+        chains: int = PATH_CHAINS
+) -> Tuple[float, str]:
+    """
+    Warm-started regularization path over λ for every weight scheme.
+
+    λ is walked from strong to weak so that each fit starts next to its optimum. The grid is
+    split into `chains` contiguous segments per weight scheme, which run in parallel in the
+    shared worker pool; the first fit of each segment starts from `p0`. The PATH_CONFIRM best
+    warm-started candidates are refitted from `p0`, and the best fit from `p0` is selected.
+
+    Args:
+        gene: Gene name.
+        target: Target data.
+        p0: Initial parameter guess.
+        time_points: Time points for the model fitting.
+        free_bounds: Parameter bounds for the optimization.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        p_data: Measurement data.
+        lambdas: Candidate regularization parameters.
+        max_workers: Number of workers of the shared pool; 1 follows the paths serially.
+        chains: Number of segments the λ grid is split into.
+
+    Returns:
+        Tuple of the best lambda value and weight key.
+    """
+    weight_keys = gene_weight_options(gene, target, time_points, num_psites,
+                                      use_regularization=True, reg_len=len(p0), p_data=p_data).keys()
+    args = (gene, target, time_points, free_bounds, init_cond, num_psites, p_data)
+    segments = [segment for segment in np.array_split(np.sort(lambdas)[::-1], max(1, chains)) if segment.size]
+    tasks = [(segment, key) for key in weight_keys for segment in segments]
+
+    if max_workers <= 1:
+        paths = [path_segment(segment, key, p0, *args) for segment, key in tasks]
+    else:
+        executor = get_worker_pool(max_workers)
+        futures = [executor.submit(path_segment, segment, key, p0, *args) for segment, key in tasks]
+        paths = [future.result() for future in futures]
+
+    results = [result for path in paths for result in path]
+    for lam, key, _, score, _ in results:
+        logger.info(f"[{gene}]\t\t| "
+                    f"λ = {_format_lambda(lam, p0)} | "
+                    f"Weight: {(' '.join(w.capitalize() for w in key.split('_'))):20} | "
+                    f"Score = {score:6.2f}")
+
+    # The final fit starts from p0, so a warm-started optimum only counts once a fit from p0
+    # reaches it too. The first fit of every segment already started from p0.
+    cold = [path[0] for path in paths]
+    warm = sorted((result for path in paths for result in path[1:]), key=lambda r: r[3])[:PATH_CONFIRM]
+    if max_workers <= 1:
+        confirmed = [fit_candidate(lam, key, p0, p0, 20000, *args) for lam, key, *_ in warm]
+    else:
+        futures = [executor.submit(fit_candidate, lam, key, p0, p0, 20000, *args) for lam, key, *_ in warm]
+        confirmed = [future.result() for future in futures]
+    for lam, key, _, score, _ in confirmed:
+        logger.info(f"[{gene}]\t\t| Refitted from p0: "
+                    f"λ = {_format_lambda(lam, p0)} | "
+                    f"Weight: {(' '.join(w.capitalize() for w in key.split('_'))):20} | "
+                    f"Score = {score:6.2f}")
+
+    best_lambda, best_weight, _, best_score, _ = min(cold + confirmed, key=lambda r: r[3])
+    if not np.isfinite(best_score):
+        logger.warning(f"[{gene}] All regularization path fits failed")
+    return best_lambda, best_weight
+
+
 def find_best_lambda(
         gene: str,
         target: np.ndarray,
@@ -121,54 +888,67 @@ def find_best_lambda(
         num_psites: int,
         p_data: np.ndarray,
         lambdas=np.logspace(-2, 0, 10),
-        max_workers: int = os.cpu_count(),
+        max_workers: int = None,
 ) -> Tuple[float, str]:
     """
     Finds best lambda_reg to use in model_func.
+
+    With LAMBDA_SEARCH = 'racing' the (λ, weight) candidates are raced by successive halving
+    (`race_lambda_weights`); with 'path' each weight scheme follows a warm-started
+    regularization path (`regularization_path`); with 'exhaustive' every candidate is fitted
+    to convergence from `p0`.
+    Fits run in the shared, warmed-up worker pool (`paramest.pool`) with `max_workers`
+    workers (defaults to the budget set by `set_lambda_workers`), or serially for one worker.
     """
 
     best_lambda = None
     best_score = np.inf
+    best_score_weight = None
+    max_workers = _lambda_workers if max_workers is None else max_workers
+
+    if LAMBDA_SEARCH == 'racing':
+        return race_lambda_weights(gene, target, p0, time_points, free_bounds, init_cond, num_psites, p_data,
+                                   lambdas, max_workers)
+    if LAMBDA_SEARCH == 'path':
+        return regularization_path(gene, target, p0, time_points, free_bounds, init_cond, num_psites, p_data,
+                                   lambdas, max_workers)
 
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(
-                worker_find_lambda,
-                lam, gene, target, p0, time_points, free_bounds,
-                init_cond, num_psites, p_data
-            ): lam for lam in lambdas
-        }
-        for future in as_completed(futures):
-            lam, score, weight = future.result()
+    args = (gene, target, p0, time_points, free_bounds, init_cond, num_psites, p_data)
+
+    if max_workers <= 1:
+        results = (worker_find_lambda(lam, *args) for lam in lambdas)
+        for lam, score, weight in results:
             if score < best_score:
                 best_score = score
                 best_lambda = lam
                 best_score_weight = weight
+        return best_lambda, best_score_weight
+
+    executor = get_worker_pool(max_workers)
+    futures = {
+        executor.submit(worker_find_lambda, lam, *args): lam for lam in lambdas
+    }
+    for future in as_completed(futures):
+        lam, score, weight = future.result()
+        if score < best_score:
+            best_score = score
+            best_lambda = lam
+            best_score_weight = weight
 
     return best_lambda, best_score_weight
 
 
-def normest(gene, p_data, r_data, init_cond, num_psites, time_points, bounds,
-            bootstraps, use_regularization=USE_REGULARIZATION):
+def parameter_bounds(bounds, num_psites):
     """
-    Function to estimate parameters for a given gene using ODE models.
+    Bounds of the optimised parameters (log-transformed for 'randmod').
 
     Args:
-        gene: Gene name.
-        p_data: Phosphorylation data.
-        r_data: Reference data.
-        init_cond: Initial conditions for the ODE solver.
+        bounds: Parameter bounds from the configuration.
         num_psites: Number of phosphorylation sites.
-        time_points: Time points for the model fitting.
-        bounds: Parameter bounds for the optimization.
-        bootstraps: Number of bootstrap iterations.
-        use_regularization: Whether to use regularization in the fitting process.
 
     Returns:
-        Tuple containing estimated parameters, model fits, error values, and regularization term.
+        Tuple of the lower and upper bounds.
     """
-    est_params, model_fits, error_vals = [], [], []
-
     if ODE_MODEL == 'randmod':
         # Build lower and upper bounds from config.
         lower_bounds_full = [
@@ -180,35 +960,59 @@ def normest(gene, p_data, r_data, init_cond, num_psites, time_points, bounds,
         # For phosphorylation parameters: use S(i) bounds.
         lower_bounds_full += [bounds["S(i)"][0]] * num_psites
         upper_bounds_full += [bounds["S(i)"][1]] * num_psites
-        # For dephosphorylation parameters: for each combination, use D(i) bounds.
-        for i in range(1, num_psites + 1):
-            for _ in combinations(range(1, num_psites + 1), i):
-                lower_bounds_full.append(bounds["D(i)"][0])
-                upper_bounds_full.append(bounds["D(i)"][1])
+        # For dephosphorylation parameters: one D(i) bound per phosphorylated state (2^n - 1).
+        num_states = (1 << num_psites) - 1
+        lower_bounds_full += [bounds["D(i)"][0]] * num_states
+        upper_bounds_full += [bounds["D(i)"][1]] * num_states
         # If using log scale, transform bounds (ensure lower bounds > 0)
         eps = 1e-8  # small epsilon to avoid log(0)
         lower_bounds_full = [np.log(max(b, eps)) for b in lower_bounds_full]
         upper_bounds_full = [np.log(b) for b in upper_bounds_full]
     else:
-        # Existing approach for distributive or successive models.
-        lower_bounds_full = (
-                [bounds["A"][0], bounds["B"][0], bounds["C"][0], bounds["D"][0]] +
-                [bounds["S(i)"][0]] * num_psites +
-                [bounds["D(i)"][0]] * num_psites
-        )
-        upper_bounds_full = (
-                [bounds["A"][1], bounds["B"][1], bounds["C"][1], bounds["D"][1]] +
-                [bounds["S(i)"][1]] * num_psites +
-                [bounds["D(i)"][1]] * num_psites
-        )
+        # Distributive, successive and reaction-network models: A-D use their own bounds,
+        # site-specific D<i> parameters use D(i) and every other rate uses S(i).
+        param_bounds = [
+            bounds[name] if name in ("A", "B", "C", "D")
+            else bounds["D(i)"] if name.startswith("D")
+            else bounds["S(i)"]
+            for name in get_param_names(num_psites)
+        ]
+        lower_bounds_full = [b[0] for b in param_bounds]
+        upper_bounds_full = [b[1] for b in param_bounds]
+
+    return lower_bounds_full, upper_bounds_full
 
-    free_bounds = (lower_bounds_full, upper_bounds_full)
+
+def normest(gene, p_data, r_data, init_cond, num_psites, time_points, bounds,
+            bootstraps, use_regularization=USE_REGULARIZATION, starts=1):
+    """
+    Function to estimate parameters for a given gene using ODE models.
+
+    Args:
+        gene: Gene name.
+        p_data: Phosphorylation data.
+        r_data: Reference data.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        time_points: Time points for the model fitting.
+        bounds: Parameter bounds for the optimization.
+        bootstraps: Number of bootstrap iterations.
+        use_regularization: Whether to use regularization in the fitting process.
+        starts: Number of local fits of the final estimation; more than one runs `multistart`.
+
+    Returns:
+        Tuple containing estimated parameters, model fits, error values, and regularization term.
+    """
+    free_bounds = parameter_bounds(bounds, num_psites)
 
     # Set seed for reproducibility.
     np.random.seed(42)
 
-    # Generate a random initial guess for the parameters.
-    p0 = np.array([np.random.uniform(low=l, high=u) for l, u in zip(*free_bounds)])
+    # Initial guess for the parameters: derived from the data, or drawn inside the bounds.
+    if INITIAL_GUESS == 'data':
+        p0 = initial_guess(gene, p_data, r_data, init_cond, num_psites, time_points, free_bounds)
+    else:
+        p0 = np.array([np.random.uniform(low=l, high=u) for l, u in zip(*free_bounds)])
 
     # Build the target vector from the measured data.
     target = np.concatenate([r_data.flatten(), p_data.flatten()])
@@ -220,59 +1024,31 @@ def normest(gene, p_data, r_data, init_cond, num_psites, time_points, bounds,
                                                  p_data)
 
     logger.info("           --------------------------------")
-    logger.info(f"[{gene}]      Using λ = {lambda_reg / len(p0) * np.sum(np.square(p0)): .4f}")
-
-    def model_func(tpts, *params):
-        """
-        Define the model function for curve fitting.
-
-        Args:
-            tpts: Time points.
-            params: Parameters for the model.
-
-        Returns:
-            y_model: Model predictions.
-        """
-        if ODE_MODEL == 'randmod':
-            param_vec = np.exp(np.asarray(params))
-        else:
-            param_vec = np.asarray(params)
-        _, p_fitted = solve_ode(param_vec, init_cond, num_psites, np.atleast_1d(tpts))
-        y_model = p_fitted.flatten()
-        if use_regularization:
-            reg = lambda_reg / len(param_vec) * np.square(params)
-            return np.concatenate([y_model, reg])
-        return y_model
+    logger.info(f"[{gene}]      Using λ = {_format_lambda(lambda_reg, p0)}")
 
     # Get weights for the model fitting.
-    early_weights = early_emphasis(p_data, time_points, num_psites)
-    ms_gauss_weights = get_protein_weights(gene)
-    weight_options = get_weight_options(target, time_points, num_psites,
-                                        use_regularization, len(p0), early_weights, ms_gauss_weights)
+    weight_options = gene_weight_options(gene, target, time_points, num_psites,
+                                         use_regularization, len(p0), p_data)
 
     # Use only the best weight returned from find_best_lambda
     sigma = weight_options[lambda_weight]
     wname = lambda_weight
 
     scores, popts, pcovs = {}, {}, {}
-    try:
-        result = cast(Tuple[np.ndarray, np.ndarray],
-                      curve_fit(model_func, time_points, target_fit, p0=p0,
-                                bounds=free_bounds, sigma=sigma, x_scale='jac',
-                                absolute_sigma=not USE_CUSTOM_WEIGHTS, maxfev=20000))
-        popt, pcov = result
-    except Exception as e:
-        logger.warning(f"[{gene}] Final fit failed for {wname}: {e}")
-        popt = p0
-        pcov = None
+    fit_args = (target, target_fit, sigma, lambda_reg, use_regularization, free_bounds, init_cond, num_psites,
+                time_points)
+    if starts > 1:
+        # Multi-start: best of several local fits; the distinct local minima are saved.
+        popt, pcov, score, minima = multistart(gene, p0, starts, *fit_args)
+        minima.to_csv(f"{OUT_DIR}/{gene}_multistart.csv", index=False)
+    else:
+        popt, pcov, score = local_fit(gene, p0, *fit_args)
 
     popts[wname] = popt
     pcovs[wname] = pcov
-    _, pred = solve_ode(np.exp(popt) if ODE_MODEL == 'randmod' else popt,
-                        init_cond, num_psites, time_points)
 
     # Calculate the score for the fit.
-    scores[wname] = score_fit(np.exp(popt) if ODE_MODEL == 'randmod' else popt, target, pred)
+    scores[wname] = score
 
     # Select the best weight based on the score.
     best_weight = min(scores, key=scores.get)
@@ -284,6 +1060,36 @@ def normest(gene, p_data, r_data, init_cond, num_psites, time_points, bounds,
     logger.info(f"[{gene}]      Fit Score: {scores[wname]:.2f}")
     logger.info("           --------------------------------")
 
+    return finalize_estimate(gene, popt_best, pcov_best, target, target_fit, sigma, lambda_reg, use_regularization,
+                             free_bounds, init_cond, num_psites, time_points, bootstraps)
+
+
+def finalize_estimate(gene, popt_best, pcov_best, target, target_fit, sigma, lambda_reg, use_regularization,
+                      free_bounds, init_cond, num_psites, time_points, bootstraps):
+    """
+    Confidence intervals, optional bootstrap and outputs of a fitted gene.
+
+    Args:
+        gene: Gene name.
+        popt_best: Best-fit parameters (as seen by the optimiser).
+        pcov_best: Their covariance (or None).
+        target: Target data.
+        target_fit: Target vector of the fit (including the regularization rows).
+        sigma: Weights of the fit.
+        lambda_reg: Regularization parameter.
+        use_regularization: Whether the regularization rows are part of the model vector.
+        free_bounds: Parameter bounds for the optimization.
+        init_cond: Initial conditions for the ODE solver.
+        num_psites: Number of phosphorylation sites.
+        time_points: Time points for the model fitting.
+        bootstraps: Number of bootstrap iterations.
+
+    Returns:
+        Tuple containing estimated parameters, model fits, error values, and regularization term.
+    """
+    est_params, model_fits, error_vals = [], [], []
+    model_func, _ = model_functions(init_cond, num_psites, lambda_reg, use_regularization)
+
     # Get confidence intervals for the best parameters.
     ci_results = confidence_intervals(
         gene,
@@ -294,41 +1100,16 @@ def normest(gene, p_data, r_data, init_cond, num_psites, time_points, bounds,
         alpha_val=ALPHA_CI
     )
 
+    popt_fit = popt_best
+
     # Bootstrapping with gaussian noise added to the target data.
-    boot_estimates = []
-    boot_covariances = []
     if bootstraps > 0:
         logger.info("           --------------------------------")
         logger.info(f"[{gene}]      Performing bootstrapping with {bootstraps} iterations")
         logger.info("           --------------------------------")
-        for _ in range(bootstraps):
-            noise = np.random.normal(0, 0.05, size=target_fit.shape)
-            noisy_target = target_fit * (1 + noise)
-            try:
-                # Attempt to fit the model using the noisy target.
-                result = cast(Tuple[np.ndarray, np.ndarray],
-                              curve_fit(model_func, time_points, noisy_target,
-                                        p0=popt_best, bounds=free_bounds, sigma=sigma,
-                                        absolute_sigma=not USE_CUSTOM_WEIGHTS, maxfev=20000))
-                popt_bs, pcov_bs = result
-            except Exception as e:
-                logger.warning(f"Bootstrapping iteration failed: {e}")
-                popt_bs = popt_best
-                pcov_bs = None
-            boot_estimates.append(popt_bs)
-            boot_covariances.append(pcov_bs)
-
-        # Convert boot_estimates to an array and compute the mean parameter estimates.
-        popt_best = np.mean(boot_estimates, axis=0)
-
-        # Process bootstrap covariance matrices:
-        # Only include iterations where pcov_bs is not None.
-        valid_covs = [cov for cov in boot_covariances if cov is not None]
-        if valid_covs:
-            # Compute an average covariance matrix from the valid ones.
-            pcov_best = np.mean(valid_covs, axis=0)
-        else:
-            pcov_best = None
+        # Mean of the replicate estimates and of their valid covariance matrices.
+        popt_best, pcov_best = bootstrap(bootstraps, popt_best, target_fit, sigma, lambda_reg,
+                                         use_regularization, free_bounds, init_cond, num_psites, time_points)
 
         # Compute confidence intervals.
         ci_results = confidence_intervals(
@@ -340,8 +1121,26 @@ def normest(gene, p_data, r_data, init_cond, num_psites, time_points, bounds,
             alpha_val=ALPHA_CI
         )
 
-    # Save the confidence intervals.
+    # Replace the linearized bounds by the profile-likelihood ones.
     param_names = get_param_names(num_psites)
+    identifiable = None
+    if CI_METHOD == 'profile':
+        logger.info(f"[{gene}]      Profiling the likelihood of {len(popt_fit)} parameters")
+        lwr, upr, identifiable, profiles = profile.profile_likelihood(
+            gene, popt_fit, target_fit, sigma, lambda_reg, use_regularization, free_bounds, init_cond, num_psites,
+            time_points, alpha=ALPHA_CI
+        )
+        profiles.to_csv(f"{OUT_DIR}/{gene}_profiles.csv", index=False)
+        if ci_results is None:
+            beta_hat = np.exp(popt_best) if ODE_MODEL == 'randmod' else popt_best
+            nan = np.full(len(beta_hat), np.nan)
+            ci_results = {'beta_hat': beta_hat, 'se_lin': nan, 'df_lin': max(target_fit.size - len(beta_hat), 1),
+                          't_stat': nan, 'pval': nan, 'qt_lin': np.nan}
+        # The bootstrap mean may lie slightly outside the profile interval of the best fit.
+        ci_results['lwr_ci'] = np.minimum(lwr, ci_results['beta_hat'])
+        ci_results['upr_ci'] = np.maximum(upr, ci_results['beta_hat'])
+
+    # Save the confidence intervals.
     ci_df = pd.DataFrame({
         'Parameter': param_names,
         'Estimate': ci_results['beta_hat'],
@@ -350,6 +1149,8 @@ def normest(gene, p_data, r_data, init_cond, num_psites, time_points, bounds,
         'Lower_95CI': ci_results['lwr_ci'],
         'Upper_95CI': ci_results['upr_ci']
     })
+    if identifiable is not None:
+        ci_df['Identifiable'] = identifiable
     ci_df.to_csv(f"{OUT_DIR}/{gene}_confidence_intervals.csv", index=False)
 
     plotter = Plotter(gene, OUT_DIR)
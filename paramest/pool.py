@@ -0,0 +1,92 @@
+import atexit
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from config.config import score_fit
+from config.constants import get_param_names
+from config.logconf import setup_logger
+from models import solve_ode, solve_ode_with_sensitivities
+from models.weights import get_weight_index
+from steady import initial_condition
+
+logger = setup_logger()
+
+# Start method of the worker processes. The parallel (prange) kernels start numba's threading
+# layer, which is not fork-safe; workers are therefore forked from a clean server process.
+MP_CONTEXT = multiprocessing.get_context('forkserver')
+
+# Long-lived worker pool of this process, created on first use by `get_worker_pool`
+_pool = None
+_pool_workers = 0
+
+
+def warm_up(num_psites=1):
+    """
+    Compile (or load from the numba cache) the kernels of the configured model in this process.
+
+    Solves a small problem once with `solve_ode` and `solve_ode_with_sensitivities` and loads the
+    weight index, so the first real fit of a worker does not pay for imports, compilation and I/O.
+
+    Args:
+        num_psites (int): Number of phosphorylation sites of the warm-up problem.
+    """
+    init_cond = initial_condition(num_psites)
+    params = np.full(len(get_param_names(num_psites)), 0.5)
+    time_points = np.array([0.0, 1.0, 2.0, 4.0, 8.0, 16.0, 30.0])
+    _, fit = solve_ode(params, init_cond, num_psites, time_points)
+    solve_ode_with_sensitivities(params, init_cond, num_psites, time_points)
+    score_fit(params, fit, fit)
+    try:
+        get_weight_index()
+    except FileNotFoundError:
+        pass
+
+
+def _init_pool_worker():
+    """
+    Initializer of the pool workers: warms up the model kernels once per worker.
+    """
+    try:
+        warm_up()
+    except Exception as e:
+        logger.warning(f"Worker warm-up failed: {e}")
+
+
+def get_worker_pool(max_workers=None):
+    """
+    Return the long-lived process pool shared by the parallel stages of a run.
+
+    The pool is created on first use with warmed-up workers and reused by every later call;
+    it is only rebuilt when a different number of workers is requested or a worker died.
+    It is shut down when the interpreter exits.
+
+    Args:
+        max_workers (int, optional): Number of worker processes. Defaults to os.cpu_count().
+
+    Returns:
+        ProcessPoolExecutor: The shared pool.
+    """
+    global _pool, _pool_workers
+    max_workers = max_workers or os.cpu_count() or 1
+    if _pool is None or _pool_workers != max_workers or getattr(_pool, '_broken', False):
+        shutdown_worker_pool()
+        _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=MP_CONTEXT,
+                                    initializer=_init_pool_worker)
+        _pool_workers = max_workers
+    return _pool
+
+
+def shutdown_worker_pool():
+    """
+    Shut down the shared pool, if one was created.
+    """
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+    _pool, _pool_workers = None, 0
+
+
+atexit.register(shutdown_worker_pool)
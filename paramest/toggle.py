@@ -1,4 +1,6 @@
+from config.constants import ESTIMATION_MODE, MULTISTART_STARTS
 from paramest.normest import normest
+from paramest.batchest import batch_normest
 
 
 def estimate_parameters(gene, p_data, r_data, init_cond, num_psites, time_points, bounds, bootstraps):
@@ -6,6 +8,7 @@ def estimate_parameters(gene, p_data, r_data, init_cond, num_psites, time_points
 
     This function allows for the selection of the estimation mode
     and handles the parameter estimation process accordingly.
+    With ESTIMATION_MODE = 'multistart' the final fit runs MULTISTART_STARTS local fits in parallel.
 
     Args:
         gene (str): Gene name.
@@ -26,11 +29,37 @@ def estimate_parameters(gene, p_data, r_data, init_cond, num_psites, time_points
     """
 
     # For normal estimation, we use the provided bounds and fixed parameters
+    starts = MULTISTART_STARTS if ESTIMATION_MODE == 'multistart' else 1
     estimated_params, model_fits, errors, reg_term = normest(
-        gene, p_data, r_data, init_cond, num_psites, time_points, bounds, bootstraps
+        gene, p_data, r_data, init_cond, num_psites, time_points, bounds, bootstraps, starts=starts
     )
 
     # For normal estimation, model_fits[0][1] is already an array of shape (num_psites, len(time_points))
     seq_model_fit = model_fits[0][1]
 
     return model_fits, estimated_params, seq_model_fit, errors, reg_term
+
+
+def estimate_parameters_batch(genes, p_datas, r_datas, init_cond, num_psites, time_points, bounds, bootstraps):
+    """
+    Batched estimation of several genes with the same number of phosphorylation sites
+    (ESTIMATION_MODE = 'batch').
+
+    Args:
+        genes (list): Gene names.
+        p_datas (list): Protein data of every gene.
+        r_datas (list): RNA data of every gene.
+        init_cond (array): Initial conditions for the model.
+        num_psites (int): Number of phosphorylation sites shared by the genes.
+        time_points (array): Time points for the data.
+        bounds (tuple): Bounds for the parameter estimation.
+        bootstraps (int): Number of bootstrap samples.
+
+    Returns:
+        dict: The result of `estimate_parameters` for every gene.
+    """
+    results = batch_normest(genes, p_datas, r_datas, init_cond, num_psites, time_points, bounds, bootstraps)
+    return {
+        gene: (model_fits, estimated_params, model_fits[0][1], errors, reg_term)
+        for gene, (estimated_params, model_fits, errors, reg_term) in results.items()
+    }
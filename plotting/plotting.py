@@ -1097,7 +1097,7 @@ class Plotter:
             plt.tight_layout()
             self._save_fig(fig, f"{self.gene}_sensitivity_phase_space_{x_state}_vs_{y_state}.png")
 
-    def plot_future_fit(self, P_data: np.ndarray, R_data: np.ndarray, sol: np.ndarray,
+    def plot_future_fit(self, P_data: np.ndarray, R_data: np.ndarray, sol,
                        num_psites: int, psite_labels: list, time_points: np.ndarray):
         """
         Plots the model fit for the future time points.
@@ -1105,11 +1105,14 @@ class Plotter:
         Args:
             P_data (np.ndarray): Data for phosphorylation sites.
             R_data (np.ndarray): Data for mRNA.
-            sol (np.ndarray): Model solution.
+            sol (np.ndarray or DenseSolution): Model solution at `time_points`, or the continuous
+                solution returned by `solve_ode(..., dense=True)`, which is evaluated at `time_points`.
             num_psites (int): Number of phosphorylation sites.
             psite_labels (list): Labels for phosphorylation sites.
-            time_points (np.ndarray): Time points for the data.
+            time_points (np.ndarray): Time points for the data, e.g. extended with `future_times`.
         """
+        if callable(sol):
+            sol, _ = sol(time_points)
         cutoff_idx = 8
         fig, axes = plt.subplots(1, 2, figsize=(16, 8), sharey=True)
         ax = axes[0]
@@ -1,16 +1,14 @@
 import math
-import os
-from concurrent.futures import as_completed, ProcessPoolExecutor
 from tqdm import tqdm
 import numpy as np
 from SALib.sample import morris
 from SALib.analyze.morris import analyze
 from numba import njit
 
-from config.constants import ODE_MODEL, NUM_TRAJECTORIES, PARAMETER_SPACE, TIME_POINTS_RNA, PERTURBATIONS_VALUE, \
+from config.constants import get_param_names, ODE_MODEL, NUM_TRAJECTORIES, PARAMETER_SPACE, TIME_POINTS_RNA, PERTURBATIONS_VALUE, \
     OUT_DIR, Y_METRIC
 from config.helpers import get_number_of_params_rand, get_param_names_rand
-from models import solve_ode
+from models import solve_ode, solve_ode_batch
 from plotting.plotting import Plotter
 from config.logconf import setup_logger
 
@@ -62,7 +60,7 @@ def define_sensitivity_problem_rand(num_psites, values):
 
 def define_sensitivity_problem_ds(num_psites, values):
     """
-    Defines the Morris sensitivity analysis problem for the dynamic-site model.
+    Defines the Morris sensitivity analysis problem for the distributive, successive and reaction-network models.
 
     Args:
         num_psites (int): Number of phosphorylation sites.
@@ -71,10 +69,8 @@ def define_sensitivity_problem_ds(num_psites, values):
     Returns:
         dict: A dictionary containing the number of variables, parameter names, and bounds.
     """
-    num_vars = 4 + 2 * num_psites
-    param_names = ['A', 'B', 'C', 'D'] + \
-                  [f'S{i + 1}' for i in range(num_psites)] + \
-                  [f'D{i + 1}' for i in range(num_psites)]
+    param_names = get_param_names(num_psites)
+    num_vars = len(param_names)
 
     assert len(values) == num_vars, "Length mismatch with values"
 
@@ -161,25 +157,6 @@ def _compute_Y(solution: np.ndarray, num_psites: int) -> float:
 
     raise ValueError("Unknown Y_METRIC")
 
-def _perturb_solve(i_X_tuple):
-    """
-    Worker: solve ODE for one parameter set.
-
-    Args:
-        i_X_tuple (tuple): A tuple containing the index and parameter values.
-
-    Returns:
-        tuple: The index, solution, flat phosphorylation site mRNA, and Y value.
-    """
-    i, X, init_cond, num_psites, time_points = i_X_tuple
-    A, B, C, D, *rest = X
-    S_list = rest[:num_psites]
-    D_list = rest[num_psites:]
-    params = (A, B, C, D, *S_list, *D_list)
-    solution, flat_psite_mRNA = solve_ode(params, init_cond, num_psites, time_points)
-    Y_val = _compute_Y(solution, num_psites)
-    return i, solution, flat_psite_mRNA, Y_val
-
 def _sensitivity_analysis(data, rna_data, popt, time_points, num_psites, psite_labels, state_labels, init_cond, gene):
     """
     Performs sensitivity analysis using the Morris method for a given ODE model.
@@ -206,39 +183,30 @@ def _sensitivity_analysis(data, rna_data, popt, time_points, num_psites, psite_l
     Y = np.zeros(len(param_values))
 
     # Initialize list to collect all trajectories
-    all_model_psite_solutions = np.zeros((len(param_values), len(time_points), num_psites))
-    all_protein_solutions = np.zeros((len(param_values), len(time_points)))
-    all_mrna_solutions = np.zeros((len(param_values), len(time_points)))
-    all_flat_mRNA = np.zeros((len(param_values), len(TIME_POINTS_RNA)))
     trajectories_with_params = []
 
-    # Build the iterable of arguments for the workers
-    tasks = [
-        (i, X, init_cond, num_psites, time_points)
-        for i, X in enumerate(param_values)
-    ]
-
     logger.info(f"[{gene}]      Sensitivity Analysis started...")
 
-    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
-        futures = {executor.submit(_perturb_solve, t): t[0] for t in tasks}
-        for fut in as_completed(futures):
-            i, solution, flat_psite_mRNA, Y_val = fut.result()
-            # Y represents the scalar model output (observable) used
-            # to compute sensitivity to parameter perturbations
-            # Total phosphorylation across all sites
-            Y[i] = Y_val
-            # Stack all collected solutions
-            # (n_samples, n_timepoints, n_sites)
-            all_mrna_solutions[i] = solution[:, 0]
-            all_protein_solutions[i] = solution[:, 1]
-            all_model_psite_solutions[i] = np.vstack(solution[:, 2:2 + num_psites])
-            all_flat_mRNA[i] = flat_psite_mRNA[:len(TIME_POINTS_RNA)]
-            trajectories_with_params.append({
-                "params": param_values[i],
-                "solution": solution,
-                "rmse": None
-            })
+    # Solve all Morris samples in one compiled, parallel call
+    # (n_samples, n_timepoints, n_states)
+    solutions = solve_ode_batch(param_values, init_cond, num_psites, time_points)
+
+    for i, solution in enumerate(solutions):
+        # Y represents the scalar model output (observable) used
+        # to compute sensitivity to parameter perturbations
+        # Total phosphorylation across all sites
+        Y[i] = _compute_Y(solution, num_psites)
+        trajectories_with_params.append({
+            "params": param_values[i],
+            "solution": solution,
+            "rmse": None
+        })
+
+    # Stack all collected solutions
+    all_mrna_solutions = solutions[:, :, 0]
+    all_protein_solutions = solutions[:, :, 1]
+    all_model_psite_solutions = solutions[:, :, 2:2 + num_psites]
+    all_flat_mRNA = solutions[:, 5:5 + len(TIME_POINTS_RNA), 0]
 
     Y = np.nan_to_num(Y, nan=0.0, posinf=0.0, neginf=0.0)
     logger.info(f"[{gene}]      Sensitivity Analysis completed")
@@ -1,4 +1,6 @@
-from config.constants import ODE_MODEL
+from functools import lru_cache
+
+from config.constants import ODE_MODEL, NETWORK
 
 if ODE_MODEL == 'distmod':
     from .initdist import initial_condition as initial_condition_impl
@@ -8,7 +10,39 @@ elif ODE_MODEL == 'randmod':
     from .initrand import initial_condition as initial_condition_impl
 elif ODE_MODEL == 'testmod':
     from .inittest import initial_condition as initial_condition_impl
+elif NETWORK is not None:
+    initial_condition_impl = NETWORK.initial_condition
 else:
     raise ValueError(f"Unsupported ODE_MODEL: {ODE_MODEL}")
 
-initial_condition = initial_condition_impl
+
+@lru_cache(maxsize=None)
+def _steady_state(model, num_psites):
+    return tuple(initial_condition_impl(num_psites))
+
+
+def initial_condition(num_psites):
+    """
+    Steady state of the configured model, used as the initial condition of every gene.
+
+    All rates are set to one, so the steady state only depends on the model and the number of
+    sites; it is solved once per (model, num_psites) and memoised for the process.
+
+    Args:
+        num_psites (int): Number of phosphorylation sites.
+
+    Returns:
+        list: Steady-state values in state-vector order (a new list on every call).
+    """
+    return list(_steady_state(ODE_MODEL, int(num_psites)))
+
+
+def precompute_initial_conditions(site_counts):
+    """
+    Solve the steady states of several site counts ahead of time, e.g. when a worker starts.
+
+    Args:
+        site_counts (iterable): Numbers of phosphorylation sites.
+    """
+    for num_psites in sorted(set(site_counts)):
+        initial_condition(num_psites)
@@ -1,11 +1,39 @@
 import numpy as np
-from scipy.optimize import minimize
 
 from config.logconf import setup_logger
 
 logger = setup_logger()
 
 
+def steady_state_system(num_psites: int):
+    """
+    Linear steady-state system of the distributive phosphorylation model with all rates set to one.
+
+    The time derivatives are dy/dt = M·y + b, so the steady state solves M·y = -b.
+
+    Args:
+        num_psites (int): Number of phosphorylation sites in the model.
+
+    Returns:
+        tuple: Matrix M and vector b for the variables [R, P, P_sites].
+    """
+    A, B, C, D = 1, 1, 1, 1
+    S_rates = np.ones(num_psites)
+    D_rates = np.ones(num_psites)
+    sites = np.arange(2, num_psites + 2)
+
+    M = np.zeros((num_psites + 2, num_psites + 2))
+    b = np.zeros(num_psites + 2)
+    # dR/dt = A - B * R
+    M[0, 0], b[0] = -B, A
+    # dP/dt = C * R - (D + sum(S)) * P + sum(P_sites)
+    M[1, 0], M[1, 1], M[1, sites] = C, -(D + np.sum(S_rates)), 1
+    # dP_i/dt = S_i * P - (1 + D_i) * P_i
+    M[sites, 1] = S_rates
+    M[sites, sites] = -(1 + D_rates)
+    return M, b
+
+
 def initial_condition(num_psites: int) -> list:
     """
     Calculates the initial steady-state conditions for a given number of phosphorylation sites
@@ -18,33 +46,13 @@ def initial_condition(num_psites: int) -> list:
         list: A list of steady-state values for the variables [R, P, P_sites].
 
     Raises:
-        ValueError: If the optimization fails to find a solution for the steady-state conditions.
+        ValueError: If the steady-state system has no positive solution.
     """
-    A, B, C, D = 1, 1, 1, 1
-    S_rates = np.ones(num_psites)
-    D_rates = np.ones(num_psites)
-
-    def steady_state_equations(y):
-        """
-        Defines the system of equations for the steady-state conditions.
-
-        Args:
-            y (list or np.ndarray): Current values of the variables [R, P, P_sites].
-
-        Returns:
-            list: Residuals of the steady-state equations.
-        """
-        R, P, *P_sites = y
-        dR_dt = A - B * R
-        dP_dt = C * R - (D + np.sum(S_rates)) * P + np.sum(P_sites)
-        dP_sites_dt = [S_rates[i] * P - (1 + D_rates[i]) * P_sites[i] for i in range(num_psites)]
-        return [dR_dt, dP_dt] + dP_sites_dt
-
-    y0_guess = np.ones(num_psites + 2)
-    bounds_local = [(1e-6, None)] * (num_psites + 2)
-    result = minimize(lambda y: 0, y0_guess, method='SLSQP', bounds=bounds_local,
-                      constraints={'type': 'eq', 'fun': steady_state_equations})
-    if result.success:
-        return result.x.tolist()
-    else:
+    M, b = steady_state_system(num_psites)
+    try:
+        y = np.linalg.solve(M, -b)
+    except np.linalg.LinAlgError as e:
+        raise ValueError("Failed to find steady-state conditions") from e
+    if not np.all(y > 0):
         raise ValueError("Failed to find steady-state conditions")
+    return y.tolist()
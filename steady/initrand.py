@@ -1,11 +1,65 @@
 import numpy as np
-from scipy.optimize import minimize
+import scipy.sparse as sp
+from scipy.sparse.linalg import spsolve, gmres
 from itertools import combinations
 
 from config.logconf import setup_logger
 
 logger = setup_logger()
 
+# Largest system (number of states) solved by sparse LU; larger ones are solved iteratively
+DIRECT_SOLVE_STATES = 1 << 10
+
+
+def steady_state_system(num_psites: int):
+    """
+    Sparse linear steady-state system of the random phosphorylation model with all rates set to one.
+
+    The phosphorylated states are the non-empty subsets of sites, ordered by size and then
+    lexicographically. Each state exchanges flux only with the subsets one site smaller or larger,
+    so M has O(n·2^n) non-zeros; states are addressed by their site bitmask.
+
+    Args:
+        num_psites (int): Number of phosphorylation sites in the model.
+
+    Returns:
+        tuple: CSR matrix M and vector b with dy/dt = M·y + b for the variables [R, P, P_sites].
+    """
+    A, B, C, D = 1, 1, 1, 1
+    S_rates = np.ones(num_psites)
+    masks = np.array([sum(1 << (site - 1) for site in comb)
+                      for k in range(1, num_psites + 1) for comb in combinations(range(1, num_psites + 1), k)],
+                     dtype=np.int64)
+    num_states = len(masks) + 2
+    D_params = np.ones(len(masks))
+    index = np.zeros(1 << num_psites, dtype=np.int64)
+    index[masks] = np.arange(len(masks)) + 2
+    states = index[masks]
+    has_site = (masks[:, np.newaxis] >> np.arange(num_psites)) & 1 == 1
+    size = has_site.sum(axis=1)
+
+    # dR/dt = A - B * R; dP/dt = C * R - (D + sum(S)) * P + singly phosphorylated states
+    rows = [np.array([0, 1, 1]), np.ones(num_psites, dtype=np.int64)]
+    cols = [np.array([0, 0, 1]), states[size == 1]]
+    vals = [np.array([-B, C, -(D + np.sum(S_rates))]), np.ones(num_psites)]
+    # Loss by further phosphorylation, dephosphorylation (one per site) and degradation
+    rows.append(states), cols.append(states)
+    vals.append(-(~has_site @ S_rates) - size - D_params)
+    for site in range(num_psites):
+        bit = 1 << site
+        on = has_site[:, site]
+        # Gain by phosphorylation of this site from the state without it (P for single sites)
+        rows.append(states[on]), cols.append(np.where(size[on] == 1, 1, index[masks[on] ^ bit]))
+        vals.append(np.full(on.sum(), S_rates[site]))
+        # Gain by dephosphorylation of this site from the state with it
+        rows.append(states[~on]), cols.append(index[masks[~on] | bit]), vals.append(np.ones((~on).sum()))
+
+    b = np.zeros(num_states)
+    b[0] = A
+    M = sp.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                      shape=(num_states, num_states))
+    return M, b
+
 
 def initial_condition(num_psites: int) -> list:
     """
@@ -19,59 +73,17 @@ def initial_condition(num_psites: int) -> list:
         list: A list of steady-state values for the variables [R, P, P_sites].
 
     Raises:
-        ValueError: If the optimization fails to find a solution for the steady-state conditions.
+        ValueError: If the steady-state system has no positive solution.
     """
-    subsets = []
-    for k in range(1, num_psites + 1):
-        for comb in combinations(range(1, num_psites + 1), k):
-            subsets.append(comb)
-    subset_to_index = {subset: i + 2 for i, subset in enumerate(subsets)}
-
-    def steady_state_equations(y):
-        """
-        Defines the system of equations for the steady-state conditions.
-
-        Args:
-            y (list or np.ndarray): Current values of the variables [R, P, P_sites].
-
-        Returns:
-            list: Residuals of the steady-state equations.
-        """
-        R, P, *phos = y
-        A, B, C, D = 1, 1, 1, 1
-        S_rates = np.ones(num_psites)
-        D_params = np.ones(len(subsets))
-        eq_R = A - B * R
-        gain_from_dephos = sum(phos[i] for i, subset in enumerate(subsets) if len(subset) == 1)
-        eq_P = C * R - D * P - np.sum(S_rates) * P + gain_from_dephos
-        eqs_phos = []
-        for i, subset in enumerate(subsets):
-            P_state = phos[i]
-            gain_phos = 0
-            for site in subset:
-                if len(subset) == 1:
-                    gain_phos += S_rates[site - 1] * P
-                else:
-                    reduced = tuple(sorted(set(subset) - {site}))
-                    if reduced in subset_to_index:
-                        gain_phos += S_rates[site - 1] * phos[subset_to_index[reduced] - 2]
-            loss_phos = sum(S_rates[site - 1] for site in range(1, num_psites + 1) if site not in subset) * P_state
-            basal_loss = len(subset) * P_state
-            additional_loss = D_params[i] * P_state
-            gain_from_further = 0
-            for site in range(1, num_psites + 1):
-                if site not in subset:
-                    new_state = tuple(sorted(subset + (site,)))
-                    if new_state in subset_to_index:
-                        gain_from_further += phos[subset_to_index[new_state] - 2]
-            eqs_phos.append(gain_phos - loss_phos - basal_loss - additional_loss + gain_from_further)
-        return [eq_R, eq_P] + eqs_phos
-
-    y0_guess = np.ones(len(subsets) + 2)
-    bounds_local = [(1e-6, None)] * (len(subsets) + 2)
-    result = minimize(lambda y: 0, y0_guess, method='SLSQP', bounds=bounds_local,
-                      constraints={'type': 'eq', 'fun': steady_state_equations})
-    if result.success:
-        return result.x.tolist()
+    M, b = steady_state_system(num_psites)
+    if M.shape[0] <= DIRECT_SOLVE_STATES:
+        y = spsolve(M.tocsc(), -b)
     else:
+        # LU factors of the hypercube fill in quickly; M is diagonally dominant, so
+        # Jacobi-preconditioned GMRES converges in a few iterations instead.
+        y, info = gmres(M, -b, rtol=1e-12, atol=0.0, restart=50, maxiter=1000, M=sp.diags(1 / M.diagonal()))
+        if info != 0:
+            raise ValueError("Failed to find steady-state conditions")
+    if not np.all(np.isfinite(y)) or not np.all(y > 0):
         raise ValueError("Failed to find steady-state conditions")
+    return y.tolist()
@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from config.constants import TIME_POINTS, get_param_names
+from knockout import apply_knockout, generate_knockout_combinations, knockout_screen
+from knockout.scenarios import load_fitted_params, load_scenarios, run_screens
+from models import solve_ode
+from steady import initial_condition
+
+
+def test_knockout_screen_matches_single_solves():
+    """
+    Test that the batched screen reproduces `solve_ode` for every setting, covers all site pairs
+    and reports no effect for the wild type.
+    """
+    num_psites = 3
+    rng = np.random.default_rng(0)
+    init_cond = initial_condition(num_psites)
+    params = rng.uniform(0.1, 2.0, len(get_param_names(num_psites)))
+    labels = ["S1", "S2", "S3"]
+
+    screen = knockout_screen(params, init_cond, num_psites, TIME_POINTS, labels, site_order=2)
+    # 2 x 2 transcription/translation settings x (none, all, 3 single sites, 3 pairs)
+    assert len(screen['names']) == len(set(screen['names'])) == 4 * 8
+    assert screen['names'][0] == "WT" and "PhosphoSite KO S1,S3" in screen['names']
+    assert screen['solutions'].shape == (32, TIME_POINTS.size, len(init_cond))
+
+    for setting, sol, fit in zip(screen['settings'], screen['solutions'], screen['fits']):
+        sol_ref, fit_ref = solve_ode(apply_knockout(params, setting, num_psites), init_cond, num_psites, TIME_POINTS)
+        np.testing.assert_allclose(sol, sol_ref, rtol=1e-6, atol=1e-9)
+        np.testing.assert_allclose(fit, fit_ref, rtol=1e-6, atol=1e-9)
+
+    effects = screen['effects']
+    assert len(effects) == 32 * (num_psites + 2)
+    wild_type = effects[effects['Knockout'] == "WT"]
+    np.testing.assert_allclose(wild_type[['Log2FC_AUC', 'Max_Abs_Diff']], 0.0, atol=1e-12)
+    assert len(generate_knockout_combinations(num_psites)) == 4 * 5
+
+
+def test_knockout_screens_stream_over_saved_parameters(tmp_path):
+    """
+    Test that saved parameters are loaded from the results workbook, that named rate-scaling and
+    site-label scenarios are applied and that the parallel screen streams every gene to disk.
+    """
+    rng = np.random.default_rng(1)
+    path = tmp_path / "results.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        for gene, num_psites in (("G1", 1), ("G2", 2)):
+            names = get_param_names(num_psites)
+            params = pd.DataFrame([rng.uniform(0.1, 1.0, len(names))], columns=names)
+            params.insert(0, "Time(min)", 0.0)
+            params.insert(0, "Gene", gene)
+            params["Regularization"] = 0.0
+            params.to_excel(writer, sheet_name=f"{gene}_params", index=False)
+            sites = pd.DataFrame(np.zeros((num_psites, 1)), index=[f"S{i + 10}" for i in range(num_psites)])
+            sites.to_excel(writer, sheet_name=f"{gene}_site_estimates")
+
+    fitted = load_fitted_params(path)
+    assert {gene: n for gene, (_, n, _) in fitted.items()} == {"G1": 1, "G2": 2}
+    assert fitted["G2"][2] == ["S10", "S11"]
+
+    scenario_path = tmp_path / "scenarios.json"
+    scenario_path.write_text(json.dumps([{"name": "fast decay", "scale": {"B": 2.0}},
+                                         {"phosphorylation": ["S11"]}]))
+    scenarios = load_scenarios(scenario_path)
+    params, num_psites, labels = fitted["G2"]
+    scaled = apply_knockout(params, scenarios[0], num_psites)
+    assert scaled[1] == 2 * params[1] and np.all(np.delete(scaled, 1) == np.delete(params, 1))
+
+    for workers in (1, 2):
+        out_dir = tmp_path / f"screen_{workers}"
+        assert run_screens(fitted, TIME_POINTS, out_dir, scenarios, max_workers=workers) == 2
+        effects = pd.read_csv(out_dir / "knockout_effects.csv")
+        assert set(effects["Gene"]) == {"G1", "G2"}
+        assert set(effects.loc[effects["Gene"] == "G2", "Knockout"]) == {"WT", "fast decay", "PhosphoSite KO S11"}
+        assert set(effects.loc[effects["Gene"] == "G1", "Knockout"]) == {"WT", "fast decay"}
+        with np.load(out_dir / "trajectories" / "G2.npz") as data:
+            assert data["solutions"].shape == (3, TIME_POINTS.size, len(initial_condition(2)))
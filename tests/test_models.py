@@ -0,0 +1,311 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.integrate import odeint
+from scipy.sparse.linalg import spsolve
+
+from config.constants import TIME_POINTS
+from models import distmod, succmod, randmod, network, succnet, weights
+from models.solvers import solve_linear, select_solver, tolerance_stage, get_tolerances
+import steady
+from steady import initdist, initsucc, initrand
+
+
+@pytest.mark.parametrize("module", [distmod, succmod])
+@pytest.mark.parametrize("method", ["expm", "eig"])
+@pytest.mark.parametrize("num_psites", [1, 3, 6])
+def test_linear_solvers_match_odeint(module, method, num_psites):
+    """
+    Test that the exact linear backends reproduce the odeint solution.
+    """
+    rng = np.random.default_rng(num_psites)
+    for _ in range(5):
+        params = rng.uniform(0, 20, 4 + 2 * num_psites)
+        y0 = rng.uniform(0.1, 1.0, num_psites + 2)
+        A, B, C, D, S_rates, D_rates = module.unpack_params(params, num_psites)
+        ref = odeint(module.ode_core, y0, TIME_POINTS, args=(A, B, C, D, S_rates, D_rates),
+                     rtol=1e-11, atol=1e-12)
+        M, b = module.linear_system(A, B, C, D, S_rates, D_rates)
+        sol = solve_linear(M, b, y0, TIME_POINTS, method=method)
+        np.testing.assert_allclose(sol, ref, rtol=1e-6, atol=1e-8)
+
+
+@pytest.mark.parametrize("module", [distmod, succmod])
+@pytest.mark.parametrize("solver", ["odeint", "expm", "eig"])
+def test_sensitivities_match_finite_differences(module, solver, monkeypatch):
+    """
+    Test that the forward-sensitivity Jacobian agrees with central differences of `solve_ode`.
+    """
+    monkeypatch.setattr(module, "ODE_SOLVER", solver)
+    num_psites = 3
+    rng = np.random.default_rng(0)
+    params = rng.uniform(0.1, 3.0, 4 + 2 * num_psites)
+    y0 = rng.uniform(0.2, 1.0, num_psites + 2)
+    sol, fit, jac = module.solve_ode_with_sensitivities(params, y0, num_psites, TIME_POINTS)
+    ref_sol, ref_fit = module.solve_ode(params, y0, num_psites, TIME_POINTS)
+    np.testing.assert_allclose(fit, ref_fit, rtol=1e-5, atol=1e-7)
+    fd = np.empty_like(jac)
+    for i in range(params.size):
+        step = np.zeros_like(params)
+        step[i] = 1e-5
+        upper = module.solve_ode(params + step, y0, num_psites, TIME_POINTS)[1]
+        lower = module.solve_ode(params - step, y0, num_psites, TIME_POINTS)[1]
+        fd[:, i] = (upper - lower) / 2e-5
+    np.testing.assert_allclose(jac, fd, rtol=1e-3, atol=1e-3)
+
+
+@pytest.mark.parametrize("module", [distmod, succmod, randmod])
+@pytest.mark.parametrize("num_psites", [1, 3])
+def test_solve_ode_batch_matches_solve_ode(module, num_psites):
+    """
+    Test that the batched ensemble solver reproduces `solve_ode` row by row.
+    """
+    rng = np.random.default_rng(num_psites)
+    if module is randmod:
+        num_params, num_states = 4 + num_psites + (1 << num_psites) - 1, 2 + (1 << num_psites) - 1
+    else:
+        num_params, num_states = 4 + 2 * num_psites, 2 + num_psites
+    param_matrix = rng.uniform(0.01, 5.0, (20, num_params))
+    y0 = rng.uniform(0.1, 1.0, num_states)
+    batch = module.solve_ode_batch(param_matrix, y0, num_psites, TIME_POINTS)
+    assert batch.shape == (20, TIME_POINTS.size, num_states)
+    for i, params in enumerate(param_matrix):
+        sol, _ = module.solve_ode(params, y0, num_psites, TIME_POINTS)
+        np.testing.assert_allclose(batch[i], sol, rtol=1e-5, atol=1e-7)
+
+
+@pytest.mark.parametrize("num_psites", [1, 3, 4])
+def test_sparse_randmod_matches_dense(num_psites, monkeypatch):
+    """
+    Test that the sparse random-model operator, its exact propagation (single and batched) and
+    the BDF sensitivity solve agree with the dense kernels.
+    """
+    rng = np.random.default_rng(num_psites)
+    m = (1 << num_psites) - 1
+    params = rng.uniform(0.1, 3.0, 4 + num_psites + m)
+    y0 = rng.uniform(0.1, 1.0, 2 + m)
+    A, B, C, D, S, Ddeg = randmod.unpack_params(params, num_psites)
+    args = (A, B, C, D, num_psites, S, Ddeg, *randmod._precompute_indices(num_psites))
+    M, b = randmod.linear_system(*args)
+    M_sparse, b_sparse = randmod.sparse_linear_system(params, num_psites)
+    np.testing.assert_allclose(M_sparse.toarray(), M, atol=1e-12)
+    np.testing.assert_allclose(b_sparse, b)
+
+    ref_sol, ref_sens = randmod.integrate_sensitivities(
+        randmod.sensitivity_rhs, randmod.sensitivity_jacobian, y0, params.size, TIME_POINTS, args)
+    sol, sens = randmod._solve_sparse_sensitivities(params, y0, num_psites, TIME_POINTS)
+    np.testing.assert_allclose(sol, ref_sol, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(sens, ref_sens, rtol=1e-4, atol=1e-5)
+    np.testing.assert_allclose(randmod._solve_sparse(params, y0, num_psites, TIME_POINTS), ref_sol,
+                               rtol=1e-5, atol=1e-6)
+
+    param_matrix = rng.uniform(0.1, 3.0, (3, params.size))
+    dense = randmod.solve_ode_batch(param_matrix, y0, num_psites, TIME_POINTS)
+    monkeypatch.setattr(randmod, "SPARSE_RANDMOD_MIN_SITES", 1)
+    np.testing.assert_allclose(randmod.solve_ode_batch(param_matrix, y0, num_psites, TIME_POINTS), dense,
+                               rtol=1e-6, atol=1e-9)
+
+
+@pytest.mark.parametrize("module", [distmod, succmod, randmod])
+def test_sdirk_matches_odeint(module, monkeypatch):
+    """
+    Test that the compiled SDIRK backend reproduces the odeint solution for every model.
+    """
+    rng = np.random.default_rng(7)
+    for num_psites in (1, 3):
+        if module is randmod:
+            num_params, num_states = 4 + num_psites + (1 << num_psites) - 1, 2 + (1 << num_psites) - 1
+        else:
+            num_params, num_states = 4 + 2 * num_psites, 2 + num_psites
+        params = rng.uniform(0.01, 20.0, num_params)
+        y0 = rng.uniform(0.1, 1.0, num_states)
+        monkeypatch.setattr(module, "ODE_SOLVER", "odeint")
+        ref_sol, ref_fit = module.solve_ode(params, y0, num_psites, TIME_POINTS)
+        monkeypatch.setattr(module, "ODE_SOLVER", "sdirk")
+        sol, fit = module.solve_ode(params, y0, num_psites, TIME_POINTS)
+        np.testing.assert_allclose(sol, ref_sol, rtol=1e-5, atol=1e-7)
+        np.testing.assert_allclose(fit, ref_fit, rtol=1e-5, atol=1e-7)
+
+
+@pytest.mark.parametrize("module", [distmod, succmod, randmod])
+def test_dense_solution_matches_solve_ode(module):
+    """
+    Test that the cached continuous solution reproduces `solve_ode` on the MS grid and on extended time points.
+    """
+    rng = np.random.default_rng(11)
+    num_psites = 3
+    if module is randmod:
+        num_params, num_states = 4 + num_psites + (1 << num_psites) - 1, 2 + (1 << num_psites) - 1
+    else:
+        num_params, num_states = 4 + 2 * num_psites, 2 + num_psites
+    params = rng.uniform(0.01, 5.0, num_params)
+    y0 = rng.uniform(0.1, 1.0, num_states)
+    dense = module.solve_ode(params, y0, num_psites, TIME_POINTS, dense=True)
+    assert module.solve_ode(params, y0, num_psites, TIME_POINTS, dense=True) is dense
+    extended = np.append(TIME_POINTS, [1920.0, 3840.0])
+    for t in (TIME_POINTS, extended):
+        ref_sol, ref_fit = module.solve_ode(params, y0, num_psites, t)
+        sol, fit = dense(t)
+        np.testing.assert_allclose(sol, ref_sol, rtol=1e-5, atol=1e-7)
+        np.testing.assert_allclose(fit, ref_fit, rtol=1e-5, atol=1e-7)
+
+
+def test_random_sensitivity_sparsity():
+    """
+    Test that the structural sparsity of the random model matches the non-zeros of its integrated sensitivities.
+    """
+    rng = np.random.default_rng(3)
+    T = TIME_POINTS.size
+    for num_psites in (2, 3):
+        params = rng.uniform(0.5, 1.5, 4 + num_psites + (1 << num_psites) - 1)
+        y0 = np.array(initrand.initial_condition(num_psites))
+        _, _, jac = randmod.solve_ode_with_sensitivities(params, y0, num_psites, TIME_POINTS)
+        blocks = [jac[:T - 5]] + [jac[T - 5 + i * T:T - 5 + (i + 1) * T] for i in range(num_psites)]
+        expected = np.array([(block != 0).any(axis=0) for block in blocks])
+        np.testing.assert_array_equal(randmod.sensitivity_sparsity(num_psites), expected)
+
+
+def test_reaction_network_kernels():
+    """
+    Test that a declared network reproduces the hand-written successive and distributive models
+    (including their steady states), and that the generated Jacobian of a nonlinear network matches finite differences.
+    """
+    distributive = network.ReactionNetwork(
+        'Distributive', ['R', 'P', 'P{i}'], ['A', 'B', 'C', 'D', 'S{i}', 'D{i}'],
+        ['-> R : A', 'R -> : B', 'R -> R + P : C', 'P -> : D',
+         'P -> P{i} : S{i}', 'P{i} -> P : 1', 'P{i} -> : D{i}'])
+    rng = np.random.default_rng(5)
+    for net, module, init in ((succnet.NETWORK, succmod, initsucc), (distributive, distmod, initdist)):
+        for num_psites in (1, 3):
+            np.testing.assert_allclose(net.initial_condition(num_psites), init.initial_condition(num_psites),
+                                       rtol=1e-10)
+            params = rng.uniform(0.1, 3.0, 4 + 2 * num_psites)
+            y0 = rng.uniform(0.1, 1.0, 2 + num_psites)
+            args = module.unpack_params(params, num_psites)
+            M, b = network.linear_system(params, *net.tables(num_psites))
+            ref_M, ref_b = module.linear_system(*args)
+            np.testing.assert_allclose(M, ref_M)
+            np.testing.assert_allclose(b, ref_b)
+            np.testing.assert_allclose(network.param_jacobian(y0, 0.0, params, *net.tables(num_psites)),
+                                       module.param_jacobian(y0, 0.0, *args))
+            assert net.get_param_names(num_psites) == ['A', 'B', 'C', 'D'] + \
+                [f'S{i}' for i in range(1, num_psites + 1)] + [f'D{i}' for i in range(1, num_psites + 1)]
+            np.testing.assert_allclose(net.solve_ode(params, y0, num_psites, TIME_POINTS)[1],
+                                       module.solve_ode(params, y0, num_psites, TIME_POINTS)[1], rtol=1e-5, atol=1e-7)
+
+    dimer = network.ReactionNetwork(
+        'Dimer', ['R', 'P', 'P{i}', 'Q'], ['A', 'B', 'C', 'D', 'S{i}', 'K'],
+        ['-> R : A', 'R -> : B', 'R -> R + P : C', 'P -> : D', 'P -> P{i} : S{i}', 'P{i} -> P : 1',
+         '2 P -> Q : K', 'Q -> : 0.5 * K'])
+    tables = dimer.tables(2)
+    params = rng.uniform(0.1, 2.0, 7)
+    y0 = rng.uniform(0.1, 1.0, 5)
+    fd = np.array([(network.network_rhs(y0 + 1e-7 * e, 0.0, params, *tables) -
+                    network.network_rhs(y0 - 1e-7 * e, 0.0, params, *tables)) / 2e-7 for e in np.eye(5)]).T
+    np.testing.assert_allclose(network.network_jacobian(y0, 0.0, params, *tables), fd, atol=1e-6)
+    assert not dimer.is_linear(2)
+
+
+@pytest.mark.parametrize("module", [distmod, succmod, randmod])
+def test_solver_policy_and_tolerance_stage(module, monkeypatch):
+    """
+    Test the 'auto', 'bdf' and 'radau' backends against the exact solution and the tolerance schedule.
+    """
+    rng = np.random.default_rng(3)
+    num_psites = 2
+    if module is randmod:
+        num_params, num_states = 4 + num_psites + (1 << num_psites) - 1, 2 + (1 << num_psites) - 1
+    else:
+        num_params, num_states = 4 + 2 * num_psites, 2 + num_psites
+    params = rng.uniform(0.01, 20.0, num_params)
+    y0 = rng.uniform(0.1, 1.0, num_states)
+    monkeypatch.setattr(module, "ODE_SOLVER", "eig")
+    ref_sol, _ = module.solve_ode(params, y0, num_psites, TIME_POINTS)
+    for solver in ("auto", "bdf", "radau"):
+        monkeypatch.setattr(module, "ODE_SOLVER", solver)
+        sol, _ = module.solve_ode(params, y0, num_psites, TIME_POINTS)
+        np.testing.assert_allclose(sol, ref_sol, rtol=1e-5, atol=1e-7)
+
+    # The exact backend is chosen for small linear systems, the compiled SDIRK for small stiff nonlinear ones
+    M = -np.diag(rng.uniform(1.0, 20.0, 4))
+    assert select_solver(M, TIME_POINTS, linear=True) == 'eig'
+    assert select_solver(M, TIME_POINTS, linear=False) == 'sdirk'
+    assert select_solver(M * 1e-6, TIME_POINTS, linear=False) == 'odeint'
+
+    final = get_tolerances()
+    with tolerance_stage('search') as tolerances:
+        assert get_tolerances() == tolerances and tolerances[0] > final[0]
+    assert get_tolerances() == final
+
+    # Interleaved stages of concurrent threads do not leak into each other or into later fits
+    steps = [threading.Event() for _ in range(2)]
+    after = {}
+
+    def stage(name, wait, signal):
+        with tolerance_stage('search'):
+            if wait is not None:
+                steps[wait].wait(10)
+            steps[signal].set()
+            if name == 'B':
+                steps[1].wait(10)
+        after[name] = get_tolerances()
+
+    threads = [threading.Thread(target=stage, args=('A', 0, 1)), threading.Thread(target=stage, args=('B', None, 0))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert after == {'A': final, 'B': final} and get_tolerances() == final
+
+
+def test_weight_index_lookup(tmp_path):
+    """
+    Test the indexed weight store against the input files and its rebuild when a file changes.
+    """
+    std_columns = [f'x{i}_std' for i in range(1, 15)]
+    input1 = pd.DataFrame([['G1', 'S1'] + [1.0] * 14, ['G1', 'T5'] + [2.0] * 14, ['G2', 'Y3'] + [3.0] * 14],
+                          columns=['GeneID', 'Psite'] + std_columns)
+    input2 = pd.DataFrame({'GeneID': ['G1', 'G2', 'G1', 'G3'], 'Psite': ['T5', 'Y3', 'S1', 'S9']})
+    input1.to_csv(tmp_path / 'input1.csv', index=False)
+    input2.to_csv(tmp_path / 'input2.csv', index=False)
+    paths = (tmp_path / 'input1.csv', tmp_path / 'input2.csv')
+
+    np.testing.assert_array_equal(weights.get_protein_weights('G1', *paths), [2.0] * 14 + [1.0] * 14)
+    np.testing.assert_array_equal(weights.get_protein_weights('G2', *paths), [3.0] * 14)
+    with pytest.raises(ValueError, match="Missing"):
+        weights.get_protein_weights('G3', *paths)
+    with pytest.raises(ValueError, match="No entries"):
+        weights.get_protein_weights('G4', *paths)
+
+    input2.iloc[:2].to_csv(tmp_path / 'input2.csv', index=False)
+    os.utime(tmp_path / 'input2.csv', ns=(0, 0))
+    np.testing.assert_array_equal(weights.get_protein_weights('G1', *paths), [2.0] * 14)
+
+
+@pytest.mark.parametrize("num_psites", [1, 3, 11])
+def test_steady_state_linear_solve(num_psites):
+    """
+    Test the linear steady-state solvers against the closed form of the distributive model, the
+    linear system of the successive model and the direct sparse solve of the random model, and the
+    memoised lookup.
+    """
+    P = 1 / (1 + num_psites / 2)
+    expected = [1.0, P] + [P / 2] * num_psites
+    np.testing.assert_allclose(initdist.initial_condition(num_psites), expected, rtol=1e-12)
+
+    y = np.array(initsucc.initial_condition(num_psites))
+    M, b = succmod.linear_system(1.0, 1.0, 1.0, 1.0, np.ones(num_psites), np.ones(num_psites))
+    assert np.all(y > 0)
+    np.testing.assert_allclose(M @ y + b, 0.0, atol=1e-12)
+
+    y = np.array(initrand.initial_condition(num_psites))
+    M, b = initrand.steady_state_system(num_psites)
+    assert y.size == (1 << num_psites) + 1 and np.all(y > 0)
+    np.testing.assert_allclose(y, spsolve(M.tocsc(), -b), rtol=1e-9)
+
+    first = steady.initial_condition(num_psites)
+    first[0] = -1.0
+    assert steady.initial_condition(num_psites)[0] > 0
@@ -0,0 +1,268 @@
+from functools import partial
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config.constants import TIME_POINTS, get_param_names
+from config.helpers import get_param_names_ds
+from models import solve_ode, weights, succmod, distmod
+from paramest import normest, initguess, batchest, cache, core
+from paramest.identifiability import profile_likelihood
+from steady import initial_condition, initsucc, initdist
+
+
+@pytest.fixture
+def synthetic_problem():
+    """
+    Noise-free two-site problem: random parameters, their fit vector, the target with zero
+    regularization rows and [0, 20] bounds. `rng` continues the stream the parameters were drawn from.
+    """
+    num_psites = 2
+    rng = np.random.default_rng(0)
+    init_cond = initial_condition(num_psites)
+    num_params = len(get_param_names(num_psites))
+    params = rng.uniform(0.05, 2.0, num_params)
+    _, fit = solve_ode(params, init_cond, num_psites, TIME_POINTS)
+    return SimpleNamespace(
+        num_psites=num_psites,
+        num_params=num_params,
+        rng=rng,
+        init_cond=init_cond,
+        params=params,
+        fit=fit,
+        target_fit=np.concatenate([fit, np.zeros(num_params)]),
+        bounds=([0.0] * num_params, [20.0] * num_params),
+    )
+
+
+@pytest.fixture(params=["succmod", "distmod"])
+def lambda_search_problem(request, monkeypatch):
+    """
+    Noisy two-site λ search problem under the successive and the distributive model, with custom
+    weights. `score` fits one (λ, weight) candidate from `p0`, as the final estimation does, and
+    returns its score; `select` runs `find_best_lambda` with the given LAMBDA_SEARCH.
+    """
+    model = request.param
+    num_psites = 2
+    module, steady_module = {"succmod": (succmod, initsucc), "distmod": (distmod, initdist)}[model]
+    monkeypatch.setattr(normest, "ODE_MODEL", model)
+    monkeypatch.setattr(normest, "solve_ode", module.solve_ode)
+    monkeypatch.setattr(normest, "solve_ode_with_sensitivities", module.solve_ode_with_sensitivities)
+    monkeypatch.setattr(normest, "sensitivity_sparsity", getattr(module, "sensitivity_sparsity", None))
+    monkeypatch.setattr(normest, "_sparsity_cache", {})
+    monkeypatch.setattr(normest, "get_param_names", get_param_names_ds)
+    monkeypatch.setattr(weights, "get_protein_weights", lambda gene, *args: np.full(num_psites * 14, 0.1))
+    monkeypatch.setattr(weights, "USE_CUSTOM_WEIGHTS", True)
+    monkeypatch.setattr(weights, "_weight_options_cache", {})
+    rng = np.random.default_rng(1)
+    init_cond = np.asarray(steady_module.initial_condition(num_psites))
+    num_params = len(get_param_names_ds(num_psites))
+    _, fit = module.solve_ode(rng.uniform(0.05, 2.0, num_params), init_cond, num_psites, TIME_POINTS)
+    target = fit * (1 + 0.05 * rng.standard_normal(fit.size))
+    bounds = ([0.0] * num_params, [20.0] * num_params)
+    p0 = rng.uniform(0.0, 20.0, num_params)
+    lambdas = np.logspace(-2, 0, 4)
+    args = ("TEST", target, TIME_POINTS, bounds, init_cond, num_psites, target[9:].reshape(num_psites, -1))
+
+    def score(lam, weight_key):
+        return normest.fit_candidate(lam, weight_key, p0, p0, 20000, *args)[3]
+
+    def select(search):
+        monkeypatch.setattr(normest, "LAMBDA_SEARCH", search)
+        return normest.find_best_lambda("TEST", target, p0, TIME_POINTS, bounds, init_cond, num_psites,
+                                        target[9:].reshape(num_psites, -1), lambdas, max_workers=1)
+
+    return SimpleNamespace(score=score, select=select)
+
+
+def test_racing_matches_exhaustive_lambda_search(lambda_search_problem):
+    """
+    Test that the (λ, weight) selected by the successive-halving search fits the data about as well
+    as the one selected by the exhaustive search.
+    """
+    p = lambda_search_problem
+    assert p.score(*p.select("racing")) <= 1.05 * p.score(*p.select("exhaustive"))
+
+
+def test_regularization_path_matches_exhaustive_lambda_search(lambda_search_problem):
+    """
+    Test that the (λ, weight) selected by the warm-started regularization path, refitted from the
+    initial guess, fits the data about as well as the one selected by the exhaustive search.
+    """
+    p = lambda_search_problem
+    assert p.score(*p.select("path")) <= 1.05 * p.score(*p.select("exhaustive"))
+
+
+def test_failed_candidate_logs_formatted_lambda(synthetic_problem, monkeypatch, caplog):
+    """
+    Test that a failed racing candidate logs λ the way every other λ log line does.
+    """
+    p = synthetic_problem
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("diverged")
+
+    monkeypatch.setattr(normest, "fit_model", fail)
+    monkeypatch.setattr(normest, "gene_weight_options", lambda *args, **kwargs: {"flat": np.ones(p.target_fit.size)})
+    p0 = p.params * 2
+    result = normest.fit_candidate(0.1, "flat", p.params, p0, 10, "TEST", p.fit, TIME_POINTS, p.bounds, p.init_cond,
+                                   p.num_psites, p.fit[9:].reshape(p.num_psites, -1))
+    assert result[3] == np.inf
+    assert f"λ = {normest._format_lambda(0.1, p0)}," in caplog.text
+
+
+def test_bootstrap_is_reproducible_across_workers(synthetic_problem):
+    """
+    Test that the bootstrap replicates give the same aggregated estimates serially and in the worker pool.
+    """
+    p = synthetic_problem
+    args = (p.params, p.target_fit, np.ones(p.target_fit.size), 0.1, True, p.bounds, p.init_cond, p.num_psites,
+            TIME_POINTS)
+
+    serial_mean, serial_cov = normest.bootstrap(6, *args, max_workers=1)
+    pooled_mean, pooled_cov = normest.bootstrap(6, *args, max_workers=2)
+    np.testing.assert_allclose(pooled_mean, serial_mean, rtol=1e-12)
+    np.testing.assert_allclose(pooled_cov, serial_cov, rtol=1e-12)
+    assert not np.allclose(serial_mean, p.params)
+
+
+def test_initial_guess_from_data(synthetic_problem):
+    """
+    Test that the data-driven guess recovers the mRNA rates of a noise-free time course and that the
+    screened initial guess lies inside the bounds.
+    """
+    p = synthetic_problem
+    p_data, r_data = p.fit[9:].reshape(p.num_psites, -1), p.fit[:9]
+
+    guess = initguess.data_driven_guess(p_data, r_data, p.init_cond, p.num_psites, TIME_POINTS)
+    np.testing.assert_allclose(guess[:2], p.params[:2], rtol=1e-2)
+
+    p0 = initguess.initial_guess("TEST", p_data, r_data, p.init_cond, p.num_psites, TIME_POINTS, p.bounds)
+    assert np.all((p0 > 0.0) & (p0 < 20.0))
+
+
+def test_multistart_clusters_local_minima(synthetic_problem):
+    """
+    Test that the multi-start fit is at least as good as the single fit and accounts for every start.
+    """
+    p = synthetic_problem
+    args = (p.fit, p.target_fit, np.ones(p.target_fit.size), 0.01, True, p.bounds, p.init_cond, p.num_psites,
+            TIME_POINTS)
+
+    _, _, single_score = normest.local_fit("TEST", p.params * 1.5, *args)
+    _, _, score, minima = normest.multistart("TEST", p.params * 1.5, 4, *args, max_workers=1)
+    assert score <= single_score
+    assert minima["Starts"].sum() == 4
+    assert minima["Score"].iloc[0] == score
+
+
+def test_least_squares_jacobian_modes(monkeypatch, synthetic_problem):
+    """
+    Test that the sparsity pattern covers the analytic Jacobian and that the dense, sparse and
+    finite-difference Jacobians reach the same optimum.
+    """
+    p = synthetic_problem
+    pattern = normest.jacobian_sparsity(p.init_cond, p.num_psites, TIME_POINTS)
+    jac = normest.model_jacobian(p.params * 1.3, p.init_cond, p.num_psites, TIME_POINTS, 0.1)
+    assert np.all(pattern | (jac == 0))
+    assert not pattern[:p.fit.size - p.num_psites * TIME_POINTS.size, 2:].any()
+    np.testing.assert_array_equal(pattern[p.fit.size:], np.eye(p.num_params, dtype=bool))
+
+    costs = []
+    for mode in ("analytic", "sparse", "2-point"):
+        monkeypatch.setattr(normest, "LSQ_JACOBIAN", mode)
+        result = normest.fit_model(p.params * 1.5, p.target_fit, np.ones(p.target_fit.size), 0.01, True, p.bounds,
+                                   p.init_cond, p.num_psites, TIME_POINTS)
+        assert result.success
+        costs.append(result.cost)
+    np.testing.assert_allclose(costs, costs[0], rtol=1e-3)
+
+
+def test_batched_fit_matches_single_fits(synthetic_problem):
+    """
+    Test that the members of a batched fit converge to the optimum of their own least-squares problem.
+    """
+    p = synthetic_problem
+    params = np.vstack([p.params, p.rng.uniform(0.05, 2.0, (2, p.num_params))])
+    fits = np.array([solve_ode(x, p.init_cond, p.num_psites, TIME_POINTS)[1] for x in params[1:]])
+    targets = np.vstack([p.target_fit, np.concatenate([fits, np.zeros((2, p.num_params))], axis=1)])
+    sigmas = np.ones_like(targets)
+    lams = np.array([0.01, 0.1, 0.01])
+
+    X, cost, converged = batchest.batch_least_squares(params * 1.5, targets, sigmas, lams, p.bounds, p.init_cond,
+                                                      p.num_psites, TIME_POINTS, r_len=9)
+    assert converged.all()
+    for i in range(3):
+        result = normest.fit_model(params[i] * 1.5, targets[i], sigmas[i], lams[i], True, p.bounds, p.init_cond,
+                                   p.num_psites, TIME_POINTS)
+        np.testing.assert_allclose(cost[i], result.cost, rtol=1e-3)
+
+
+def test_result_cache_recomputes_only_changed_genes(monkeypatch, tmp_path):
+    """
+    Test that a rerun loads unchanged genes from the cache and only processes changed or failed genes.
+    """
+    monkeypatch.setattr(core, "load_result", partial(cache.load_result, cache_dir=tmp_path))
+    monkeypatch.setattr(core, "store_result", partial(cache.store_result, cache_dir=tmp_path))
+    monkeypatch.setattr(cache, "get_protein_weights", lambda gene: np.ones(14))
+    processed = []
+
+    def fake_process(gene, kinase_data, *args):
+        processed.append(gene)
+        if gene == "G3":
+            raise RuntimeError("fit failed")
+        return {"gene": gene, "value": kinase_data.loc[kinase_data["Gene"] == gene, "x1"].sum()}
+
+    monkeypatch.setattr(core, "process_gene_wrapper", fake_process)
+    kinase_data = pd.DataFrame({"Gene": ["G1", "G2", "G3"], "Psite": ["S1", "S2", "S3"], "x1": [1.0, 2.0, 3.0]})
+    mrna_data = pd.DataFrame({"mRNA": ["G1", "G2", "G3"], "x1": [1.0, 1.0, 1.0]})
+    bounds = {"A": (0, 20), "B": (0, 20)}
+
+    def run():
+        processed.clear()
+        return {r["gene"]: r["value"] for r in core.process_genes(["G1", "G2", "G3"], kinase_data, mrna_data,
+                                                                  TIME_POINTS, bounds, 0, use_cache=True)}
+
+    assert run() == {"G1": 1.0, "G2": 2.0}
+    assert processed == ["G1", "G2", "G3"]
+    assert run() == {"G1": 1.0, "G2": 2.0}
+    assert processed == ["G3"]
+    kinase_data.loc[1, "x1"] = 5.0
+    assert run() == {"G1": 1.0, "G2": 5.0}
+    assert processed == ["G2", "G3"]
+
+
+def test_profile_likelihood_brackets_estimate():
+    """
+    Test that the profile-likelihood intervals contain the estimate, that fixing a parameter at its
+    optimum does not change the fit and that the parallel and serial profiles agree.
+    """
+    num_psites = 1
+    rng = np.random.default_rng(0)
+    init_cond = initial_condition(num_psites)
+    num_params = len(get_param_names(num_psites))
+    params = rng.uniform(0.1, 1.0, num_params)
+    _, fit = solve_ode(params, init_cond, num_psites, TIME_POINTS)
+    fit = fit + rng.normal(0, 0.02, fit.size)
+    target_fit = np.concatenate([fit, np.zeros(num_params)])
+    sigma = np.full(target_fit.size, 0.02)
+    bounds = normest.parameter_bounds(dict.fromkeys(("A", "B", "C", "D", "S(i)", "D(i)"), (0.0, 5.0)), num_psites)
+    args = (target_fit, sigma, 0.01, True, bounds, init_cond, num_psites, TIME_POINTS)
+    # The optimiser works on log-parameters for 'randmod'; the intervals are on the natural scale
+    log_space = normest.ODE_MODEL == 'randmod'
+
+    best = normest.fit_model(np.log(params) if log_space else params, *args)
+    held = normest.fit_model(best.x, *args, fixed=(0, best.x[0]))
+    np.testing.assert_allclose(held.cost, best.cost, rtol=1e-4)
+
+    serial = profile_likelihood("G", best.x, *args, max_workers=1)
+    pooled = profile_likelihood("G", best.x, *args, max_workers=2)
+    lwr, upr, identifiable, profiles = serial
+    estimate = np.exp(best.x) if log_space else best.x
+    assert np.all(lwr <= estimate * (1 + 1e-6) + 1e-6) and np.all(upr >= estimate * (1 - 1e-6) - 1e-6)
+    assert identifiable.dtype == bool and len(identifiable) == num_params
+    assert set(profiles["Parameter"]) <= set(get_param_names(num_psites))
+    np.testing.assert_allclose(pooled[0], lwr, rtol=1e-6)
+    np.testing.assert_allclose(pooled[1], upr, rtol=1e-6)